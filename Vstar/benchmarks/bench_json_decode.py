@@ -0,0 +1,75 @@
+"""
+Benchmark for decoding the json frames of the data socket
+
+A synthetic GCloud frame of about 100 MB (and a GPicture frame) is decoded by
+decodeJsonFrame with every json backend installed, and by the old path that
+scanned the string with isJsonObject before json.loads.
+
+    python benchmarks/bench_json_decode.py
+    python benchmarks/bench_json_decode.py --megabytes 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from vstars_cylinder_detect.gcloud import GCloud
+from vstars_cylinder_detect.gpicture import GPicture
+from vstars_cylinder_detect.vfake_server import makeCloudJson, makePictureJson
+from vstars_cylinder_detect.vjson import JSON_BACKENDS, jsonBackend, setJsonBackend
+from vstars_cylinder_detect.vstars import JSON_FRAME_TYPES, decodeJsonFrame, isJsonObject
+
+
+def legacyDecode(jsonStr):
+    # the decoding before the json backends: find the type, then json.loads the whole frame
+    for objectName, objectClass, attribute in JSON_FRAME_TYPES:
+        if isJsonObject(objectName, jsonStr):
+            data = json.loads(jsonStr)
+            value = objectClass()
+            value.fromDict(data[objectName])
+            return objectName, value
+    return None, None
+
+
+def timeDecode(function, jsonStr, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(jsonStr)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def run(title, jsonStr, repeat):
+    megabytes = len(jsonStr) / 1e6
+    print("{} {:.1f} MB".format(title, megabytes))
+
+    baseline = timeDecode(legacyDecode, jsonStr, repeat)
+    print("    {:<10} {:>8.3f} s {:>8.1f} MB/s".format("legacy", baseline, megabytes / baseline))
+
+    default = jsonBackend()
+    for name in JSON_BACKENDS:
+        setJsonBackend(name)
+        seconds = timeDecode(decodeJsonFrame, jsonStr, repeat)
+        print("    {:<10} {:>8.3f} s {:>8.1f} MB/s {:>6.2f}x".format(name, seconds, megabytes / seconds, baseline / seconds))
+    setJsonBackend(default)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megabytes", type=float, default=100.0, help="size of the GCloud frame")
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    # a synthetic point is about 300 bytes of json
+    points = int(options.megabytes * 1e6 / len(makeCloudJson(1000)) * 1000)
+    run("GCloud {} points".format(points), makeCloudJson(points), options.repeat)
+    run("GPicture 100000 points", makePictureJson(100000), options.repeat)
+
+
+if __name__ == "__main__":
+    main()
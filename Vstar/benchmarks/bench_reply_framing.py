@@ -0,0 +1,101 @@
+"""
+Benchmark for reading command replies on the primary socket
+
+A local stand-in server sends multi-megabyte NUL terminated replies in
+randomly sized TCP writes. The old sendCommand loop (recv(2048), data += part,
+stop on a short read) is timed against VReplyReader, and each reader is also
+checked for replies that were cut short.
+
+    python benchmarks/bench_reply_framing.py
+"""
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from vstars_cylinder_detect.vframe_reader import VReplyReader
+
+
+def makeReply(size):
+    body = ";".join("v.value{}={}".format(i, i * 0.5) for i in range(size // 16))
+    return "{{{}}}\0".format(body).encode("utf-8")
+
+
+def serve(listener, reply, count):
+    connection, _ = listener.accept()
+    with connection:
+        rng = random.Random(1)
+        for _ in range(count):
+            connection.recv(64)
+            offset = 0
+            while offset < len(reply):
+                step = rng.randint(512, 256 * 1024)
+                connection.sendall(reply[offset : offset + step])
+                offset += step
+
+
+def legacyRead(sock):
+    data = b''
+
+    while(True):
+        part = sock.recv(2048)
+        data += part
+
+        if (len(part) < 2048 or part.endswith(b'\0')):
+            break
+
+    return data
+
+
+def legacyDrain(sock, expected):
+    # the old loop stops early, drain the rest so the next reply starts in step
+    data = legacyRead(sock)
+    complete = len(data) == expected
+    while not data.endswith(b"\0"):
+        data = sock.recv(65536)
+    return complete
+
+
+def run(name, reply, count, readFunction):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("localhost", 0))
+    listener.listen(1)
+    server = threading.Thread(target=serve, args=(listener, reply, count), daemon=True)
+    server.start()
+
+    sock = socket.create_connection(listener.getsockname())
+    complete = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        sock.sendall(b"Get()\0")
+        complete += readFunction(sock)
+    seconds = time.perf_counter() - start
+
+    sock.close()
+    server.join()
+    listener.close()
+    print("{:>10} {:>8.1f} MB {:>10.1f} ms/reply {:>6}/{} complete".format(name, len(reply) / 1e6, seconds / count * 1e3, complete, count))
+
+
+def main():
+    for size in (1000000, 4000000, 8000000):
+        reply = makeReply(size)
+        count = 5
+
+        run("legacy", reply, count, lambda sock: legacyDrain(sock, len(reply)))
+
+        readers = {}
+
+        def framed(sock):
+            reader = readers.setdefault(sock, VReplyReader(sock))
+            return reader.readReply() == reply
+
+        run("framed", reply, count, framed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark for VReturnValueManager.parse
+
+Fills the manager with a growing number of distinct "v." keys, the way a long
+M-Mode session does, and times the parse of a typical reply at each size.
+The per-reply cost should stay flat as the archive grows.
+
+    python benchmarks/bench_return_value_manager.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from vstars_cylinder_detect.vreturn_value_manager import VReturnValueManager
+
+
+def makeReply(keys):
+    body = ";".join("{}={}".format(key, value) for key, value in keys)
+    return "{{{}}}\0".format(body).encode("utf-8")
+
+
+def fillManager(manager, count):
+    for start in range(0, count, 1000):
+        keys = [("v.archived{}".format(i), i) for i in range(start, min(start + 1000, count))]
+        manager.parse(makeReply(keys))
+
+
+def main():
+    reply = makeReply(
+        [
+            ("v.command", "Pictures.Information"),
+            ("v.pictureX", 1234.5678),
+            ("v.pictureY", -42.125),
+            ("v.pictureZ", 3000.0),
+            ("v.pictureAzimuth", 12.5),
+            ("v.pictureElevation", -3.25),
+            ("v.pictureRoll", 90.0),
+            ("v.pictureTotalResidualRMS", 0.0012),
+            ("v.shutterUS", 100),
+            ("v.timeStamp", 123456789),
+            ("v.cameraName", "INCA4"),
+            ("v.pictureIsResected", "true"),
+        ]
+    )
+
+    print("{:>10} {:>14}".format("keys", "us/parse"))
+    for count in (0, 1000, 10000, 50000):
+        manager = VReturnValueManager()
+        fillManager(manager, count)
+        number = 2000
+        seconds = min(timeit.repeat(lambda: manager.parse(reply), number=number, repeat=5))
+        print("{:>10} {:>14.2f}".format(count, seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+End-to-end benchmark suite for the SDK transport and decoders
+
+Runs against a local VFakeServer, so no V-STARS is needed, and measures:
+
+    commands        commands/sec and p50/p99 latency of single commands through VSTARSClient.__vexec
+    pipelined       commands/sec of executeCommands
+    parse           VReturnValueManager.parse time per reply size
+    gcloud          GCloud decode time from the data socket json, 1k to 1M points
+    get3d           Get3D round trip through both sockets
+    gpicture        GPicture decode time per image point count
+    matrixFromDict  utilities.matrixFromDict time per matrix size
+    pictures        PicturesInformationAll against a PicturesInformation + getValue loop
+    transform       GTransformationMatrix.apply points/sec, 1k to 1M points
+
+The results are written as JSON so SDK releases can be compared.
+
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --only commands parse --latency 0.0005
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from vstars_cylinder_detect.gtransformation_matrix import GTransformationMatrix
+from vstars_cylinder_detect.pictures_information import PICTURES_INFORMATION_FIELDS
+from vstars_cylinder_detect.utilities import matrixFromDict
+from vstars_cylinder_detect.vfake_server import VFakeServer, makeCloudJson, makePictureJson
+from vstars_cylinder_detect.vreturn_value_manager import VReturnValueManager
+from vstars_cylinder_detect.vstars import VSTARSClient, decodeJsonFrame
+
+
+def percentiles(seconds):
+    milliseconds = np.asarray(seconds) * 1e3
+    return {
+        "p50_ms": float(np.percentile(milliseconds, 50)),
+        "p99_ms": float(np.percentile(milliseconds, 99)),
+        "mean_ms": float(milliseconds.mean()),
+    }
+
+
+def bestOf(function, number, repeat=5):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def benchCommands(options):
+    results = []
+    with VFakeServer(latency=options.latency) as server:
+        V = VSTARSClient()
+        V.init(server.address, server.port)
+
+        for _ in range(50):
+            V.PictureIsResected(index=1)
+
+        seconds = []
+        start = time.perf_counter()
+        for index in range(options.commands):
+            begin = time.perf_counter()
+            V.PictureIsResected(index=index)
+            seconds.append(time.perf_counter() - begin)
+        total = time.perf_counter() - start
+
+        result = {"commands": options.commands, "commands_per_sec": options.commands / total}
+        result.update(percentiles(seconds))
+        results.append(result)
+        V.close()
+
+    return results
+
+
+def benchPipelined(options):
+    results = []
+    with VFakeServer(latency=options.latency) as server:
+        V = VSTARSClient()
+        V.init(server.address, server.port)
+
+        commands = ["PictureIsResected(index={})".format(index) for index in range(options.commands)]
+        for depth in (1, 4, 16, 64):
+            start = time.perf_counter()
+            V.executeCommands(commands, depth=depth)
+            total = time.perf_counter() - start
+            results.append({"depth": depth, "commands": len(commands), "commands_per_sec": len(commands) / total})
+        V.close()
+
+    return results
+
+
+def makeReply(count):
+    body = ";".join("v.value{}={}".format(index, index * 0.5) for index in range(count))
+    return "{{v.command=Pictures.Information;{}}}\0".format(body).encode("utf-8")
+
+
+def benchParse(options):
+    results = []
+    manager = VReturnValueManager()
+    for count in (10, 100, 1000, 10000):
+        reply = makeReply(count)
+        number = max(20000 // count, 5)
+        seconds = bestOf(lambda: manager.parse(reply), number)
+        results.append({"values": count, "bytes": len(reply), "us_per_parse": seconds * 1e6})
+
+    return results
+
+
+def pointCounts(maximum):
+    counts = [1000, 10000, 100000, 1000000]
+    return [count for count in counts if count <= maximum]
+
+
+def benchGCloud(options):
+    results = []
+    for count in pointCounts(options.max_points):
+        jsonStr = makeCloudJson(count)
+        seconds = bestOf(lambda: decodeJsonFrame(jsonStr), 1, repeat=3)
+        results.append({"points": count, "bytes": len(jsonStr), "seconds": seconds, "points_per_sec": count / seconds})
+
+    return results
+
+
+def benchGet3D(options):
+    results = []
+    for count in pointCounts(min(options.max_points, 100000)):
+        with VFakeServer(cloudSize=count) as server:
+            server.frame("GCloud", count)
+
+            V = VSTARSClient()
+            V.init(server.address, server.port)
+            seconds = []
+            for _ in range(3):
+                begin = time.perf_counter()
+                V.Get3D(filename="Final Results", timeout=60)
+                seconds.append(time.perf_counter() - begin)
+            V.close()
+
+        results.append({"points": count, "seconds": min(seconds)})
+
+    return results
+
+
+def benchGPicture(options):
+    results = []
+    for count in (100, 1000, 10000, 100000):
+        jsonStr = makePictureJson(count)
+        number = max(10000 // count, 1)
+        seconds = bestOf(lambda: decodeJsonFrame(jsonStr), number, repeat=3)
+        results.append({"points": count, "bytes": len(jsonStr), "seconds": seconds, "points_per_sec": count / seconds})
+
+    return results
+
+
+def makeMatrixDict(size):
+    return {"value{}".format(r): {"value{}".format(c): float(r * size + c) for c in range(size)} for r in range(size)}
+
+
+def benchMatrixFromDict(options):
+    results = []
+    for size in (3, 4, 10, 50):
+        matrixDict = makeMatrixDict(size)
+        number = max(20000 // (size * size), 10)
+        seconds = bestOf(lambda: matrixFromDict(matrixDict), number)
+        results.append({"size": size, "us_per_call": seconds * 1e6})
+
+    return results
+
+
+def benchPictures(options):
+    results = []
+    with VFakeServer(latency=options.latency, pictureCount=300) as server:
+        V = VSTARSClient()
+        V.init(server.address, server.port)
+
+        start = time.perf_counter()
+        for index in range(V.GetNumberOfPictures()):
+            V.PicturesInformation(index=index)
+            for key, column, kind in PICTURES_INFORMATION_FIELDS:
+                V.getValue(key)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        table = V.PicturesInformationAll()
+        seconds = time.perf_counter() - start
+        V.close()
+
+    results.append({"pictures": len(table), "loop_seconds": loop, "all_seconds": seconds, "speedup": loop / seconds})
+    return results
+
+
+def benchTransform(options):
+    H = GTransformationMatrix.identity()
+    H.data[:3, :3] = [[0.0, -2.0, 0.0], [2.0, 0.0, 0.0], [0.0, 0.0, 2.0]]
+    H.data[:3, 3] = [10.0, 20.0, 30.0]
+
+    results = []
+    for count in pointCounts(options.max_points):
+        xyz = np.random.default_rng(0).normal(size=(count, 3))
+        number = max(100000 // count, 1)
+        seconds = bestOf(lambda: H.apply(xyz), number, repeat=3)
+        results.append({"points": count, "seconds": seconds, "points_per_sec": count / seconds})
+
+    return results
+
+
+BENCHMARKS = {
+    "commands": benchCommands,
+    "pipelined": benchPipelined,
+    "parse": benchParse,
+    "gcloud": benchGCloud,
+    "get3d": benchGet3D,
+    "gpicture": benchGPicture,
+    "matrixFromDict": benchMatrixFromDict,
+    "pictures": benchPictures,
+    "transform": benchTransform,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench_results.json", help="JSON file the results are written to")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the stand-in server sleeps per command")
+    parser.add_argument("--commands", type=int, default=2000, help="commands sent by the command benchmarks")
+    parser.add_argument("--max-points", type=int, default=1000000, help="largest GCloud decoded")
+    options = parser.parse_args()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "latency": options.latency,
+        "results": {},
+    }
+
+    for name, function in BENCHMARKS.items():
+        if options.only and name not in options.only:
+            continue
+
+        start = time.perf_counter()
+        report["results"][name] = function(options)
+        print("{:<16} {:>8.1f} s".format(name, time.perf_counter() - start))
+        for row in report["results"][name]:
+            print("    " + "  ".join("{}={:.4g}".format(key, value) if isinstance(value, float) else "{}={}".format(key, value) for key, value in row.items()))
+
+    with open(options.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Results written to " + options.output)
+
+
+if __name__ == "__main__":
+    main()
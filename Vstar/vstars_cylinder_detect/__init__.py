@@ -1,11 +1,28 @@
+from .async_vstars import *
+from .alignment_solver import *
 from .alignment_stats import *
 from .autorelabel_results import *
 from .bundle_stats import *
 from .gcloud import *
+from .gcloud_index import *
+from .gcloud_stream import *
 from .gmatrix import *
 from .gphotogrammetry_project_compare_stats import *
+from .gpicture import *
+from .gselection import *
 from .gtransformation_matrix import *
+from .pattern_matcher import *
+from .picture_set import *
+from .pictures_information import *
 from .scalebar import *
 from .singleton import *
+from .vdata_requests import *
+from .vfake_server import *
+from .vframe_reader import *
+from .vinstrumentation import *
+from .vjson import *
+from .vresult_cache import *
 from .vreturn_value_manager import *
-from .vstars import *
\ No newline at end of file
+from .vsession import *
+from .vstars import *
+from .vstars_pool import *
\ No newline at end of file
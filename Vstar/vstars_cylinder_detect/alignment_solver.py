@@ -0,0 +1,299 @@
+# VSTARS Ignore
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .alignment_stats import AlignmentStats
+from .gcloud import GCloud
+from .gtransformation_matrix import GTransformationMatrix
+
+
+class AlignmentSolver:
+    """
+    Client-side point to point alignment of two fetched clouds, for what-if analysis
+
+    Solves the transformation taking the secondary (measured) points onto the primary
+    (design) points with the same label, like XYZAlignmentQuick, with the closed form
+    least squares solution of Umeyama (a rotation from the SVD of the cross covariance,
+    then the scale and the shift). solve returns a GTransformationMatrix and fills an
+    AlignmentStats, as XYZAlignmentQuick does from the V-STARS reply.
+
+    solveSubsets solves many candidate subsets of the common points at once: every subset is
+    a mask over the common points and the solutions of a chunk of subsets are computed as
+    one stack of 3x3 SVDs, the chunks running on a thread pool.
+
+    .. code:: python
+
+        design = V.Get3D(filename="Design")
+        measured = V.Get3D(filename="Final Results")
+        solver = AlignmentSolver(design, measured)
+
+        stats = AlignmentStats()
+        H = solver.solve(holdScale=True, rejection=0.05, stats=stats)
+        print(stats.AcceptedPointCount, stats.RMSTotal)
+
+        # leave one point out
+        subsets = ~np.eye(len(solver.labels), dtype=bool)
+        Hs, allStats = solver.solveSubsets(subsets, holdScale=True)
+        worst = solver.labels[np.argmin([s.RMSTotal for s in allStats])]
+
+    The rejection leaves out the point with the largest residual length above the limit and
+    solves again, bringing back the points that fall under the limit, until the accepted
+    points no longer change. The automatic limit is 3 times the RMSTotal of the last
+    solution; V-STARS does not document its rule, so the accepted points can differ from its
+    automatic rejection.
+
+    :param primary: The design GCloud, or a (labels, xyz) pair
+    :param secondary: The measured GCloud, or a (labels, xyz) pair
+    """
+
+    def __init__(self, primary, secondary):
+        primaryLabels, primaryXYZ = _labelsAndPoints(primary)
+        secondaryLabels, secondaryXYZ = _labelsAndPoints(secondary)
+
+        self.primaryPointCount = len(primaryLabels)
+        self.secondaryPointCount = len(secondaryLabels)
+
+        self.labels, primaryRows, secondaryRows = np.intersect1d(primaryLabels, secondaryLabels, return_indices=True)
+        self.primaryXYZ = primaryXYZ[primaryRows]
+        self.secondaryXYZ = secondaryXYZ[secondaryRows]
+
+        # solving about the centroids keeps the cross covariance accurate for far away points
+        self.primaryCentroid = self.primaryXYZ.mean(axis=0) if len(self.labels) else np.zeros(3)
+        self.secondaryCentroid = self.secondaryXYZ.mean(axis=0) if len(self.labels) else np.zeros(3)
+        self.__primary = self.primaryXYZ - self.primaryCentroid
+        self.__secondary = self.secondaryXYZ - self.secondaryCentroid
+
+    def __len__(self):
+        return len(self.labels)
+
+    def solve(
+        self,
+        subset=None,
+        holdScale: bool = False,
+        automaticRejection: bool = False,
+        rejection: float = None,
+        maxIterations=100,
+        stats: AlignmentStats = None,
+    ) -> GTransformationMatrix:
+        """
+        Solves the alignment on the common points, or on a subset of them
+
+        :param subset: Labels, rows of self.labels or a boolean mask over self.labels, all the common points if None
+        :param holdScale: When True the scale is held at 1
+        :param automaticRejection: When True the rejection limit is set from the RMS of each solution
+        :param rejection: The rejection limit, the residual length above which a point is left out
+        :param maxIterations: The most solutions computed while rejecting points
+        :param stats: An AlignmentStats filled with the counts and the RMS
+
+        :raises: Exception when fewer than 3 points are accepted, stats is filled first with RMSTotal -1
+        """
+        mask = self.subsetMask([self.labels if subset is None else subset])
+        transforms, results = self.__solveMasks(mask, holdScale, automaticRejection, rejection, maxIterations)
+
+        if stats is not None:
+            self.__fillStats(stats, results, 0)
+
+        if np.isnan(transforms[0, 0, 0]):
+            common = int(results["common"][0])
+            if common < 3:
+                raise Exception("An alignment needs at least 3 common points, there are {}".format(common))
+            raise Exception(
+                "The rejection limit {:g} left fewer than 3 of the {} common points, raise it to align".format(float(results["limits"][0]), common)
+            )
+
+        return GTransformationMatrix(transforms[0])
+
+    def solveSubsets(
+        self,
+        subsets,
+        holdScale: bool = False,
+        automaticRejection: bool = False,
+        rejection: float = None,
+        maxIterations=100,
+        maxWorkers=None,
+        chunkSize=256,
+    ):
+        """
+        Solves the alignment of every subset of the common points
+
+        :param subsets: A (K, len(self)) boolean mask, or K sequences of labels or rows of self.labels
+        :param maxWorkers: The threads solving chunks of subsets, the ThreadPoolExecutor default if None
+        :param chunkSize: The subsets solved together as one stack
+
+        See solve for the other parameters.
+
+        :returns: (H, stats), a (K, 4, 4) GTransformationMatrix stack and K AlignmentStats.
+            The matrix of a subset with fewer than 3 accepted points is NaN and its RMS -1.
+        """
+        mask = self.subsetMask(subsets)
+        chunks = [mask[start : start + chunkSize] for start in range(0, len(mask), chunkSize)]
+
+        def solveChunk(chunk):
+            return self.__solveMasks(chunk, holdScale, automaticRejection, rejection, maxIterations)
+
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+                solved = list(executor.map(solveChunk, chunks))
+        else:
+            solved = [solveChunk(chunk) for chunk in chunks]
+
+        transforms = np.concatenate([chunkTransforms for chunkTransforms, results in solved]) if solved else np.zeros((0, 4, 4))
+        allStats = []
+        for chunkTransforms, results in solved:
+            for k in range(len(chunkTransforms)):
+                stats = AlignmentStats()
+                self.__fillStats(stats, results, k)
+                allStats.append(stats)
+
+        return GTransformationMatrix(transforms), allStats
+
+    def subsetMask(self, subsets) -> np.ndarray:
+        """
+        The (K, len(self)) boolean mask of subsets given as masks, labels or rows of self.labels
+        """
+        if isinstance(subsets, np.ndarray) and subsets.dtype == bool:
+            return subsets.reshape(-1, len(self.labels))
+
+        mask = np.zeros((len(subsets), len(self.labels)), dtype=bool)
+        for k, subset in enumerate(subsets):
+            subset = np.asarray(subset)
+            if subset.dtype == bool:
+                mask[k] = subset
+            elif subset.dtype.kind in "iu":
+                mask[k, subset] = True
+            else:
+                mask[k] = np.isin(self.labels, subset.astype(str))
+        return mask
+
+    def residuals(self, H: GTransformationMatrix) -> np.ndarray:
+        """
+        The transformed secondary point minus the primary point of every common point, (len(self), 3)
+
+        A (K, 4, 4) stack gives (K, len(self), 3).
+        """
+        return H.apply(self.secondaryXYZ) - self.primaryXYZ
+
+    # Private Function
+    def __solveMasks(self, candidates, holdScale, automaticRejection, rejection, maxIterations):
+        count = len(candidates)
+        accepted = candidates.copy()
+        limits = np.full(count, -1.0 if rejection is None else float(rejection))
+        iterations = np.zeros(count, dtype=np.int64)
+        transforms = np.zeros((count, 4, 4))
+        rejecting = automaticRejection or rejection is not None
+
+        # the subsets still rejecting points
+        active = np.arange(count)
+        for iteration in range(1, maxIterations + 1):
+            solution = _umeyama(self.__secondary, self.__primary, accepted[active], holdScale)
+            transforms[active] = solution
+            iterations[active] = iteration
+            if not rejecting or iteration == maxIterations:
+                break
+
+            lengths = np.linalg.norm(_transform(solution, self.__secondary) - self.__primary, axis=-1)
+            if automaticRejection:
+                limits[active] = 3.0 * _rms(lengths, accepted[active])
+
+            # the points under the limit come back, of those over it only the worst is left out,
+            # so a few gross errors skewing the first solution do not reject the good points
+            over = accepted[active] & (lengths > limits[active, None])
+            newAccepted = candidates[active] & (lengths <= limits[active, None]) | over
+            rows = np.flatnonzero(over.any(axis=1))
+            newAccepted[rows, np.argmax(np.where(over[rows], lengths[rows], -np.inf), axis=1)] = False
+            changed = np.any(newAccepted != accepted[active], axis=1)
+            accepted[active] = newAccepted
+            active = active[changed]
+            if len(active) == 0:
+                break
+
+        # the stack solves about the centroids, move it back to the cloud coordinates
+        shift = np.eye(4)
+        shift[:3, 3] = self.primaryCentroid
+        unshift = np.eye(4)
+        unshift[:3, 3] = -self.secondaryCentroid
+        transforms = shift @ transforms @ unshift
+
+        residuals = _transform(transforms, self.secondaryXYZ) - self.primaryXYZ
+        accepted[np.isnan(transforms[:, 0, 0])] = False
+        weights = accepted.astype(float)
+        acceptedCount = weights.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            squared = np.einsum("kn,kni->ki", weights, np.nan_to_num(residuals) ** 2) / acceptedCount[:, None]
+            rmsXYZ = np.sqrt(squared)
+            rmsTotal = np.sqrt(squared.sum(axis=1))
+
+        results = {
+            "common": candidates.sum(axis=1),
+            "accepted": acceptedCount.astype(np.int64),
+            "iterations": iterations,
+            "limits": limits,
+            "rmsXYZ": np.where(acceptedCount[:, None] >= 3, rmsXYZ, -1.0),
+            "rmsTotal": np.where(acceptedCount >= 3, rmsTotal, -1.0),
+        }
+        return transforms, results
+
+    # Private Function
+    def __fillStats(self, stats, results, k):
+        stats.PrimaryPointCount = self.primaryPointCount
+        stats.SecondaryPointCount = self.secondaryPointCount
+        stats.CommonPointCount = int(results["common"][k])
+        stats.AcceptedPointCount = int(results["accepted"][k])
+        stats.RejectedPointCount = int(results["common"][k] - results["accepted"][k])
+        stats.IterationCount = int(results["iterations"][k])
+        stats.RejectionLimit = float(results["limits"][k])
+        stats.RMSX, stats.RMSY, stats.RMSZ = (float(value) for value in results["rmsXYZ"][k])
+        stats.RMSTotal = float(results["rmsTotal"][k])
+
+
+def _labelsAndPoints(cloud):
+    if isinstance(cloud, GCloud):
+        return cloud.labels, np.asarray(cloud.xyz, dtype=float)
+    labels, xyz = cloud
+    labels = np.asarray(labels, dtype=str)
+    return labels, np.asarray(xyz, dtype=float).reshape(len(labels), 3)
+
+
+def _umeyama(source, target, mask, holdScale):
+    # the (K, 4, 4) similarity transforms taking source onto target, each on the points of its mask row
+    weights = mask.astype(float)
+    counts = weights.sum(axis=1)
+    safeCounts = np.maximum(counts, 1.0)[:, None]
+
+    sourceMean = weights @ source / safeCounts
+    targetMean = weights @ target / safeCounts
+
+    # sum w (t - tm)(s - sm)^T = sum w t s^T - n tm sm^T
+    covariance = np.matmul(np.swapaxes(weights[:, :, None] * target, 1, 2), source) / safeCounts[:, :, None]
+    covariance -= targetMean[:, :, None] * sourceMean[:, None, :]
+
+    U, S, Vt = np.linalg.svd(covariance)
+    signs = np.ones((len(mask), 3))
+    signs[:, 2] = np.sign(np.linalg.det(U) * np.linalg.det(Vt))
+    signs[signs == 0.0] = 1.0
+    R = np.matmul(U * signs[:, None, :], Vt)
+
+    if holdScale:
+        scales = np.ones(len(mask))
+    else:
+        sourceVariance = (weights @ np.einsum("ni,ni->n", source, source)) / safeCounts[:, 0] - np.einsum("ki,ki->k", sourceMean, sourceMean)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scales = (S * signs).sum(axis=1) / sourceVariance
+
+    transforms = np.zeros((len(mask), 4, 4))
+    transforms[:, :3, :3] = scales[:, None, None] * R
+    transforms[:, :3, 3] = targetMean - np.matmul(transforms[:, :3, :3], sourceMean[:, :, None])[:, :, 0]
+    transforms[:, 3, 3] = 1.0
+    transforms[counts < 3] = np.nan
+    return transforms
+
+
+def _transform(transforms, xyz):
+    return np.matmul(xyz, np.swapaxes(transforms[:, :3, :3], 1, 2)) + transforms[:, None, :3, 3]
+
+
+def _rms(lengths, mask):
+    weights = mask.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.sqrt((weights * lengths * lengths).sum(axis=1) / weights.sum(axis=1))
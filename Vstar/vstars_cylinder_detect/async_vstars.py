@@ -0,0 +1,531 @@
+# VSTARS Ignore
+import asyncio
+import collections
+import functools
+import threading
+import time
+
+from .gcloud import GCloud
+from .gpicture import GPicture
+from .scalebar import ScaleBars
+from .vdata_requests import VDataRequests
+from .vframe_reader import VJsonFrameParser
+from .vinstrumentation import CommandTrace, recordTrace
+from .vreturn_value_manager import CommandResult, VReturnValueManager
+from .vstars import VSTARSClient, decodeJsonFrame, jsonObjectName, routeJsonObject
+
+
+class AsyncVSTARS:
+    """
+    asyncio counterpart of VSTARS
+
+    Both V-STARS sockets are driven by asyncio streams on the running event loop, so one
+    loop can control V-STARS alongside cameras, pan-tilt units or data export. Commands can
+    be awaited from many tasks at once; they are pipelined on the command socket and each
+    reply is matched to its command in order.
+
+    Every VSTARS command is available as a coroutine. Get3D, GetSelection, GetPicture and
+    GetScaleBars are native; the other commands run the VSTARS wrapper on a worker thread
+    while the sockets stay on the event loop.
+
+    .. code:: python
+
+        import asyncio
+        from vstars import AsyncVSTARS
+
+        async def main():
+            V = AsyncVSTARS()
+            await V.init()
+
+            cloud = await V.Get3D(filename="Final Results")
+            await V.Pause("{} points".format(len(cloud.points)))
+
+            await V.close()
+
+        asyncio.run(main())
+
+    Objects pushed on the data socket can also be consumed as they arrive:
+
+    .. code:: python
+
+        async for cloud in V.clouds():
+            print(len(cloud.points))
+
+    The result cache, session recording and instrumentation sinks of VSTARS
+    (enableResultCache, startRecording, addInstrumentationSink) apply to every command sent,
+    call them after init.
+    """
+
+    def __init__(self):
+        self.verbose = False
+        self.returnValueManager = VReturnValueManager()
+        self.lastResult = CommandResult()
+        self.errorString = ""
+        self.address = "localhost"
+        self.port = 1210
+        self._vstarsVersion = 0
+
+        self.reader = None
+        self.writer = None
+        self.dataReader = None
+        self.dataWriter = None
+
+        # futures of the commands sent, in the order they were sent
+        self.pendingReplies = collections.deque()
+        # (objectName or None for every object, asyncio.Queue) of frames()
+        self.subscribers = []
+        # the requests for an object of the data socket, in the order of their commands
+        self.dataRequests = VDataRequests()
+        # held from registering data requests until the replies of their commands are read
+        self.dataLock = asyncio.Lock()
+        self.tasks = []
+        self.bridge = None
+        # set once a reader task has stopped, the commands sent afterwards would never be answered
+        self.closedError = None
+
+    async def init(self, address="localhost", port=1210, replyLimit=1 << 30):
+        """
+        Initializes the Python-VSTARS link via asyncio streams
+
+        :param address: the ip address of V-STARS
+        :param port: the port on which V-STARS is listening.
+        :param replyLimit: the largest command reply accepted, in bytes
+        """
+        self.address = address
+        self.port = port
+
+        waited = 0
+        while True:
+            try:
+                self.reader, self.writer = await asyncio.open_connection(address, port, limit=replyLimit)
+                self.dataReader, self.dataWriter = await asyncio.open_connection(address, port + 1)
+                break
+            except OSError:
+                if self.writer is not None:
+                    self.writer.close()
+                    self.writer = None
+                # Sleep for a 1/4 second and try again
+                await asyncio.sleep(0.25)
+                waited = waited + 1
+                if waited % 4 == 0:
+                    print("Waiting to connect...")
+
+        self.closedError = None
+        self.tasks = [
+            asyncio.ensure_future(self.readReplies()),
+            asyncio.ensure_future(self.readData()),
+        ]
+
+        self.bridge = _AsyncVSTARSBridge.create(self, asyncio.get_running_loop())
+
+        dottedVersion = await self.GetVstarsVersion(numeric=False)
+        print("Connected to V-STARS Version " + dottedVersion)
+        self._vstarsVersion = self.bridge._VSTARSClient__parseVstarsVersion(dottedVersion)
+        self.bridge._vstarsVersion = self._vstarsVersion
+
+    async def close(self):
+        """
+        Closes both sockets and stops the reader tasks
+        """
+        for task in self.tasks:
+            task.cancel()
+        for writer in (self.writer, self.dataWriter):
+            if writer is not None:
+                writer.close()
+        self.tasks = []
+        self.stopped(ConnectionError("The connection to V-STARS was closed"))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, excType, excValue, traceback):
+        await self.close()
+
+    def CheckVstarsVersion(self, version):
+        """
+        Checks the version number against the currently connected Vstars version, see VSTARS.CheckVstarsVersion
+        """
+        return self._vstarsVersion >= version
+
+    def getValue(self, key):
+        """
+        Function to get various **v.xxx** return values from V-STARS' commands, see VSTARS.getValue
+        """
+        return self.returnValueManager.getValue(key)
+
+    async def execute(self, command: str, raiseErrors=True) -> CommandResult:
+        """
+        Sends a single command string to V-STARS and waits for its reply
+
+        :param raiseErrors: When False a failed command is returned like the others, see CommandResult.isError
+
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details
+        """
+        return await self.__execute(command, raiseErrors, False)
+
+    async def executeCommands(self, commands, raiseErrors=True) -> list:
+        """
+        Sends several command strings back to back and waits for all of their replies
+
+        :returns: a CommandResult per command, in the order the commands were given
+        """
+        return list(await asyncio.gather(*[self.__execute(command, raiseErrors, True) for command in commands]))
+
+    # Private Function
+    async def __execute(self, command, raiseErrors, pipelined):
+        if self.closedError is not None:
+            raise ConnectionError(str(self.closedError))
+
+        if self.verbose:
+            print(time.strftime("%Y-%m-%dT%H:%M:%S: ", time.localtime()), command)
+
+        commandNameSent = self.parseCommandName(command)
+        byteString = command.encode("utf-8")
+        reply = asyncio.get_running_loop().create_future()
+
+        # set on the bridge by enableResultCache, startRecording and addInstrumentationSink
+        sinks = getattr(self.bridge, "instrumentationSinks", None)
+        recorder = getattr(self.bridge, "recorder", None)
+        if recorder is not None:
+            recorder.command(byteString)
+        cache = getattr(self.bridge, "resultCache", None)
+        if cache is not None:
+            cache.noteCommand(commandNameSent)
+
+        timestamp = time.time()
+        start = time.perf_counter()
+
+        # no await between queueing the future and writing keeps replies in step with commands
+        self.pendingReplies.append(reply)
+        self.writer.write(byteString + b"\0")
+        await self.writer.drain()
+        sent = time.perf_counter()
+
+        data, result, received, parsed = await reply
+
+        if sinks:
+            recordTrace(
+                sinks,
+                CommandTrace(
+                    commandNameSent,
+                    timestamp,
+                    len(byteString) + 1,
+                    len(data),
+                    sent - start,
+                    max(received - sent, 0.0),
+                    parsed - received,
+                    result.isError,
+                    result.errorString or "",
+                    pipelined=pipelined,
+                ),
+            )
+
+        if self.CheckVstarsVersion(40090040000000):
+            commandNameReceived = result.command
+            if commandNameReceived is not None:
+                if commandNameReceived != commandNameSent:
+                    print("**** response conflict. Sent {} Received {}".format(commandNameSent, commandNameReceived))
+
+        self.lastResult = result
+
+        if result.isError and raiseErrors:
+            await self.handleError(result)
+
+        return result
+
+    async def handleError(self, result: CommandResult):
+        """
+        Handles a command error sent back by V-STARS
+        """
+        self.errorString = result.getValue("v.errorString")
+
+        if self.CheckVstarsVersion(40090040000000):
+            await self.execute('AddErrorToScriptDoc(message="{}")'.format(self.errorString))
+
+        raise Exception(self.errorString)
+
+    def parseCommandName(self, commandString: str):
+        name = ""
+        index = commandString.find("(")
+        if index > 0:
+            name = commandString[0:index]
+
+        return name
+
+    async def readReplies(self):
+        """
+        Task that reads the NUL terminated command replies and resolves the waiting commands in order
+        """
+        error = ConnectionError("The connection to V-STARS was closed")
+        try:
+            while True:
+                data = await self.reader.readuntil(b"\0")
+                received = time.perf_counter()
+                recorder = getattr(self.bridge, "recorder", None)
+                if recorder is not None:
+                    recorder.reply(data)
+                result = self.returnValueManager.parse(data)
+                if not self.pendingReplies:
+                    # the replies are out of step with the commands, none of them can be trusted
+                    raise ConnectionError("V-STARS sent a reply to no command: {}".format(data[:80]))
+                reply = self.pendingReplies.popleft()
+                if not reply.done():
+                    reply.set_result((data, result, received, time.perf_counter()))
+        except asyncio.IncompleteReadError:
+            pass
+        except ConnectionError as ex:
+            error = ex
+        except Exception as ex:
+            error = ConnectionError("Reading the V-STARS replies failed: {}".format(ex))
+        finally:
+            self.stopped(error)
+
+    async def readData(self):
+        """
+        Task that reads the data socket and publishes every object V-STARS sends on it
+        """
+        loop = asyncio.get_running_loop()
+        parser = VJsonFrameParser()
+        error = ConnectionError("The connection to V-STARS was closed")
+
+        try:
+            while True:
+                tmp = await self.dataReader.read(65536)
+                if not tmp:
+                    return
+
+                for jsonStr in parser.feed(tmp):
+                    recorder = getattr(self.bridge, "recorder", None)
+                    if recorder is not None:
+                        recorder.data(jsonStr)
+
+                    # a raw request of the bridge (GetPictures) decodes the frame itself
+                    if self.dataRequests.resolveRaw(jsonObjectName(jsonStr), jsonStr):
+                        continue
+
+                    try:
+                        # large clouds take a while to decode, keep the loop responsive meanwhile
+                        objectName, value = await loop.run_in_executor(None, decodeJsonFrame, jsonStr)
+                    except Exception as e:
+                        print(str(e))
+                        continue
+
+                    if objectName is None:
+                        print(jsonStr)
+                        continue
+
+                    for name, queue in list(self.subscribers):
+                        if name is None or name == objectName:
+                            queue.put_nowait(value)
+
+                    routeJsonObject(self.bridge, objectName, value)
+        except ConnectionError as ex:
+            error = ex
+        except Exception as ex:
+            error = ConnectionError("Reading the V-STARS data socket failed: {}".format(ex))
+        finally:
+            self.stopped(error)
+
+    def stopped(self, error: ConnectionError):
+        """
+        Internal function called when a reader task ends, the commands waiting and sent later fail with error
+        """
+        if self.closedError is None:
+            self.closedError = error
+
+        while self.pendingReplies:
+            reply = self.pendingReplies.popleft()
+            if not reply.done():
+                reply.set_exception(ConnectionError(str(self.closedError)))
+        self.dataRequests.failAll(ConnectionError(str(self.closedError)))
+
+    def subscribe(self, objectName=None) -> asyncio.Queue:
+        """
+        Returns a queue receiving every objectName object sent on the data socket from now on, every object if None
+        """
+        queue = asyncio.Queue()
+        self.subscribers.append((objectName, queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers = [entry for entry in self.subscribers if entry[1] is not queue]
+
+    async def frames(self, objectName=None):
+        """
+        Async iterator over the objects sent on the data socket
+
+        :param objectName: GCloud, GPicture, GMatrix, scalebars or GPhotogrammetryProjectCompareStats, None for all
+        """
+        queue = self.subscribe(objectName)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe(queue)
+
+    def clouds(self):
+        return self.frames("GCloud")
+
+    def pictures(self):
+        return self.frames("GPicture")
+
+    def matrices(self):
+        return self.frames("GMatrix")
+
+    def scaleBars(self):
+        return self.frames("scalebars")
+
+    async def executeData(self, commands, objectName: str, raw=False):
+        """
+        Sends commands whose objects come back on the data socket, see VDataRequests
+
+        Each command gets its own request, registered in the order the commands are written,
+        so tasks awaiting objects of the same kind at once each get the object of their command.
+
+        :returns: (requests, results), a concurrent.futures.Future and a CommandResult per command
+
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details
+        """
+        # no other data request is registered until the replies tell which commands failed
+        async with self.dataLock:
+            requests = [self.dataRequests.register(objectName, raw) for command in commands]
+            try:
+                results = list(await asyncio.gather(*[self.__execute(command, False, len(commands) > 1) for command in commands]))
+            except Exception:
+                for request in requests:
+                    self.dataRequests.discard(request)
+                raise
+
+            failed = self.dataRequests.discardFailed(requests, results)
+
+        if failed:
+            for request in requests:
+                request.cancel()
+            await self.handleError(failed[0])
+
+        return requests, results
+
+    async def requestObject(self, commandString: str, objectName: str, timeout, name: str):
+        """
+        Internal function to send a command and wait for the object it sends back on the data socket
+        """
+        requests, results = await self.executeData([commandString], objectName)
+        request = requests[0]
+        try:
+            # cancelling the wrapper cancels the request, its late object is then dropped
+            return await asyncio.wait_for(asyncio.wrap_future(request), timeout)
+        except asyncio.TimeoutError:
+            # the object may have arrived in the meantime, it is being handed over if cancel fails
+            if request.cancel():
+                raise Exception("A timeout occurred waiting for {}".format(name))
+            return request.result()
+
+    async def Get3D(self, filename="", timeout=None) -> GCloud:
+        """
+        Gets a 3D cloud from V-STARS, see VSTARS.Get3D
+        """
+        return await self.requestObject(("Get3D(filename={})").format(filename), "GCloud", timeout, "Get3D")
+
+    async def GetSelection(self, timeout=None) -> GCloud:
+        """
+        Gets the current selection as a 3D cloud from V-STARS, see VSTARS.GetSelection
+        """
+        return await self.requestObject("GetSelection()", "GCloud", timeout, "GetSelection")
+
+    async def GetPicture(self, index: int, timeout=None) -> GPicture:
+        """
+        Gets a picture from V-STARS, see VSTARS.GetPicture
+        """
+        return await self.requestObject(f"GetPicture(index={index})", "GPicture", timeout, "GetPicture")
+
+    async def GetScaleBars(self, timeout=None) -> ScaleBars:
+        """
+        Gets the scalebars from the project, see VSTARS.GetScaleBars
+        """
+        # the scaleInfo is only returned on 4.9.4-1 or greater
+        if not self.CheckVstarsVersion(40090040010000):
+            await self.execute("GetScaleBars()")
+            return None
+
+        return await self.requestObject("GetScaleBars()", "scalebars", timeout, "the ScaleBars")
+
+    def __getattr__(self, name):
+        method = getattr(VSTARSClient, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError("'AsyncVSTARS' object has no attribute '{}'".format(name))
+
+        @functools.wraps(method)
+        async def command(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, functools.partial(method, self.bridge, *args, **kwargs))
+
+        return command
+
+
+class _AsyncVSTARSBridge(VSTARSClient):
+    """
+    Runs the blocking VSTARS wrappers on a worker thread with their commands sent through an AsyncVSTARS
+    """
+
+    @classmethod
+    def create(cls, client: AsyncVSTARS, loop):
+        bridge = cls()
+        bridge.client = client
+        bridge.loop = loop
+        bridge.verbose = False
+        bridge.returnValueManager = client.returnValueManager
+        bridge.lastResult = client.lastResult
+        bridge.address = client.address
+        bridge.port = client.port
+        bridge.jsonStr = ""
+        bridge.initCalled = True
+        bridge.errorString = ""
+        bridge._lastCommandError = False
+        bridge._vstarsVersion = client._vstarsVersion
+
+        for name in ("cloud", "picture", "matrix", "scaleBars", "photogrammetryProjectCompareStats"):
+            setattr(bridge, name, None)
+            setattr(bridge, name + "Event", None)
+
+        bridge.requestLock = threading.RLock()
+        bridge.dataRequests = client.dataRequests
+
+        return bridge
+
+    def init(self, address="localhost", port=1210):
+        raise Exception("Use 'await AsyncVSTARS.init()' to connect")
+
+    def _VSTARSClient__vexec(self, command) -> CommandResult:
+        try:
+            self.lastResult = asyncio.run_coroutine_threadsafe(self.client.execute(command), self.loop).result()
+            self._lastCommandError = False
+        except Exception:
+            self._lastCommandError = True
+            self.errorString = self.client.errorString
+            raise
+        return self.lastResult
+
+    def executeCommands(self, commands, depth=16):
+        return asyncio.run_coroutine_threadsafe(self.client.executeCommands(commands), self.loop).result()
+
+    def _VSTARSClient__vexecData(self, command, objectName):
+        # registered on the event loop, in order with the requests of the native coroutines
+        try:
+            requests, results = asyncio.run_coroutine_threadsafe(self.client.executeData([command], objectName), self.loop).result()
+            self._lastCommandError = False
+        except Exception:
+            self._lastCommandError = True
+            self.errorString = self.client.errorString
+            raise
+        self.lastResult = results[0]
+        return requests[0], results[0]
+
+    def _VSTARSClient__vexecDataMany(self, commands, objectName, depth=16, raw=False):
+        requests, results = asyncio.run_coroutine_threadsafe(self.client.executeData(commands, objectName, raw), self.loop).result()
+        return requests
+
+    def _VSTARSClient__sendCommandsUnchecked(self, commands, depth):
+        return asyncio.run_coroutine_threadsafe(self.client.executeCommands(commands, raiseErrors=False), self.loop).result()
+
+    def _VSTARSClient__handleCommandError(self, result):
+        asyncio.run_coroutine_threadsafe(self.client.handleError(result), self.loop).result()
@@ -1,21 +1,257 @@
 # VSTARS Ignore
 import json
+import os
 
+import numpy as np
+
+from .gmatrix import GMatrix
 from .gobject_point import GObjectPoint
+from .gpoint_view import GPointRows, columnProperty, labelProperty
+from .vjson import loadsJson
+
+
+class GObjectPointView(GObjectPoint):
+    """
+    A GObjectPoint that reads and writes one row of a GCloud's arrays
+    """
+
+    def __init__(self, cloud, index):
+        # the values live in the cloud, GObjectPoint.__init__ is not called
+        self.cloud = cloud
+        self.index = index
+
+    X = columnProperty("cloud", "xyz", 0)
+    Y = columnProperty("cloud", "xyz", 1)
+    Z = columnProperty("cloud", "xyz", 2)
+    i = columnProperty("cloud", "ijk", 0)
+    j = columnProperty("cloud", "ijk", 1)
+    k = columnProperty("cloud", "ijk", 2)
+    nRays = columnProperty("cloud", "nRays")
+    nTotalRays = columnProperty("cloud", "nTotalRays")
+    offset = columnProperty("cloud", "offset")
+    label = labelProperty("cloud")
+
+    @property
+    def covariance(self):
+        matrix = GMatrix()
+        matrix.rows = 3
+        matrix.cols = 3
+        matrix.data = self.cloud.covariance[self.index]
+        return matrix
+
+    @covariance.setter
+    def covariance(self, value):
+        self.cloud.covariance[self.index] = np.asarray(value.data).reshape(3, 3)
+
+
+class GCloudPoints(GPointRows):
+    """
+    The points of a GCloud as GObjectPoint rows, built on demand from the cloud's arrays
+    """
+
+    def __init__(self, cloud):
+        GPointRows.__init__(self, cloud, GObjectPointView)
+        self.cloud = cloud
+
+
+# the arrays of a GCloud, in the order they are saved
+GCLOUD_COLUMNS = ("labels", "xyz", "ijk", "nRays", "nTotalRays", "offset", "covariance")
+
 
 class GCloud:
+    """
+    A 3D cloud stored column by column
+
+    Each point attribute is held in one contiguous array, so a large cloud does not
+    create a Python object per point:
+
+    **labels** (N,) str
+    **xyz** (N, 3) float
+    **ijk** (N, 3) float
+    **nRays** (N,) int
+    **nTotalRays** (N,) int, -1 when not sent by V-STARS
+    **offset** (N,) float
+    **covariance** (N, 3, 3) float
+
+    cloud.points still gives GObjectPoint rows, so ``cloud.points[i].X`` works as before;
+    the rows are views, writing to them changes the arrays.
+    """
+
     def __init__(self):
-        self.points = list()
+        self.labels = np.zeros(0, dtype="U1")
+        self.xyz = np.zeros((0, 3))
+        self.ijk = np.zeros((0, 3))
+        self.nRays = np.zeros(0, dtype=np.int64)
+        self.nTotalRays = np.zeros(0, dtype=np.int64)
+        self.offset = np.zeros(0)
+        self.covariance = np.zeros((0, 3, 3))
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def points(self) -> GCloudPoints:
+        return GCloudPoints(self)
+
+    @classmethod
+    def fromArrays(cls, labels, xyz, ijk=None, nRays=None, nTotalRays=None, offset=None, covariance=None):
+        """
+        Builds a cloud from columns, the missing ones are filled with zeros (-1 for nTotalRays)
+        """
+        cloud = cls()
+        count = len(labels)
+        cloud.labels = np.asarray(labels, dtype=str) if count else np.zeros(0, dtype="U1")
+        cloud.xyz = np.asarray(xyz, dtype=float).reshape(count, 3)
+        cloud.ijk = np.zeros((count, 3)) if ijk is None else np.asarray(ijk, dtype=float).reshape(count, 3)
+        cloud.nRays = np.zeros(count, dtype=np.int64) if nRays is None else np.asarray(nRays, dtype=np.int64)
+        cloud.nTotalRays = np.full(count, -1, dtype=np.int64) if nTotalRays is None else np.asarray(nTotalRays, dtype=np.int64)
+        cloud.offset = np.zeros(count) if offset is None else np.asarray(offset, dtype=float)
+        cloud.covariance = np.zeros((count, 3, 3)) if covariance is None else np.asarray(covariance, dtype=float).reshape(count, 3, 3)
+        return cloud
 
     def fromJSON(self, jsonStr):
-        data = json.loads(jsonStr)
+        data = loadsJson(jsonStr)
 
         top = data["GCloud"]
 
-        pointsList = list(top["points"])
+        self.fromDict(top)
+
+    def fromDict(self, top):
+        self.append(GCloud.fromPointDicts(top["points"]))
+
+    @classmethod
+    def fromPointDicts(cls, pointsList):
+        """
+        Builds a cloud from the point dicts of a GCloud json frame
+        """
+        count = len(pointsList)
+
+        labels = [Dict["label"] for Dict in pointsList]
+        xyz = np.array([(Dict["X"], Dict["Y"], Dict["Z"]) for Dict in pointsList], dtype=float).reshape(count, 3)
+        ijk = np.array([(Dict["i"], Dict["j"], Dict["k"]) for Dict in pointsList], dtype=float).reshape(count, 3)
+        nRays = np.fromiter((Dict["nRays"] for Dict in pointsList), dtype=np.int64, count=count)
+        nTotalRays = np.fromiter((Dict.get("nTotalRays", -1) for Dict in pointsList), dtype=np.int64, count=count)
+        offset = np.fromiter((Dict["offset"] for Dict in pointsList), dtype=float, count=count)
+
+        covarianceData = [Dict["covariance"]["data"] for Dict in pointsList]
+        if all(len(values) == 9 for values in covarianceData):
+            covariance = np.array(covarianceData, dtype=float).reshape(count, 3, 3)
+        else:
+            # points without a 3x3 covariance get NaN
+            covariance = np.full((count, 3, 3), np.nan)
+            for index, values in enumerate(covarianceData):
+                if len(values) == 9:
+                    covariance[index] = np.reshape(values, (3, 3))
+
+        return cls.fromArrays(labels, xyz, ijk, nRays, nTotalRays, offset, covariance)
+
+    def append(self, other):
+        """
+        Appends a GObjectPoint or all the points of another GCloud
+        """
+        if isinstance(other, GObjectPoint):
+            other = GCloud.fromArrays(
+                [other.label],
+                [(other.X, other.Y, other.Z)],
+                [(other.i, other.j, other.k)],
+                [other.nRays],
+                [other.nTotalRays],
+                [other.offset],
+                np.asarray(other.covariance.data, dtype=float).reshape(1, 3, 3)
+                if np.size(other.covariance.data) == 9
+                else np.full((1, 3, 3), np.nan),
+            )
+
+        if len(self) == 0:
+            self.labels = other.labels
+            self.xyz = other.xyz
+            self.ijk = other.ijk
+            self.nRays = other.nRays
+            self.nTotalRays = other.nTotalRays
+            self.offset = other.offset
+            self.covariance = other.covariance
+            return
+
+        self.labels = np.concatenate((self.labels, other.labels))
+        self.xyz = np.concatenate((self.xyz, other.xyz))
+        self.ijk = np.concatenate((self.ijk, other.ijk))
+        self.nRays = np.concatenate((self.nRays, other.nRays))
+        self.nTotalRays = np.concatenate((self.nTotalRays, other.nTotalRays))
+        self.offset = np.concatenate((self.offset, other.offset))
+        self.covariance = np.concatenate((self.covariance, other.covariance))
+
+    def save(self, path, epoch=None):
+        """
+        Writes the cloud to a directory of .npy files, one per column, that GCloud.open maps back without copying
+
+        .. code:: python
+
+            cloud = V.Get3D(filename="Final Results")
+            cloud.save("part1.gcloud")
+
+            # later, or in another process
+            cloud = GCloud.open("part1.gcloud")
+
+            # M-Mode: one epoch per measurement
+            for epoch in range(100):
+                V.Get3D(filename="Epoch").save("run.gcloud", epoch=epoch)
+            clouds = GCloud.openEpochs("run.gcloud")
+
+        :param path: The directory of the bundle, created if needed. An existing bundle is overwritten, also the one the cloud was opened from.
+        :param epoch: When set the cloud is saved as this epoch (an int) of a bundle of several epochs
+        """
+        if epoch is not None:
+            path = os.path.join(path, "epoch{:06d}".format(int(epoch)))
+        os.makedirs(path, exist_ok=True)
+
+        # removed first, an interrupted save leaves an incomplete bundle rather than a mix of two clouds
+        header = os.path.join(path, "gcloud.json")
+        if os.path.exists(header):
+            os.remove(header)
+
+        # each column is written aside and moved into place, the cloud may be mapped from this very bundle
+        for column in GCLOUD_COLUMNS:
+            filename = os.path.join(path, column + ".npy")
+            with open(filename + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(getattr(self, column)), allow_pickle=False)
+            os.replace(filename + ".tmp", filename)
+
+        # written last, a bundle without it is incomplete
+        with open(header + ".tmp", "w") as f:
+            json.dump({"format": "GCloud", "version": 1, "count": len(self)}, f)
+        os.replace(header + ".tmp", header)
+
+    @classmethod
+    def open(cls, path, epoch=None, mode="r"):
+        """
+        Opens a cloud written by save, the columns are memory mapped so even a large cloud opens at once
+
+        :param path: The directory of the bundle
+        :param epoch: The epoch to open in a bundle of several epochs
+        :param mode: numpy mmap_mode: "r" read only, "r+" writes go to the files, "c" writes stay in memory. None loads the columns into memory.
+        """
+        if epoch is not None:
+            path = os.path.join(path, "epoch{:06d}".format(int(epoch)))
+
+        with open(os.path.join(path, "gcloud.json")) as f:
+            header = json.load(f)
+
+        cloud = cls()
+        for column in GCLOUD_COLUMNS:
+            setattr(cloud, column, np.load(os.path.join(path, column + ".npy"), mmap_mode=mode, allow_pickle=False))
+
+        if len(cloud) != header["count"]:
+            raise Exception("The GCloud bundle {} is incomplete".format(path))
+
+        return cloud
+
+    @classmethod
+    def openEpochs(cls, path, mode="r") -> dict:
+        """
+        Opens every epoch of a bundle of several epochs
+
+        :returns: {epoch: GCloud} in epoch order
+        """
+        epochs = sorted(int(name[5:]) for name in os.listdir(path) if name.startswith("epoch") and name[5:].isdigit())
+        return {epoch: cls.open(path, epoch=epoch, mode=mode) for epoch in epochs}
 
-        for i in range(len(pointsList)):
-            Dict = pointsList[i]
-            point = GObjectPoint()
-            point.fromDict(Dict)
-            self.points.append(point)
\ No newline at end of file
@@ -0,0 +1,230 @@
+# VSTARS Ignore
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+from .gcloud import GCloud
+
+
+class GCloudIndex:
+    """
+    Spatial index over the points of a fetched GCloud for client-side queries
+
+    Answers the questions GetClosestPoint, GetFurthestPoint and SelectClosePoints ask
+    V-STARS, locally and for many points at once. Queries take and return arrays.
+
+    A KD-tree (scipy.spatial.cKDTree) is used when scipy is installed. Otherwise radius and
+    pair queries use a uniform grid and nearest neighbour queries use chunked brute force,
+    both in numpy.
+
+    .. code:: python
+
+        cloud = V.Get3D(filename="Final Results")
+        index = GCloudIndex(cloud)
+
+        closest = index.closestTo("CODE25")
+        pairs = index.pairsWithin(1.5)
+        for a, b in cloud.labels[pairs]:
+            print("{} and {} are within 1.5 of each other".format(a, b))
+
+    :param cloud: A GCloud or an (N, 3) array of points
+    :param leafSize: KD-tree leaf size
+    """
+
+    def __init__(self, cloud, leafSize=16):
+        if isinstance(cloud, GCloud):
+            self.cloud = cloud
+            self.xyz = np.ascontiguousarray(cloud.xyz, dtype=float)
+        else:
+            self.cloud = None
+            self.xyz = np.ascontiguousarray(cloud, dtype=float).reshape(-1, 3)
+
+        self.tree = cKDTree(self.xyz, leafsize=leafSize) if cKDTree is not None else None
+        self.labelIndices = None
+
+    def __len__(self):
+        return len(self.xyz)
+
+    def indexOf(self, label: str) -> int:
+        """
+        The row of the point with this label, raises KeyError if there is none
+        """
+        if self.labelIndices is None:
+            if self.cloud is None:
+                raise KeyError("The index was built without labels")
+            self.labelIndices = {str(label): i for i, label in enumerate(self.cloud.labels)}
+
+        return self.labelIndices[label]
+
+    def nearest(self, xyz, k=1):
+        """
+        The k nearest points to each query point
+
+        :param xyz: (M, 3) query points
+        :param k: number of neighbours
+
+        :returns: distances (M, k) and point indices (M, k), closest first
+        """
+        xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+        k = min(k, len(self.xyz))
+
+        if self.tree is not None:
+            distances, indices = self.tree.query(xyz, k=k)
+            return distances.reshape(len(xyz), k), indices.reshape(len(xyz), k)
+
+        distances = np.empty((len(xyz), k))
+        indices = np.empty((len(xyz), k), dtype=np.int64)
+
+        for start, block in self._blocks(xyz):
+            squared = self._squaredDistances(block)
+            if k < squared.shape[1]:
+                nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+            else:
+                nearest = np.broadcast_to(np.arange(squared.shape[1]), squared.shape).copy()
+            nearestSquared = np.take_along_axis(squared, nearest, axis=1)
+            order = np.argsort(nearestSquared, axis=1)
+            indices[start : start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+            distances[start : start + len(block)] = np.sqrt(np.take_along_axis(nearestSquared, order, axis=1))
+
+        return distances, indices
+
+    def withinRadius(self, xyz, radius):
+        """
+        The points within radius of each query point
+
+        :param xyz: (M, 3) query points
+        :param radius: search radius
+
+        :returns: a list of M index arrays
+        """
+        xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+
+        if self.tree is not None:
+            return [np.asarray(found, dtype=np.int64) for found in self.tree.query_ball_point(xyz, radius)]
+
+        queries, points = self._gridPairs(xyz, radius, selfPairs=False)
+        order = np.lexsort((points, queries))
+        queries = queries[order]
+        points = points[order]
+        splits = np.searchsorted(queries, np.arange(1, len(xyz)))
+        return np.split(points, splits)
+
+    def pairsWithin(self, distance) -> np.ndarray:
+        """
+        Every pair of points closer than distance, as in SelectClosePoints
+
+        :returns: (P, 2) array of point indices with i < j
+        """
+        if self.tree is not None:
+            return np.asarray(self.tree.query_pairs(distance, output_type="ndarray"), dtype=np.int64).reshape(-1, 2)
+
+        first, second = self._gridPairs(self.xyz, distance, selfPairs=True)
+        return np.stack((first, second), axis=1)
+
+    def closestTo(self, label: str, k=1):
+        """
+        The labels of the k points closest to the labelled point, as in GetClosestPoint
+        """
+        distances, indices = self.nearest(self.xyz[self.indexOf(label)], k=k + 1)
+        indices = indices[0][indices[0] != self.indexOf(label)][:k]
+        labels = self.cloud.labels[indices]
+        return str(labels[0]) if k == 1 else [str(label) for label in labels]
+
+    def furthestFrom(self, label: str) -> str:
+        """
+        The label of the point furthest from the labelled point, as in GetFurthestPoint
+        """
+        squared = np.sum((self.xyz - self.xyz[self.indexOf(label)]) ** 2, axis=1)
+        return str(self.cloud.labels[int(np.argmax(squared))])
+
+    def distancesFrom(self, label: str) -> np.ndarray:
+        """
+        The distance from the labelled point to every point
+        """
+        return np.sqrt(np.sum((self.xyz - self.xyz[self.indexOf(label)]) ** 2, axis=1))
+
+    def _blocks(self, xyz, budget=1 << 22):
+        """
+        Internal function to split queries so a distance block holds at most budget values
+        """
+        step = max(budget // max(len(self.xyz), 1), 1)
+        for start in range(0, len(xyz), step):
+            yield start, xyz[start : start + step]
+
+    def _squaredDistances(self, block):
+        squared = (
+            np.sum(block * block, axis=1)[:, None]
+            + np.sum(self.xyz * self.xyz, axis=1)[None, :]
+            - 2.0 * block @ self.xyz.T
+        )
+        return np.maximum(squared, 0.0)
+
+    def _gridPairs(self, queries, distance, selfPairs):
+        """
+        Internal function to find (query, point) pairs closer than distance with a uniform grid of cell size distance
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        if len(queries) == 0 or len(self.xyz) == 0 or distance <= 0:
+            return empty, empty
+
+        origin = np.minimum(self.xyz.min(axis=0), queries.min(axis=0))
+        pointCells = np.floor((self.xyz - origin) / distance).astype(np.int64) + 1
+        queryCells = np.floor((queries - origin) / distance).astype(np.int64) + 1
+        shape = np.maximum(pointCells.max(axis=0), queryCells.max(axis=0)) + 2
+
+        if float(shape[0]) * float(shape[1]) * float(shape[2]) < 2.0**62:
+            def key(cells):
+                return (cells[..., 0] * shape[1] + cells[..., 1]) * shape[2] + cells[..., 2]
+        else:
+            # too many cells for an int64 key, compare each cell's (x, y, z) as one 24 byte key
+            def key(cells):
+                return np.ascontiguousarray(cells).view("V24").ravel()
+
+        order = np.argsort(key(pointCells), kind="stable")
+        sortedKeys = key(pointCells)[order]
+
+        # walking the queries in cell order keeps the searches below sorted and cache friendly
+        queryOrder = np.argsort(key(queryCells), kind="stable")
+        queryCells = queryCells[queryOrder]
+
+        offsets = np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)], dtype=np.int64)
+        if selfPairs:
+            # each pair of neighbouring cells once: the cell itself and the 13 cells after it
+            offsets = offsets[13:]
+
+        firstParts = []
+        secondParts = []
+        for offset in offsets:
+            neighbourKeys = key(queryCells + offset)
+            lo = np.searchsorted(sortedKeys, neighbourKeys, side="left")
+            hi = np.searchsorted(sortedKeys, neighbourKeys, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+
+            first = np.repeat(queryOrder, counts)
+            starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+            second = order[starts + np.arange(total)]
+
+            if selfPairs and not offset.any():
+                keep = first < second
+                first = first[keep]
+                second = second[keep]
+
+            delta = queries[first] - self.xyz[second]
+            keep = np.einsum("ij,ij->i", delta, delta) <= distance * distance
+            firstParts.append(first[keep])
+            secondParts.append(second[keep])
+
+        if not firstParts:
+            return empty, empty
+
+        first = np.concatenate(firstParts)
+        second = np.concatenate(secondParts)
+        if selfPairs:
+            first, second = np.minimum(first, second), np.maximum(first, second)
+        return first, second
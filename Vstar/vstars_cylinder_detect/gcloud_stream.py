@@ -0,0 +1,181 @@
+# VSTARS Ignore
+import collections
+import json
+import re
+import threading
+
+from .gcloud import GCloud
+
+_POINTS_START = re.compile(r'"points"\s*:\s*\[')
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+class GCloudStreamDecoder:
+    """
+    Decodes a GCloud json frame piece by piece, while it is still arriving
+
+    The text of the frame is fed as it is received. Each complete point object is parsed
+    as soon as its closing brace arrives and every batchSize points are handed over as a
+    GCloud of batchSize rows. Only the unparsed tail of the text and the current batch are
+    held, never the whole frame, its parsed dict and the cloud at once.
+
+    Used by VSTARSClient.Get3DStream, which feeds it from the data socket; the batches are
+    read by iterating over the decoder. Once iteration has started at most maxBatches batches
+    wait to be read, after that the data socket is not read until the consumer catches up, so
+    a slow consumer holds the transfer back instead of filling memory. Before that nothing is
+    held back, V-STARS sends the frame before the reply that lets Get3DStream return.
+    Leaving the iteration early, by break or an exception, closes the stream; a stream
+    that is never iterated is closed with close or a with block.
+
+    While the frame is still arriving the loop must not send a data command (GetPicture,
+    Get3D, ...) on the same client: its object would queue behind the blocked frame. The
+    request is refused with an exception instead of hanging, see VDataRequests.register.
+
+    :param batchSize: The number of points per batch
+    :param timeout: Seconds to wait for the next batch when iterating, None waits for ever
+    :param maxBatches: The number of batches decoded ahead of the consumer
+    """
+
+    objectName = "GCloud"
+
+    def __init__(self, batchSize=10000, timeout=None, maxBatches=8):
+        self.batchSize = batchSize
+        self.timeout = timeout
+        self.decoder = json.JSONDecoder()
+        self.maxBatches = maxBatches
+        self.batches = collections.deque()
+        self.condition = threading.Condition()
+        self.iterating = False
+        self.text = ""
+        self.inPoints = False
+        self.pointsDone = False
+        self.points = []
+        self.pointCount = 0
+        self.finished = False
+        self.closed = False
+
+        # the thread iterating, and whether the data socket thread is done with the stream
+        self.consumer = None
+        self.received = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        self.consumer = threading.get_ident()
+        try:
+            while True:
+                with self.condition:
+                    self.iterating = True
+                    if not self.condition.wait_for(lambda: self.batches, timeout=self.timeout):
+                        raise Exception("A timeout occurred waiting for the GCloud points")
+                    batch = self.batches.popleft()
+                    self.condition.notify_all()
+                if batch is None:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            # the data socket thread must not wait for a consumer that has gone
+            self.consumer = None
+            self.close()
+
+    def close(self):
+        """
+        Stops decoding, the rest of the frame is read and dropped
+        """
+        with self.condition:
+            self.closed = True
+            self.finished = True
+            self.received = True
+            self.batches.clear()
+            self.condition.notify_all()
+
+    def feed(self, text: str):
+        """
+        Adds the next piece of the frame text
+        """
+        if self.pointsDone or self.finished:
+            return
+
+        text = self.text + text
+        position = 0
+
+        if not self.inPoints:
+            match = _POINTS_START.search(text)
+            if match is None:
+                # keep the tail in case "points" is split across two pieces
+                self.text = text[-64:]
+                return
+            self.inPoints = True
+            position = match.end()
+
+        while True:
+            position = _SEPARATOR.match(text, position).end()
+            if position == len(text):
+                break
+            if text[position] == "]":
+                self.pointsDone = True
+                break
+
+            try:
+                point, position = self.decoder.raw_decode(text, position)
+            except json.JSONDecodeError:
+                # the point is not complete yet
+                break
+
+            self.points.append(point)
+            if len(self.points) >= self.batchSize:
+                self.__flush()
+
+        self.text = "" if self.pointsDone else text[position:]
+
+    def finish(self):
+        """
+        Called at the end of the frame, hands over the last batch
+        """
+        if self.finished:
+            return
+        self.finished = True
+
+        if not self.pointsDone:
+            self.__put(Exception("The GCloud frame ended before its points"))
+        else:
+            if self.points:
+                self.__flush()
+            self.__put(None)
+        self.received = True
+
+    def fail(self, error):
+        """
+        Stops the iteration with error, e.g. when the command was refused
+        """
+        if not self.finished:
+            self.finished = True
+            self.__put(error)
+        self.received = True
+
+    # Private Function
+    def __flush(self):
+        try:
+            batch = GCloud.fromPointDicts(self.points)
+        except Exception as ex:
+            self.fail(ex)
+            return
+        finally:
+            self.points = []
+        self.pointCount += len(batch)
+        self.__put(batch)
+
+    # Private Function
+    def __put(self, item):
+        # blocks the data socket thread while the consumer is behind, unless it closed the stream
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed or not self.iterating or len(self.batches) < self.maxBatches)
+            if not self.closed:
+                self.batches.append(item)
+                self.condition.notify_all()
@@ -2,6 +2,8 @@
 import json
 import numpy as np
 
+from .vjson import loadsJson
+
 class GMatrix:
     def __init__(self):
         self.rows = 0
@@ -9,7 +11,7 @@ class GMatrix:
         self.data = np.ndarray((0, 0))
 
     def fromJSON(self, jsonStr):
-        json_data = json.loads(jsonStr)
+        json_data = loadsJson(jsonStr)
         top = json_data["GMatrix"]
         self.fromDict(top)
 
@@ -2,6 +2,7 @@
 import json
 
 from .utilities import *
+from .vjson import loadsJson
 
 class GPhotogrammetryProjectCompareStats:
     def __init__(self):
@@ -47,10 +48,14 @@ class GPhotogrammetryProjectCompareStats:
 
     def fromJSON(self, jsonStr):
 
-        data = json.loads(jsonStr)
+        data = loadsJson(jsonStr)
 
         top = data["GPhotogrammetryProjectCompareStats"]
 
+        self.fromDict(top)
+
+    def fromDict(self, top):
+
         self.maxObjectCovariance = matrixFromDict(top["maxObjectCovariance"])
         self.maxDreamDiff = matrixFromDict(top["maxDreamDiff"])
         self.differentPointCount = top["differentPointCount"]
@@ -1,27 +1,267 @@
 # VSTARS Ignore
-import json
+import numpy as np
 
 from .gmatrix import GMatrix
 from .gimage_point import GImagePoint
+from .gpoint_view import GPointRows, columnProperty, labelProperty
+from .vjson import loadsJson
+
+
+class GImagePointView(GImagePoint):
+    """
+    A GImagePoint that reads and writes one row of a GPicture's arrays
+    """
+
+    def __init__(self, picture, index):
+        # the values live in the picture, GImagePoint.__init__ is not called
+        self.picture = picture
+        self.index = index
+
+    x = columnProperty("picture", "xy", 0)
+    y = columnProperty("picture", "xy", 1)
+    vx = columnProperty("picture", "vxy", 0)
+    vy = columnProperty("picture", "vxy", 1)
+    label = labelProperty("picture")
+
+
+class GPicturePoints(GPointRows):
+    """
+    The image points of a GPicture as GImagePoint rows, built on demand from the picture's arrays
+    """
+
+    def __init__(self, picture):
+        GPointRows.__init__(self, picture, GImagePointView)
+        self.picture = picture
+
 
 class GPicture:
+    """
+    A picture and its image points stored column by column
+
+    **labels** (N,) str
+    **xy** (N, 2) float, the image coordinates
+    **vxy** (N, 2) float, the residuals
+
+    picture.points still gives GImagePoint rows, so ``picture.points[i].vx`` works as before;
+    the rows are views, writing to them changes the arrays.
+
+    The residual statistics are computed on the arrays, and residualStatsTable screens
+    many pictures at once:
+
+    .. code:: python
+
+        picture = V.GetPicture(index=3)
+        print(picture.residualRMS(), picture.maxResidual())
+        print(picture.labels[picture.residuals() > 0.002])
+    """
+
     def __init__(self):
         self.label = ""
         self.H = GMatrix()
-        self.points = list()
+        self.labels = np.zeros(0, dtype="U1")
+        self.xy = np.zeros((0, 2))
+        self.vxy = np.zeros((0, 2))
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def points(self) -> GPicturePoints:
+        return GPicturePoints(self)
+
+    @classmethod
+    def fromArrays(cls, labels, xy, vxy=None, label="", H=None):
+        """
+        Builds a picture from columns, the missing residuals are zeros
+        """
+        picture = cls()
+        count = len(labels)
+        picture.label = label
+        if H is not None:
+            picture.H = H
+        picture.labels = np.asarray(labels, dtype=str) if count else np.zeros(0, dtype="U1")
+        picture.xy = np.asarray(xy, dtype=float).reshape(count, 2)
+        picture.vxy = np.zeros((count, 2)) if vxy is None else np.asarray(vxy, dtype=float).reshape(count, 2)
+        return picture
 
     def fromJSON(self, jsonStr):
-        data = json.loads(jsonStr)
+        data = loadsJson(jsonStr)
 
         top = data["GPicture"]
 
+        self.fromDict(top)
+
+    def fromDict(self, top):
         self.label = top["label"]
         self.H.fromDict(top["H"])
 
-        pointsList = list(top["points"])
+        pointsList = top["points"]
+        count = len(pointsList)
+
+        labels = [Dict["label"] for Dict in pointsList]
+        xy = np.array([(Dict["x"], Dict["y"]) for Dict in pointsList], dtype=float).reshape(count, 2)
+        vxy = np.array([(Dict["vx"], Dict["vy"]) for Dict in pointsList], dtype=float).reshape(count, 2)
+
+        self.append(GPicture.fromArrays(labels, xy, vxy))
+
+    def append(self, other):
+        """
+        Appends a GImagePoint or all the image points of another GPicture
+        """
+        if isinstance(other, GImagePoint):
+            other = GPicture.fromArrays([other.label], [(other.x, other.y)], [(other.vx, other.vy)])
+
+        if len(self) == 0:
+            self.labels = other.labels
+            self.xy = other.xy
+            self.vxy = other.vxy
+            return
+
+        self.labels = np.concatenate((self.labels, other.labels))
+        self.xy = np.concatenate((self.xy, other.xy))
+        self.vxy = np.concatenate((self.vxy, other.vxy))
+
+    def residuals(self) -> np.ndarray:
+        """
+        The length of the residual of every image point, (N,)
+        """
+        return np.hypot(self.vxy[:, 0], self.vxy[:, 1])
+
+    def residualRMS(self) -> float:
+        """
+        The RMS of the residual lengths, NaN for a picture without points
+        """
+        if len(self) == 0:
+            return float("nan")
+        return float(np.sqrt(np.mean(np.einsum("ij,ij->i", self.vxy, self.vxy))))
+
+    def maxResidual(self):
+        """
+        The largest residual length and the label of its point, (NaN, "") for a picture without points
+        """
+        if len(self) == 0:
+            return float("nan"), ""
+        residuals = self.residuals()
+        index = int(np.argmax(residuals))
+        return float(residuals[index]), str(self.labels[index])
+
+    def residualHistogram(self, bins=20, range=None):
+        """
+        Histogram of the residual lengths, see numpy.histogram
+
+        :returns: (counts, binEdges)
+        """
+        return np.histogram(self.residuals(), bins=bins, range=range)
+
+    def radialTangentialResiduals(self, principalPoint=(0.0, 0.0)) -> np.ndarray:
+        """
+        The residuals split along and across the line from the principal point, (N, 2)
+
+        Column 0 is the radial part, positive away from the principal point, column 1 the
+        tangential part, positive anticlockwise. A radial pattern growing with the distance
+        points at the lens distortion; a tangential one at the decentering or the rotation.
+        Points on the principal point have no direction and get NaN.
+
+        :param principalPoint: The principal point (xp, yp) in image coordinates
+        """
+        return _radialTangential(self.xy, self.vxy, principalPoint)
+
+
+def residualStatsTable(pictures, principalPoint=(0.0, 0.0)) -> np.ndarray:
+    """
+    Residual statistics of many pictures computed in one pass over all their image points
+
+    .. code:: python
+
+        pictures = [V.GetPicture(index=i) for i in range(V.GetNumberOfPictures())]
+        stats = residualStatsTable(pictures)
+        for row in stats[stats["rms"] > 3 * np.median(stats["rms"])]:
+            print(row["label"], row["rms"], row["maxLabel"], row["maxResidual"])
+
+    :param pictures: The GPictures
+    :param principalPoint: The principal point (xp, yp), the same for all the pictures
+
+    :returns: a structured array, one row per picture, with the columns label, count,
+        rmsX, rmsY, rms, maxResidual, maxLabel, rmsRadial and rmsTangential. The statistics
+        of a picture without points are NaN.
+    """
+    sizes = np.array([len(picture) for picture in pictures], dtype=np.int64)
+
+    if sizes.sum():
+        xy = np.concatenate([picture.xy for picture in pictures if len(picture)])
+        vxy = np.concatenate([picture.vxy for picture in pictures if len(picture)])
+    else:
+        xy = np.zeros((0, 2))
+        vxy = np.zeros((0, 2))
+
+    pictureLabels = [picture.label for picture in pictures]
+    labelArrays = [picture.labels for picture in pictures]
+    return _residualStats(pictureLabels, sizes, xy, vxy, labelArrays, principalPoint)
+
+
+def _residualStats(pictureLabels, sizes, xy, vxy, labelArrays, principalPoint):
+    # xy and vxy hold the points of every picture one picture after the other, sizes[i] of picture i
+    count = len(sizes)
+    group = np.repeat(np.arange(count), sizes)
+
+    squared = vxy * vxy
+    radialTangential = _radialTangential(xy, vxy, principalPoint)
+    valid = ~np.isnan(radialTangential[:, 0])
+    validCount = np.bincount(group[valid], minlength=count)
+    radialTangentialSquared = np.where(valid[:, None], radialTangential * radialTangential, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rmsX = np.sqrt(np.bincount(group, squared[:, 0], minlength=count) / sizes)
+        rmsY = np.sqrt(np.bincount(group, squared[:, 1], minlength=count) / sizes)
+        rms = np.sqrt(np.bincount(group, squared.sum(axis=1), minlength=count) / sizes)
+        rmsRadial = np.sqrt(np.bincount(group, radialTangentialSquared[:, 0], minlength=count) / validCount)
+        rmsTangential = np.sqrt(np.bincount(group, radialTangentialSquared[:, 1], minlength=count) / validCount)
+
+    # the points of a picture are contiguous, the first point reaching the largest length is its worst
+    lengths = np.sqrt(squared.sum(axis=1))
+    first = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    hasPoints = sizes > 0
+    maxResidual = np.full(count, np.nan)
+    maxResidual[hasPoints] = np.maximum.reduceat(lengths, first[hasPoints])
+    worst = np.flatnonzero(lengths == maxResidual[group])
+    worstGroups, worstFirst = np.unique(group[worst], return_index=True)
+    maxLabels = [""] * count
+    for index, point in zip(worstGroups.tolist(), worst[worstFirst].tolist()):
+        maxLabels[index] = str(labelArrays[index][point - first[index]])
+    maxLabel = np.array(maxLabels, dtype=str)
+
+    pictureLabels = np.array([str(label) for label in pictureLabels], dtype=str)
+    table = np.empty(
+        count,
+        dtype=[
+            ("label", pictureLabels.dtype),
+            ("count", np.int64),
+            ("rmsX", np.float64),
+            ("rmsY", np.float64),
+            ("rms", np.float64),
+            ("maxResidual", np.float64),
+            ("maxLabel", maxLabel.dtype),
+            ("rmsRadial", np.float64),
+            ("rmsTangential", np.float64),
+        ],
+    )
+    table["label"] = pictureLabels
+    table["count"] = sizes
+    table["rmsX"] = rmsX
+    table["rmsY"] = rmsY
+    table["rms"] = rms
+    table["maxResidual"] = maxResidual
+    table["maxLabel"] = maxLabel
+    table["rmsRadial"] = rmsRadial
+    table["rmsTangential"] = rmsTangential
+    return table
+
 
-        for i in range(len(pointsList)):
-            Dict = pointsList[i]
-            point = GImagePoint()
-            point.fromDict(Dict)
-            self.points.append(point)
\ No newline at end of file
+def _radialTangential(xy, vxy, principalPoint):
+    offsets = xy - np.asarray(principalPoint, dtype=float)
+    distances = np.hypot(offsets[:, 0], offsets[:, 1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        directions = np.where(distances[:, None] > 0.0, offsets / distances[:, None], np.nan)
+    radial = np.einsum("ij,ij->i", vxy, directions)
+    tangential = vxy[:, 1] * directions[:, 0] - vxy[:, 0] * directions[:, 1]
+    return np.column_stack((radial, tangential))
@@ -0,0 +1,76 @@
+# VSTARS Ignore
+from collections.abc import Sequence
+
+
+def columnProperty(owner, name, column=None):
+    """
+    A property reading and writing one row of an array of the object holding the points
+
+    Used by GObjectPointView and GImagePointView, which keep the holder in the attribute
+    owner and their row in index.
+
+    :param owner: The attribute of the view holding the GCloud or GPicture
+    :param name: The array, e.g. xyz
+    :param column: The column of a 2D array, None for a 1D array
+    """
+
+    def get(self):
+        value = getattr(getattr(self, owner), name)[self.index]
+        return value[column].item() if column is not None else value.item()
+
+    def set(self, value):
+        if column is not None:
+            getattr(getattr(self, owner), name)[self.index, column] = value
+        else:
+            getattr(getattr(self, owner), name)[self.index] = value
+
+    return property(get, set)
+
+
+def labelProperty(owner):
+    """
+    A property reading and writing the label of one row, see columnProperty
+    """
+
+    def get(self):
+        return str(getattr(self, owner).labels[self.index])
+
+    def set(self, value):
+        holder = getattr(self, owner)
+        labels = holder.labels
+        if len(value) > labels.dtype.itemsize // 4:
+            # widen the label column so the new label is not truncated
+            holder.labels = labels = labels.astype("U{}".format(len(value)))
+        labels[self.index] = value
+
+    return property(get, set)
+
+
+class GPointRows(Sequence):
+    """
+    The points of a GCloud or a GPicture as rows, views built on demand from its arrays
+
+    :param source: The GCloud or GPicture
+    :param view: The view class, called with source and the row index
+    """
+
+    def __init__(self, source, view):
+        self.source = source
+        self.view = view
+
+    def __len__(self):
+        return len(self.source)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.view(self.source, i) for i in range(*index.indices(len(self.source)))]
+
+        if index < 0:
+            index += len(self.source)
+        if index < 0 or index >= len(self.source):
+            raise IndexError("point index out of range")
+
+        return self.view(self.source, index)
+
+    def append(self, point):
+        self.source.append(point)
@@ -0,0 +1,265 @@
+# VSTARS Ignore
+import re
+
+import numpy as np
+
+from .gcloud import GCloud
+
+# characters SelectPointsByLabel reads as separators or as a range, sent as the ? wild-card
+_UNSENDABLE = re.compile(r"[\s>,()]")
+
+
+class GSelection:
+    """
+    Selection buffer over a fetched GCloud, evaluated locally
+
+    Mirrors the V-STARS point selection commands (SelectPointsGreaterThan,
+    UnSelectPointsLessThan, SelectPointsByLabel, SelectPointsSigmaGreaterThan, ...) as
+    boolean masks over the cloud's arrays, so a selection is built without a round trip
+    per step. push() then sends the final set of labels to V-STARS at once.
+
+    Like the V-STARS commands, each select call adds the points it finds to the selection
+    and each unselect call removes them. Every call returns
+    (total number selected, number found).
+
+    .. code:: python
+
+        cloud = V.Get3D(filename="part1")
+        selection = GSelection(cloud, filename="part1")
+
+        selection.selectGreaterThan(z=100.0)
+        selection.unselectGreaterThan(radius=550.0)
+        selection.unselectByLabel("CODE*")
+        selection.selectSigmaGreaterThan(total=0.05)
+
+        selection.push(V)
+        V.DeleteSelection()
+
+    :param cloud: The GCloud to select from
+    :param filename: The 3D file the cloud came from, used by push
+    :param design: Set to True when the cloud holds the design points of the 3D file
+    """
+
+    def __init__(self, cloud: GCloud, filename=None, design=False):
+        self.cloud = cloud
+        self.filename = filename
+        self.design = design
+        self.mask = np.zeros(len(cloud), dtype=bool)
+        self._foldedLabels = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask))
+
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        The labels of the selected points
+        """
+        return self.cloud.labels[self.mask]
+
+    @property
+    def indices(self) -> np.ndarray:
+        """
+        The rows of the selected points in the cloud
+        """
+        return np.flatnonzero(self.mask)
+
+    def selectedCloud(self) -> GCloud:
+        """
+        A new GCloud holding only the selected points
+        """
+        c = self.cloud
+        m = self.mask
+        return GCloud.fromArrays(c.labels[m], c.xyz[m], c.ijk[m], c.nRays[m], c.nTotalRays[m], c.offset[m], c.covariance[m])
+
+    def selectAll(self):
+        self.mask[:] = True
+        return len(self), len(self)
+
+    def unselectAll(self):
+        found = len(self)
+        self.mask[:] = False
+        return 0, found
+
+    def selectGreaterThan(self, x=None, y=None, z=None, theta=None, radius=None):
+        """
+        Selects the points above every given value, as in SelectPointsGreaterThan
+
+        radius is (X^2 + Y^2)^1/2 and theta is atan2(Y, X) in degrees
+        """
+        return self.__apply(self.__coordinateMask(np.greater, x, y, z, theta, radius), True)
+
+    def selectLessThan(self, x=None, y=None, z=None, theta=None, radius=None):
+        """
+        Selects the points below every given value, as in SelectPointsLessThan
+        """
+        return self.__apply(self.__coordinateMask(np.less, x, y, z, theta, radius), True)
+
+    def unselectGreaterThan(self, x=None, y=None, z=None, theta=None, radius=None):
+        """
+        Unselects the points above every given value, as in UnSelectPointsGreaterThan
+        """
+        return self.__apply(self.__coordinateMask(np.greater, x, y, z, theta, radius), False)
+
+    def unselectLessThan(self, x=None, y=None, z=None, theta=None, radius=None):
+        """
+        Unselects the points below every given value, as in UnSelectPointsLessThan
+        """
+        return self.__apply(self.__coordinateMask(np.less, x, y, z, theta, radius), False)
+
+    def selectSigmaGreaterThan(self, sx=None, sy=None, sz=None, total=None):
+        """
+        Selects the points whose standard deviation is above every given value, as in SelectPointsSigmaGreaterThan
+
+        The sigmas are the square roots of the covariance diagonal and total is (SX^2 + SY^2 + SZ^2)^1/2.
+        Points without a covariance are never selected.
+        """
+        return self.__apply(self.__sigmaMask(sx, sy, sz, total), True)
+
+    def unselectSigmaGreaterThan(self, sx=None, sy=None, sz=None, total=None):
+        return self.__apply(self.__sigmaMask(sx, sy, sz, total), False)
+
+    def selectByLabel(self, labels: str):
+        """
+        Selects points by label, as in SelectPointsByLabel
+
+        :param labels: Labels separated by a blank space. Labels may include the wild-cards * and ?,
+            and "TARGET1>TARGET20" selects TARGET1 to TARGET20 inclusive. The comparison is case insensitive.
+        """
+        return self.__apply(self.__labelMask(labels), True)
+
+    def unselectByLabel(self, labels: str):
+        """
+        Unselects points by label, as in UnSelectPointsByLabel
+        """
+        return self.__apply(self.__labelMask(labels), False)
+
+    def push(self, vstars, filename=None):
+        """
+        Replaces the V-STARS selection buffer with the selected points
+
+        The UnselectPointsAll and SelectPointsByLabel commands are sent together, so the
+        whole selection costs a single round trip.
+
+        V-STARS has no escape for the labels it reads as patterns. A label holding * or ? is
+        sent as it is, and a blank, >, a comma or a parenthesis is sent as ?. Such a label is
+        pushed only if, evaluated here as V-STARS would, its pattern selects no point outside
+        the selection.
+
+        :param vstars: The VSTARS (or VSTARSClient) to send the selection to
+        :param filename: The 3D file to select from, the filename given to the constructor if None
+
+        :returns: (total number selected, number found) as reported by V-STARS
+
+        :raises: ValueError when a label cannot be sent without selecting other points
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details
+        """
+        filename = filename if filename is not None else self.filename
+
+        commandString = "SelectPointsByLabel("
+        if filename is not None:
+            commandString += "filename={},".format(filename)
+        commandString += "labels={},".format(" ".join(self.__labelTokens()))
+        if self.design:
+            commandString += "design=True"
+        else:
+            commandString += "measured=True"
+        commandString += ")"
+
+        if len(self) == 0:
+            reply = vstars.executeCommands(["UnselectPointsAll()"])[-1]
+        else:
+            reply = vstars.executeCommands(["UnselectPointsAll()", commandString])[-1]
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
+
+    # Private Function
+    def __labelTokens(self):
+        tokens = []
+        for label in self.labels:
+            label = str(label)
+            token = _UNSENDABLE.sub("?", label)
+            if "*" in token or "?" in token:
+                # V-STARS reads the token as a pattern, it must not reach an unselected point
+                if np.any(self.__labelMask(token) & ~self.mask):
+                    raise ValueError("The label '{}' cannot be pushed, SelectPointsByLabel would select other points with it".format(label))
+            tokens.append(token)
+        return tokens
+
+    # Private Function
+    def __apply(self, found, select):
+        if select:
+            count = int(np.count_nonzero(found & ~self.mask))
+            self.mask |= found
+        else:
+            count = int(np.count_nonzero(found & self.mask))
+            self.mask &= ~found
+        return len(self), count
+
+    # Private Function
+    def __coordinateMask(self, compare, x, y, z, theta, radius):
+        xyz = self.cloud.xyz
+        found = np.ones(len(self.cloud), dtype=bool)
+
+        for column, value in enumerate((x, y, z)):
+            if value is not None:
+                found &= compare(xyz[:, column], value)
+        if radius is not None:
+            found &= compare(np.hypot(xyz[:, 0], xyz[:, 1]), radius)
+        if theta is not None:
+            found &= compare(np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0])), theta)
+
+        return found
+
+    # Private Function
+    def __sigmaMask(self, sx, sy, sz, total):
+        variances = np.diagonal(self.cloud.covariance, axis1=1, axis2=2)
+        found = np.ones(len(self.cloud), dtype=bool)
+
+        for column, value in enumerate((sx, sy, sz)):
+            if value is not None:
+                found &= np.sqrt(variances[:, column]) > value
+        if total is not None:
+            found &= np.sqrt(np.sum(variances, axis=1)) > total
+
+        # NaN covariances compare False above, they are never selected
+        return found
+
+    # Private Function
+    def __labelMask(self, labels):
+        if self._foldedLabels is None or len(self._foldedLabels) != len(self.cloud):
+            self._foldedLabels = np.char.lower(self.cloud.labels.astype(str))
+        folded = self._foldedLabels
+        found = np.zeros(len(self.cloud), dtype=bool)
+
+        for item in labels.split():
+            item = item.lower()
+            if ">" in item:
+                first, last = item.split(">", 1)
+                found |= self.__labelRange(folded, first, last)
+            elif "*" in item or "?" in item:
+                pattern = re.compile(re.escape(item).replace(r"\*", ".*").replace(r"\?", ".") + r"\Z", re.DOTALL)
+                found |= np.fromiter((pattern.match(label) is not None for label in folded), dtype=bool, count=len(folded))
+            else:
+                found |= folded == item
+
+        return found
+
+    # Private Function
+    def __labelRange(self, folded, first, last):
+        firstMatch = re.fullmatch(r"(.*?)(\d+)", first)
+        lastMatch = re.fullmatch(r"(.*?)(\d+)", last)
+
+        if firstMatch and lastMatch and firstMatch.group(1) == lastMatch.group(1):
+            # TARGET1>TARGET20 compares the numbers after a common prefix, so TARGET3 is inside
+            prefix = firstMatch.group(1)
+            low, high = sorted((int(firstMatch.group(2)), int(lastMatch.group(2))))
+            found = np.zeros(len(folded), dtype=bool)
+            hasPrefix = np.char.startswith(folded, prefix)
+            for index in np.flatnonzero(hasPrefix):
+                suffix = folded[index][len(prefix):]
+                if suffix.isdigit():
+                    found[index] = low <= int(suffix) <= high
+            return found
+
+        low, high = sorted((first, last))
+        return (folded >= low) & (folded <= high)
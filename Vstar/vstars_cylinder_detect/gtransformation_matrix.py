@@ -1,28 +1,66 @@
 # VSTARS Ignore
-import math
-import copy
 import numpy as np
 
 from .gmatrix import GMatrix
 
+
 class GTransformationMatrix:
-    def __init__(self):
-        self.data = [[0]]
-        self.data = [[0 for y in range(4)] for x in range(4)]
+    """
+    A 4x4 transformation, scale * rotation and shift, or a stack of K of them
 
-    def rotationMatrix(self):
-        R = [[0]]
-        R = [[0 for y in range(3)] for x in range(3)]
+    **data** (4, 4) float, or (K, 4, 4) for a stack
+
+    Every method works on a stack as on a single matrix, returning one result per matrix,
+    so the alignments of many stations are handled without a Python loop.
+
+    .. code:: python
+
+        H = V.XYZAlignmentQuick(filename="Final Results", begin=True, close=True)
+        cloud = V.Get3D(filename="Scan")
+        xyz = H.apply(cloud.xyz)            # one matrix product for every point
+
+        back = H.inverse().apply(xyz)
+        both = H2.compose(H)                # H first, then H2, the same as H2 @ H
+
+        stations = GTransformationMatrix.stack([H1, H2, H3])
+        angles = stations.rotationMatrixToEulerAngles()     # (3, 3)
+    """
+
+    def __init__(self, data=None):
+        self.data = np.zeros((4, 4)) if data is None else np.array(data, dtype=float)
+
+    def __len__(self):
+        if self.data.ndim == 2:
+            raise TypeError("a single GTransformationMatrix has no len()")
+        return len(self.data)
 
-        for i in range(0, 3):
-            for j in range(0, 3):
-                R[i][j] = self.data[i][j]
+    def __getitem__(self, index):
+        if self.data.ndim == 2:
+            raise TypeError("a single GTransformationMatrix cannot be indexed")
+        return GTransformationMatrix(self.data[index])
 
-        s = 1.0 / self.scale()
+    def __matmul__(self, other):
+        return self.compose(other)
 
-        Normalized = np.dot(R, s)
+    @classmethod
+    def identity(cls, count=None):
+        """
+        The identity, or a stack of count identities
+        """
+        if count is None:
+            return cls(np.eye(4))
+        return cls(np.broadcast_to(np.eye(4), (count, 4, 4)))
 
-        return Normalized
+    @classmethod
+    def stack(cls, matrices):
+        """
+        Stacks single GTransformationMatrix objects (or 4x4 arrays) into one (K, 4, 4) stack
+        """
+        return cls(np.stack([matrix.data if isinstance(matrix, GTransformationMatrix) else np.asarray(matrix, dtype=float) for matrix in matrices]))
+
+    def rotationMatrix(self):
+        R = self.data[..., :3, :3]
+        return R / self.__scales()[..., None, None]
 
     def fromGMatrix(self, src: GMatrix):
         if src.cols != 4:
@@ -30,49 +68,101 @@ class GTransformationMatrix:
         if src.rows != 4:
             raise Exception("GMatrix must be 4x4")
 
-        self.data = copy.deepcopy(src.data)
-
-        R = self.rotationMatrix()
-
-        Rt = np.transpose(R)
-        shouldBeIdentity = np.dot(Rt, R)
-        ident = np.identity(3, float)
-        norm = np.linalg.norm(ident - shouldBeIdentity)
+        self.data = np.array(src.data, dtype=float).reshape(4, 4)
 
-        if norm > 1e-6:
+        if not self.isValid():
             raise Exception("Not a valid transformation matrix")
 
-    def scale(self):
-        R = self.data
+    def isValid(self, tolerance=1e-6) -> bool:
+        """
+        Tests that the rotation part of every matrix is orthonormal once the scale is removed
+        """
+        R = self.rotationMatrix()
+        shouldBeIdentity = np.matmul(np.swapaxes(R, -1, -2), R)
+        norm = np.linalg.norm(shouldBeIdentity - np.identity(3), axis=(-2, -1))
+        return bool(np.all(norm <= tolerance))
 
-        s1 = math.sqrt(R[0][0] * R[0][0] + R[1][0] * R[1][0] + R[2][0] * R[2][0])
-        # s2 = math.sqrt(R[0][1] * R[0][1] + R[1][1] * R[1][1] + R[2][1] * R[2][1])
-        # s3 = math.sqrt(R[0][2] * R[0][2] + R[1][2] * R[1][2] + R[2][2] * R[2][2])
-        return s1
+    def scale(self):
+        """
+        The scale, an array of K scales for a stack
+        """
+        scales = self.__scales()
+        return float(scales) if scales.ndim == 0 else scales
 
     def shift(self):
-        x = self.data[0][3]
-        y = self.data[1][3]
-        z = self.data[2][3]
-        return x, y, z
+        """
+        The shift as x, y, z, a (K, 3) array for a stack
+        """
+        if self.data.ndim == 2:
+            x = self.data[0][3]
+            y = self.data[1][3]
+            z = self.data[2][3]
+            return x, y, z
+        return self.data[:, :3, 3]
+
+    def apply(self, xyz) -> np.ndarray:
+        """
+        Transforms points
+
+        :param xyz: (N, 3) points, or (K, N, 3) with one set of points per matrix of a stack
+
+        :returns: (N, 3), or (K, N, 3) for a stack
+        """
+        xyz = np.asarray(xyz, dtype=float)
+        A = self.data[..., :3, :3]
+        shift = self.data[..., None, :3, 3]
+        return np.matmul(xyz, np.swapaxes(A, -1, -2)) + shift
+
+    def rotate(self, vectors) -> np.ndarray:
+        """
+        Rotates directions, e.g. the ijk of a cloud, without the scale and the shift
+
+        :param vectors: (N, 3), or (K, N, 3) for a stack
+        """
+        return np.matmul(np.asarray(vectors, dtype=float), np.swapaxes(self.rotationMatrix(), -1, -2))
+
+    def inverse(self):
+        """
+        The inverse transformation, the inverse of each matrix of a stack
+        """
+        # (sR)^-1 = R^T / s
+        scales = self.__scales()[..., None, None]
+        inverseA = np.swapaxes(self.data[..., :3, :3], -1, -2) / (scales * scales)
+
+        data = np.zeros(self.data.shape)
+        data[..., :3, :3] = inverseA
+        data[..., :3, 3] = -np.matmul(inverseA, self.data[..., :3, 3, None])[..., 0]
+        data[..., 3, 3] = 1.0
+        return GTransformationMatrix(data)
+
+    def compose(self, other):
+        """
+        The transformation doing other first and then self
+
+        A stack composes matrix by matrix, or broadcasts against a single matrix.
+        """
+        otherData = other.data if isinstance(other, GTransformationMatrix) else np.asarray(other, dtype=float)
+        return GTransformationMatrix(np.matmul(self.data, otherData))
 
     # Calculates rotation matrix to euler angles
     # The result is the same as MATLAB except the order
     # of the euler angles ( x and z are swapped ).
+    # A stack gives a (K, 3) array of x, y, z
     def rotationMatrixToEulerAngles(self):
 
         R = self.rotationMatrix()
-        sy = math.sqrt(R[0][0] * R[0][0] + R[1][0] * R[1][0])
+        sy = np.hypot(R[..., 0, 0], R[..., 1, 0])
 
         singular = sy < 1e-6
 
-        if not singular:
-            x = math.atan2(R[2][1], R[2][2])
-            y = math.atan2(-R[2][0], sy)
-            z = math.atan2(R[1][0], R[0][0])
-        else:
-            x = math.atan2(-R[1][2], R[1][1])
-            y = math.atan2(-R[2][0], sy)
-            z = 0
+        x = np.where(singular, np.arctan2(-R[..., 1, 2], R[..., 1, 1]), np.arctan2(R[..., 2, 1], R[..., 2, 2]))
+        y = np.arctan2(-R[..., 2, 0], sy)
+        z = np.where(singular, 0.0, np.arctan2(R[..., 1, 0], R[..., 0, 0]))
+
+        if self.data.ndim == 2:
+            return float(x), float(y), float(z)
+        return np.stack((x, y, z), axis=-1)
 
-        return x, y, z
\ No newline at end of file
+    # Private Function
+    def __scales(self):
+        return np.linalg.norm(self.data[..., :3, 0], axis=-1)
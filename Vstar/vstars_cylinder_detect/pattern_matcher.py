@@ -0,0 +1,356 @@
+# VSTARS Ignore
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .alignment_solver import _labelsAndPoints
+from .gcloud_index import GCloudIndex
+from .gtransformation_matrix import GTransformationMatrix
+
+
+class PatternMatchResult:
+    """
+    The outcome of PatternMatcher.match
+
+    **success** True when matchSuccessCount reaches minPercent of matchPatternCount
+    **matchSuccessCount** The pattern points matched, as v.matchSuccessCount
+    **matchPatternCount** The points of the pattern, as v.matchPatternCount
+    **H** GTransformationMatrix taking the pattern onto the cloud, None when nothing matched
+    **patternLabels** (M,) str, the matched pattern points
+    **targetLabels** (M,) str, the cloud point matched to each of them
+    **distances** (M,) float, the distance from each transformed pattern point to its cloud point
+    **rms** The RMS of distances, -1 when nothing matched
+    **hypotheses** The number of transformations scored
+    **parameters** The PatternRelabelRansac arguments the caller gave, the defaults left out
+    **effectiveParameters** Every value the match was made with, the client-side defaults included
+    """
+
+    def __init__(self):
+        self.success = False
+        self.matchSuccessCount = 0
+        self.matchPatternCount = 0
+        self.H = None
+        self.patternLabels = np.zeros(0, dtype="U1")
+        self.targetLabels = np.zeros(0, dtype="U1")
+        self.distances = np.zeros(0)
+        self.rms = -1
+        self.hypotheses = 0
+        self.parameters = {}
+        self.effectiveParameters = {}
+
+    def mapping(self) -> dict:
+        """
+        The relabel, the pattern label of every matched cloud point keyed by its current label
+        """
+        return {str(target): str(pattern) for target, pattern in zip(self.targetLabels, self.patternLabels)}
+
+
+class PatternMatcher:
+    """
+    Client-side RANSAC pattern matching of two fetched clouds, to tune PatternRelabelRansac
+
+    Finds where the points of a pattern lie in a cloud, whatever their labels, as
+    PatternRelabelRansac does on the server, so numTrials, distanceMatch and relabelCloseness
+    can be swept locally before the winning relabel is sent to V-STARS.
+
+    Each trial picks three pattern points at least minPatternDistance of the pattern extent
+    apart. The cloud pairs whose length is within distanceMatch of a side of the triangle are
+    read from a table of the cloud's point to point distances sorted by length, and joined
+    into the cloud triangles with the same three side lengths. The rigid transformation of
+    every candidate triangle is solved as one stack and scored at once by the pattern points
+    landing within relabelCloseness of a cloud point. The best transformation is refined on
+    its inliers and each matched cloud point kept for its closest pattern point. The trials
+    are split in chunks run on a thread pool.
+
+    .. code:: python
+
+        matcher = PatternMatcher(V.Get3D(filename="Final Results"), V.Get3D(filename="Pattern"))
+        results = matcher.sweep([{"distanceMatch": d, "relabelCloseness": c} for d in (0.1, 0.2, 0.5) for c in (0.5, 1.0)])
+        best = max(results, key=lambda result: (result.matchSuccessCount, -result.rms))
+
+        print(best.parameters, best.matchSuccessCount, best.rms)
+        V.PatternRelabelRansac(filename="Final Results", pattern="Pattern", **best.parameters)
+
+    The trials are random, pass seed to repeat a match. The distance table holds every pair
+    of cloud points closer than the pattern extent, so crop a large cloud with minx to maxz
+    as the server command does.
+
+    :param cloud: The GCloud to match, the filename of PatternRelabelRansac, or a (labels, xyz) pair
+    :param pattern: The GCloud of the pattern, or a (labels, xyz) pair
+    """
+
+    def __init__(self, cloud, pattern):
+        self.cloudLabels, self.cloudXYZ = _labelsAndPoints(cloud)
+        self.patternLabels, self.patternXYZ = _labelsAndPoints(pattern)
+
+        difference = self.patternXYZ[:, None, :] - self.patternXYZ[None, :, :]
+        self.patternDistances = np.sqrt(np.einsum("ijk,ijk->ij", difference, difference))
+        self.extent = float(self.patternDistances.max()) if len(self.patternXYZ) else 0.0
+
+        # ROI: (maximum length, the rows in the ROI, their index, their pairs sorted by length)
+        self.__tables = {}
+        self.__tablesLock = threading.Lock()
+
+    def match(
+        self,
+        relabelCloseness=None,
+        distanceMatch=None,
+        minPatternDistance=None,
+        minPercent=None,
+        numTrials=None,
+        minx=None,
+        maxx=None,
+        miny=None,
+        maxy=None,
+        minz=None,
+        maxz=None,
+        seed=None,
+        maxWorkers=None,
+        maxHypotheses=256,
+    ) -> PatternMatchResult:
+        """
+        Matches the pattern in the cloud
+
+        The parameters up to maxz are those of PatternRelabelRansac. Only the ones given are
+        kept in result.parameters, so passing them on to PatternRelabelRansac leaves the other
+        server defaults alone; distanceMatch and relabelCloseness are disabled there by default.
+
+        :param relabelCloseness: How close a transformed pattern point must be to a cloud point to match it, distanceMatch if None
+        :param distanceMatch: The tolerance on the distances compared to find candidate points, 0.5% of the pattern extent if None
+        :param minPatternDistance: The shortest side of a trial triangle, as a fraction of the pattern extent (default 0.1)
+        :param minPercent: The fraction of the pattern points to match for a success (default 0.5)
+        :param numTrials: The number of trial triangles (default 100)
+        :param seed: Seed of the random trials
+        :param maxWorkers: The threads running the trials, the ThreadPoolExecutor default if None
+        :param maxHypotheses: The most cloud triangles scored for one trial, a random sample of them above that
+        """
+        given = (
+            ("relabelCloseness", relabelCloseness),
+            ("distanceMatch", distanceMatch),
+            ("minPatternDistance", minPatternDistance),
+            ("minPercent", minPercent),
+            ("numTrials", numTrials),
+            ("minx", minx),
+            ("maxx", maxx),
+            ("miny", miny),
+            ("maxy", maxy),
+            ("minz", minz),
+            ("maxz", maxz),
+        )
+
+        distanceMatch = 0.005 * self.extent if distanceMatch is None else float(distanceMatch)
+        relabelCloseness = distanceMatch if relabelCloseness is None else float(relabelCloseness)
+        minPatternDistance = 0.1 if minPatternDistance is None else minPatternDistance
+        minPercent = 0.5 if minPercent is None else minPercent
+        numTrials = 100 if numTrials is None else numTrials
+        roi = (minx, maxx, miny, maxy, minz, maxz)
+
+        result = PatternMatchResult()
+        result.matchPatternCount = len(self.patternLabels)
+        result.parameters = {name: value for name, value in given if value is not None}
+        result.effectiveParameters = dict(
+            result.parameters,
+            relabelCloseness=relabelCloseness,
+            distanceMatch=distanceMatch,
+            minPatternDistance=minPatternDistance,
+            minPercent=minPercent,
+            numTrials=numTrials,
+        )
+
+        rows, index, pairs, lengths = self.__table(roi, self.extent + distanceMatch)
+        seeds = np.random.SeedSequence(seed)
+        triangles = self.__triangles(np.random.default_rng(seeds.spawn(1)[0]), numTrials, minPatternDistance * self.extent, distanceMatch)
+        if len(rows) < 3 or len(triangles) == 0:
+            return result
+
+        # one seed per trial, so a seeded match does not depend on the number of threads
+        trialSeeds = seeds.spawn(len(triangles))
+
+        def runTrials(chunk):
+            return self.__runTrials(triangles[chunk], [trialSeeds[trial] for trial in chunk], index, pairs, lengths, distanceMatch, relabelCloseness, maxHypotheses)
+
+        chunks = np.array_split(np.arange(len(triangles)), min(len(triangles), maxWorkers or os.cpu_count() or 1))
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+                found = list(executor.map(runTrials, chunks))
+        else:
+            found = [runTrials(chunk) for chunk in chunks]
+
+        result.hypotheses = sum(hypotheses for best, hypotheses in found)
+        candidates = [best for best, hypotheses in found if best is not None]
+        if not candidates:
+            return result
+
+        count, sse, H = max(candidates, key=lambda best: (best[0], -best[1]))
+        H, patternRows, cloudRows, distances = self.__refine(H, index, relabelCloseness)
+
+        result.H = GTransformationMatrix(H)
+        result.patternLabels = self.patternLabels[patternRows]
+        result.targetLabels = self.cloudLabels[rows[cloudRows]]
+        result.distances = distances
+        result.matchSuccessCount = len(patternRows)
+        result.rms = float(np.sqrt(np.mean(distances * distances))) if len(distances) else -1
+        result.success = result.matchSuccessCount >= minPercent * result.matchPatternCount
+        return result
+
+    def sweep(self, parameterSets, maxWorkers=None) -> list:
+        """
+        Runs match with each dict of arguments, several matches at a time
+
+        :param parameterSets: The match keyword arguments of each run
+        :param maxWorkers: The matches run at the same time, the ThreadPoolExecutor default if None
+
+        :returns: the PatternMatchResult of each run, in order
+        """
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            return list(executor.map(lambda parameters: self.match(**dict({"maxWorkers": 1}, **parameters)), parameterSets))
+
+    # Private Function
+    def __table(self, roi, maximumLength):
+        # a table built for longer pairs serves shorter ones, only the lengths near a side are read,
+        # so it is built with some margin for the distanceMatch values of a sweep
+        with self.__tablesLock:
+            if roi not in self.__tables or self.__tables[roi][0] < maximumLength:
+                self.__tables[roi] = self.__buildTable(roi, max(maximumLength, 1.05 * self.extent))
+            return self.__tables[roi][1:]
+
+    # Private Function
+    def __buildTable(self, roi, maximumLength):
+        inside = np.ones(len(self.cloudXYZ), dtype=bool)
+        for axis, (low, high) in enumerate(zip(roi[0::2], roi[1::2])):
+            if low is not None:
+                inside &= self.cloudXYZ[:, axis] >= low
+            if high is not None:
+                inside &= self.cloudXYZ[:, axis] <= high
+        rows = np.flatnonzero(inside)
+        index = GCloudIndex(self.cloudXYZ[rows])
+
+        # both directions of every pair, so a side can be matched either way round
+        pairs = index.pairsWithin(maximumLength)
+        pairs = np.concatenate((pairs, pairs[:, ::-1]))
+        lengths = np.linalg.norm(index.xyz[pairs[:, 0]] - index.xyz[pairs[:, 1]], axis=1)
+        order = np.argsort(lengths, kind="stable")
+        return maximumLength, rows, index, pairs[order], lengths[order]
+
+    # Private Function
+    def __triangles(self, rng, numTrials, minDistance, distanceMatch):
+        # numTrials pattern triangles (a, b, c), sides at least minDistance, c off the line ab
+        count = len(self.patternXYZ)
+        if count < 3:
+            return np.zeros((0, 3), dtype=np.int64)
+
+        D = self.patternDistances
+        first, second = np.nonzero(np.triu(D >= max(minDistance, 4.0 * distanceMatch), k=1))
+        if len(first) == 0:
+            return np.zeros((0, 3), dtype=np.int64)
+        chosen = rng.integers(len(first), size=numTrials)
+        a, b = first[chosen], second[chosen]
+
+        ab = self.patternXYZ[b] - self.patternXYZ[a]
+        ac = self.patternXYZ[None, :, :] - self.patternXYZ[a][:, None, :]
+        heights = np.linalg.norm(np.cross(ab[:, None, :], ac), axis=2) / D[a, b][:, None]
+        valid = (D[a] >= minDistance) & (D[b] >= minDistance) & (heights >= 4.0 * distanceMatch)
+
+        c = np.argmax(rng.random((numTrials, count)) * valid, axis=1)
+        keep = valid.any(axis=1)
+        return np.stack((a[keep], b[keep], c[keep]), axis=1)
+
+    # Private Function
+    def __runTrials(self, triangles, trialSeeds, index, pairs, lengths, distanceMatch, relabelCloseness, maxHypotheses):
+        # the best (inlier count, sum of squared inlier distances, transformation) of the trials
+        best = None
+        hypotheses = 0
+        D = self.patternDistances
+
+        for (a, b, c), trialSeed in zip(triangles, trialSeeds):
+            ab = pairs[np.searchsorted(lengths, D[a, b] - distanceMatch) : np.searchsorted(lengths, D[a, b] + distanceMatch, side="right")]
+            ac = pairs[np.searchsorted(lengths, D[a, c] - distanceMatch) : np.searchsorted(lengths, D[a, c] + distanceMatch, side="right")]
+            if len(ab) == 0 or len(ac) == 0:
+                continue
+
+            # join the ab and ac pairs on their first point, then check the bc side
+            ac = ac[np.argsort(ac[:, 0], kind="stable")]
+            starts = np.searchsorted(ac[:, 0], ab[:, 0])
+            counts = np.searchsorted(ac[:, 0], ab[:, 0], side="right") - starts
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            joined = np.repeat(np.arange(len(ab)), counts)
+            k = ac[np.repeat(starts, counts) + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts), 1]
+            i, j = ab[joined, 0], ab[joined, 1]
+
+            bc = np.linalg.norm(index.xyz[j] - index.xyz[k], axis=1)
+            keep = (np.abs(bc - D[b, c]) <= distanceMatch) & (j != k)
+            i, j, k = i[keep], j[keep], k[keep]
+            if len(i) == 0:
+                continue
+            if len(i) > maxHypotheses:
+                sample = np.random.default_rng(trialSeed).choice(len(i), size=maxHypotheses, replace=False)
+                i, j, k = i[sample], j[sample], k[sample]
+
+            source = np.broadcast_to(self.patternXYZ[[a, b, c]], (len(i), 3, 3))
+            target = np.stack((index.xyz[i], index.xyz[j], index.xyz[k]), axis=1)
+            transforms = _rigidTransforms(source, target)
+            hypotheses += len(transforms)
+
+            distances = self.__score(transforms, index)
+            inliers = distances <= relabelCloseness
+            inlierCounts = inliers.sum(axis=1)
+            sse = np.where(inliers, distances * distances, 0.0).sum(axis=1)
+            top = np.lexsort((sse, -inlierCounts))[0]
+            if best is None or (inlierCounts[top], -sse[top]) > (best[0], -best[1]):
+                best = (int(inlierCounts[top]), float(sse[top]), transforms[top])
+
+        return best, hypotheses
+
+    # Private Function
+    def __score(self, transforms, index):
+        # the distance from every transformed pattern point to its closest cloud point, (K, N)
+        moved = np.matmul(self.patternXYZ, np.swapaxes(transforms[:, :3, :3], 1, 2)) + transforms[:, None, :3, 3]
+        distances, nearest = index.nearest(moved.reshape(-1, 3))
+        return distances[:, 0].reshape(len(transforms), len(self.patternXYZ))
+
+    # Private Function
+    def __refine(self, H, index, relabelCloseness):
+        # solve again on the inliers while that gains inliers
+        best = None
+        for iteration in range(10):
+            moved = self.patternXYZ @ H[:3, :3].T + H[:3, 3]
+            distances, nearest = index.nearest(moved)
+            distances, nearest = distances[:, 0], nearest[:, 0]
+            inliers = np.flatnonzero(distances <= relabelCloseness)
+            if best is not None and len(inliers) <= len(best[1]):
+                if len(inliers) < len(best[1]):
+                    H, inliers, nearest, distances = best
+                break
+            best = (H, inliers, nearest, distances)
+            if len(inliers) < 3:
+                break
+            H = _rigidTransforms(self.patternXYZ[inliers][None], index.xyz[nearest[inliers]][None])[0]
+
+        # a cloud point matched by several pattern points keeps the closest
+        inliers = inliers[np.argsort(distances[inliers], kind="stable")]
+        unique = np.unique(nearest[inliers], return_index=True)[1]
+        inliers = np.sort(inliers[unique])
+        return H, inliers, nearest[inliers], distances[inliers]
+
+
+def _rigidTransforms(source, target):
+    # the (K, 4, 4) rotations and shifts taking each (K, P, 3) source onto its target
+    sourceMean = source.mean(axis=1)
+    targetMean = target.mean(axis=1)
+    covariance = np.matmul(np.swapaxes(target - targetMean[:, None, :], 1, 2), source - sourceMean[:, None, :])
+
+    U, S, Vt = np.linalg.svd(covariance)
+    signs = np.ones((len(source), 3))
+    signs[:, 2] = np.sign(np.linalg.det(U) * np.linalg.det(Vt))
+    signs[signs == 0.0] = 1.0
+    R = np.matmul(U * signs[:, None, :], Vt)
+
+    transforms = np.zeros((len(source), 4, 4))
+    transforms[:, :3, :3] = R
+    transforms[:, :3, 3] = targetMean - np.matmul(R, sourceMean[:, :, None])[:, :, 0]
+    transforms[:, 3, 3] = 1.0
+    return transforms
@@ -0,0 +1,120 @@
+# VSTARS Ignore
+import numpy as np
+
+from .gmatrix import GMatrix
+from .gpicture import GPicture, _residualStats
+from .vjson import pausedGarbageCollection
+
+
+def decodePicture(jsonStr) -> GPicture:
+    """
+    Decodes a GPicture json frame, run by VSTARSClient.GetPictures on its executor
+    """
+    picture = GPicture()
+    if len(jsonStr) >= 1 << 20:
+        with pausedGarbageCollection():
+            picture.fromJSON(jsonStr)
+    else:
+        picture.fromJSON(jsonStr)
+    return picture
+
+
+class PictureSet:
+    """
+    The image points of many pictures in one flat table
+
+    The points of picture p are the rows offsets[p] to offsets[p + 1] of the point columns:
+
+    **indices** (P,) int, the V-STARS picture index
+    **pictureLabels** (P,) str
+    **H** list of P GMatrix
+    **offsets** (P + 1,) int
+    **labels** (N,) str
+    **xy** (N, 2) float, the image coordinates
+    **vxy** (N, 2) float, the residuals
+
+    pictureSet[p] gives picture p as a GPicture whose arrays are views of the table.
+
+    .. code:: python
+
+        pictures = V.GetAllPictures()
+        stats = pictures.residualStats()
+        bad = np.hypot(pictures.vxy[:, 0], pictures.vxy[:, 1]) > 0.003
+        for p, label in zip(pictures.observationPictures()[bad], pictures.labels[bad]):
+            print(pictures.indices[p], label)
+    """
+
+    def __init__(self):
+        self.indices = np.zeros(0, dtype=np.int64)
+        self.pictureLabels = np.zeros(0, dtype="U1")
+        self.H = []
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.labels = np.zeros(0, dtype="U1")
+        self.xy = np.zeros((0, 2))
+        self.vxy = np.zeros((0, 2))
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, position) -> GPicture:
+        if position < 0:
+            position += len(self)
+        if position < 0 or position >= len(self):
+            raise IndexError("picture index out of range")
+
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return GPicture.fromArrays(
+            self.labels[start:end],
+            self.xy[start:end],
+            self.vxy[start:end],
+            label=str(self.pictureLabels[position]),
+            H=self.H[position],
+        )
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    @classmethod
+    def fromPictures(cls, pictures, indices=None):
+        """
+        Builds the table from GPictures
+
+        :param pictures: The GPictures
+        :param indices: The V-STARS index of each picture, 0, 1, 2... if None
+        """
+        pictureSet = cls()
+        count = len(pictures)
+        sizes = np.array([len(picture) for picture in pictures], dtype=np.int64)
+
+        pictureSet.indices = np.arange(count, dtype=np.int64) if indices is None else np.asarray(indices, dtype=np.int64)
+        pictureSet.pictureLabels = np.array([str(picture.label) for picture in pictures], dtype=str)
+        pictureSet.H = [picture.H if picture.H is not None else GMatrix() for picture in pictures]
+        pictureSet.offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+
+        withPoints = [picture for picture in pictures if len(picture)]
+        if withPoints:
+            pictureSet.labels = np.concatenate([picture.labels for picture in withPoints])
+            pictureSet.xy = np.concatenate([picture.xy for picture in withPoints])
+            pictureSet.vxy = np.concatenate([picture.vxy for picture in withPoints])
+
+        return pictureSet
+
+    def sizes(self) -> np.ndarray:
+        """
+        The number of points of each picture, (P,)
+        """
+        return np.diff(self.offsets)
+
+    def observationPictures(self) -> np.ndarray:
+        """
+        The position in the set of the picture of every point, (N,)
+        """
+        return np.repeat(np.arange(len(self)), self.sizes())
+
+    def residualStats(self, principalPoint=(0.0, 0.0)) -> np.ndarray:
+        """
+        Residual statistics of every picture, see residualStatsTable
+        """
+        labelArrays = [self.labels[self.offsets[p] : self.offsets[p + 1]] for p in range(len(self))]
+        return _residualStats(self.pictureLabels, self.sizes(), self.xy, self.vxy, labelArrays, principalPoint)
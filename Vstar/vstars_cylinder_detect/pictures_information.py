@@ -0,0 +1,85 @@
+# VSTARS Ignore
+import numpy as np
+
+# The values returned by Pictures.Information: (key, column, kind)
+# kind is f (float, NaN when missing), i (int, -1 when missing) or U (str, "" when missing)
+PICTURES_INFORMATION_FIELDS = (
+    ("v.pictureX", "pictureX", "f"),
+    ("v.pictureY", "pictureY", "f"),
+    ("v.pictureZ", "pictureZ", "f"),
+    ("v.pictureAzimuth", "pictureAzimuth", "f"),
+    ("v.pictureElevation", "pictureElevation", "f"),
+    ("v.pictureRoll", "pictureRoll", "f"),
+    ("v.pictureTotalResidualRMS", "pictureTotalResidualRMS", "f"),
+    ("v.pictureNumberOfPoints", "pictureNumberOfPoints", "i"),
+    ("v.pictureNumberOfNonScanPoints", "pictureNumberOfNonScanPoints", "i"),
+    ("v.pictureNumberOfCodes", "pictureNumberOfCodes", "i"),
+    ("v.pictureNumberOfResectionPoints", "pictureNumberOfResectionPoints", "i"),
+    ("v.pictureNumberOfResectionCodes", "pictureNumberOfResectionCodes", "i"),
+    ("v.day", "day", "i"),
+    ("v.month", "month", "i"),
+    ("v.year", "year", "i"),
+    ("v.hour", "hour", "i"),
+    ("v.minute", "minute", "i"),
+    ("v.second", "second", "f"),
+    ("v.xres", "xres", "i"),
+    ("v.yres", "yres", "i"),
+    ("v.shutterUS", "shutterUS", "f"),
+    ("v.strobe", "strobe", "f"),
+    ("v.compression", "compression", "i"),
+    ("v.compressionQuality", "compressionQuality", "i"),
+    ("v.compressionString", "compressionString", "U"),
+    ("v.serialNumber", "serialNumber", "U"),
+    ("v.firmware1", "firmware1", "i"),
+    ("v.firmware2", "firmware2", "i"),
+    ("v.firmware3", "firmware3", "i"),
+    ("v.firmware4", "firmware4", "i"),
+    ("v.timeStamp", "timeStamp", "i"),
+    ("v.cameraName", "cameraName", "U"),
+    ("v.imageName", "imageName", "U"),
+    ("v.iso", "iso", "f"),
+    ("v.fnumber", "fnumber", "f"),
+    ("v.whiteBalance", "whiteBalance", "U"),
+    ("v.shutterCount", "shutterCount", "i"),
+)
+
+
+def picturesInformationTable(results, indices) -> np.ndarray:
+    """
+    Builds the table returned by VSTARSClient.PicturesInformationAll
+
+    :param results: The Pictures.Information CommandResult of each picture
+    :param indices: The picture index of each result
+
+    :returns: a structured array, one row per picture. The columns are index, resected
+        (pictureTotalResidualRMS >= 0) and the PICTURES_INFORMATION_FIELDS columns.
+    """
+    count = len(results)
+    columns = {"index": np.asarray(indices, dtype=np.int64).reshape(count)}
+
+    for key, column, kind in PICTURES_INFORMATION_FIELDS:
+        values = [result.getValue(key) for result in results]
+        if kind == "U":
+            strings = ["" if value is None else str(value) for value in values]
+            columns[column] = np.array(strings, dtype="U{}".format(max([len(s) for s in strings] + [1])))
+        elif kind == "f":
+            columns[column] = np.array([_number(value, float, np.nan) for value in values], dtype=np.float64)
+        else:
+            columns[column] = np.array([_number(value, int, -1) for value in values], dtype=np.int64)
+
+    columns["resected"] = columns["pictureTotalResidualRMS"] >= 0.0
+
+    table = np.empty(count, dtype=[(name, values.dtype) for name, values in columns.items()])
+    for name, values in columns.items():
+        table[name] = values
+    return table
+
+
+def _number(value, convert, missing):
+    # bool is an int, but a true/false reply is not a number of this table
+    if value is None or isinstance(value, bool):
+        return missing
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        return missing
@@ -0,0 +1,179 @@
+# VSTARS Ignore
+import collections
+import concurrent.futures
+import threading
+
+
+class VDataRequests:
+    """
+    The requests waiting for an object on the data socket, one future per request
+
+    V-STARS does not say which command an object on the data socket answers, but it runs the
+    commands in the order they are received and sends their objects in that order. A request
+    is registered, under the client's request lock, just before its command is sent, so the
+    n-th GCloud received resolves the n-th GCloud request, whichever thread made it. Get3D
+    and GetSelection on two threads, or a GetPicture racing an alignment, each get their own
+    object instead of sharing one attribute of the client.
+
+    .. code:: python
+
+        request = requests.register("GCloud")
+        V.executeCommands(["Get3D(filename=Scan)"])
+        cloud = requests.wait(request, timeout=60, name="Get3D")
+
+    A request that timed out keeps its place, so the object arriving late is dropped rather
+    than handed to the next request of the same kind.
+
+    A raw request receives the json text of its frame instead of the decoded object, so the
+    decoding can be done off the data socket thread (see VSTARSClient.GetPictures). A stream
+    request has its frame fed to a GCloudStreamDecoder while it arrives (see
+    VSTARSClient.Get3DStream), it takes its turn like any other request.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # objectName: deque of (future, raw, stream), oldest first
+        self.pending = collections.defaultdict(collections.deque)
+        # the streams the data socket thread may still be feeding
+        self.streams = []
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(requests) for requests in self.pending.values())
+
+    def register(self, objectName: str, raw=False, stream=None) -> concurrent.futures.Future:
+        """
+        Adds a request for the next objectName object not claimed by an earlier request
+
+        :param objectName: GCloud, GPicture, GMatrix, scalebars or GPhotogrammetryProjectCompareStats
+        :param raw: When True the request receives the json text of the frame
+        :param stream: A GCloudStreamDecoder fed the frame text, the request then receives the stream
+
+        :raises: Exception when called from the loop over a stream still being received, the
+            object would wait behind the stream's frame, which waits for the loop
+        """
+        future = concurrent.futures.Future()
+        with self.lock:
+            self.streams = [waiting for waiting in self.streams if not waiting.received]
+            if any(waiting.consumer == threading.get_ident() for waiting in self.streams):
+                raise Exception("A data command cannot be sent inside the loop over Get3DStream, leave the loop or read the batches first")
+            if stream is not None:
+                self.streams.append(stream)
+            self.pending[objectName].append((future, raw, stream))
+        return future
+
+    def discard(self, future: concurrent.futures.Future):
+        """
+        Removes a request whose command failed, V-STARS sends no object for it
+        """
+        with self.lock:
+            for requests in self.pending.values():
+                for request in requests:
+                    if request[0] is future:
+                        requests.remove(request)
+                        return
+
+    def resolve(self, objectName: str, value) -> bool:
+        """
+        Hands an object received on the data socket to the oldest request for it
+
+        :returns: False if no request was waiting for it
+        """
+        with self.lock:
+            requests = self.pending.get(objectName)
+            if not requests:
+                return False
+            future, raw, stream = requests.popleft()
+
+        # a request that timed out swallows its late object, wait may cancel it at any time
+        if future.set_running_or_notify_cancel():
+            future.set_result(value)
+        return True
+
+    def resolveRaw(self, objectName: str, jsonStr: str) -> bool:
+        """
+        Hands the json text of a frame to the oldest request for objectName if it is a raw request
+
+        A stream request that did not get its frame while it arrived is fed the whole text.
+
+        :returns: False if that request wants the decoded object, or there is none
+        """
+        with self.lock:
+            requests = self.pending.get(objectName)
+            if not requests or not (requests[0][1] or requests[0][2]):
+                return False
+            future, raw, stream = requests.popleft()
+
+        if stream is not None:
+            stream.feed(jsonStr)
+            stream.finish()
+            jsonStr = stream
+
+        if future.set_running_or_notify_cancel():
+            future.set_result(jsonStr)
+        return True
+
+    def claimStream(self, objectName: str):
+        """
+        Takes the oldest request for objectName if it is a stream request, at the start of its frame
+
+        :returns: the GCloudStreamDecoder the frame goes to, None if the frame is not streamed
+        """
+        with self.lock:
+            requests = self.pending.get(objectName)
+            if not requests or requests[0][2] is None:
+                return None
+            future, raw, stream = requests.popleft()
+
+        if future.set_running_or_notify_cancel():
+            future.set_result(stream)
+        return stream
+
+    def discardFailed(self, requests, results) -> list:
+        """
+        Removes the requests left without an object by the failed commands of a batch
+
+        V-STARS sends no object for a failed command. The objects of the commands after it
+        may already have gone to the requests in order, so the last requests of the batch are
+        the ones left without an object. Call it before a later data request is registered.
+
+        :param requests: The requests of the batch, in the order of the commands
+        :param results: The CommandResult of each command
+
+        :returns: the failed results
+        """
+        failed = [result for result in results if result.isError]
+        for request in requests[len(requests) - len(failed) :]:
+            self.discard(request)
+        return failed
+
+    def failAll(self, error: Exception):
+        """
+        Ends every waiting request with error, e.g. when the connection is closed
+        """
+        with self.lock:
+            entries = [(future, stream) for requests in self.pending.values() for future, raw, stream in requests]
+            self.pending.clear()
+
+        for future, stream in entries:
+            if stream is not None:
+                stream.fail(error)
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def wait(self, future: concurrent.futures.Future, timeout=None, name="the data"):
+        """
+        Waits for the object of a request
+
+        :param timeout: Seconds to wait, None waits for ever
+        :param name: The command named in the timeout error
+
+        :raises: Exception when the timeout is reached
+        """
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            # the object may have arrived in the meantime
+            if future.cancel():
+                raise Exception("A timeout occurred waiting for {}".format(name))
+            return future.result()
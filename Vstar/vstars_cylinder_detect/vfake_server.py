@@ -0,0 +1,551 @@
+# VSTARS Ignore
+import argparse
+import collections
+import json
+import socket
+import threading
+import time
+
+import numpy as np
+
+
+def makeCloudJson(count: int, seed=0) -> str:
+    """
+    A synthetic GCloud json frame with count points, as V-STARS sends on the data socket
+    """
+    rng = np.random.default_rng(seed)
+    xyz = rng.uniform(-1000.0, 1000.0, (count, 3)).round(6)
+    ijk = rng.normal(size=(count, 3))
+    ijk = (ijk / np.linalg.norm(ijk, axis=1)[:, None]).round(6)
+    nRays = rng.integers(2, 40, count)
+    sigmas = rng.uniform(0.001, 0.05, (count, 3)).round(6) ** 2
+
+    points = []
+    for index in range(count):
+        covariance = [0.0] * 9
+        covariance[0], covariance[4], covariance[8] = sigmas[index].tolist()
+        points.append(
+            {
+                "label": "TARGET{}".format(index + 1),
+                "X": xyz[index, 0].item(),
+                "Y": xyz[index, 1].item(),
+                "Z": xyz[index, 2].item(),
+                "i": ijk[index, 0].item(),
+                "j": ijk[index, 1].item(),
+                "k": ijk[index, 2].item(),
+                "nRays": nRays[index].item(),
+                "nTotalRays": nRays[index].item() + 2,
+                "offset": 0.0,
+                "covariance": {"rows": 3, "cols": 3, "data": covariance},
+            }
+        )
+
+    return json.dumps({"GCloud": {"points": points}})
+
+
+def makePictureInformation(index: int, seed=0) -> dict:
+    """
+    Synthetic Pictures.Information values of picture index, as a dict of reply values
+    """
+    rng = np.random.default_rng((seed, index))
+    x, y, z = rng.uniform(-5000.0, 5000.0, 3).round(4).tolist()
+    azimuth, elevation, roll = rng.uniform(-180.0, 180.0, 3).round(4).tolist()
+    points = int(rng.integers(50, 500))
+    codes = int(rng.integers(0, 20))
+    return {
+        "v.pictureX": x,
+        "v.pictureY": y,
+        "v.pictureZ": z,
+        "v.pictureAzimuth": azimuth,
+        "v.pictureElevation": elevation,
+        "v.pictureRoll": roll,
+        "v.pictureTotalResidualRMS": -1.0 if index % 50 == 49 else round(float(rng.uniform(0.0002, 0.002)), 6),
+        "v.pictureNumberOfPoints": points,
+        "v.pictureNumberOfNonScanPoints": points,
+        "v.pictureNumberOfCodes": codes,
+        "v.pictureNumberOfResectionPoints": points - 10,
+        "v.pictureNumberOfResectionCodes": codes,
+        "v.day": 18,
+        "v.month": 10,
+        "v.year": 2026,
+        "v.hour": 9,
+        "v.minute": index // 60 % 60,
+        "v.second": index % 60,
+        "v.xres": 5120,
+        "v.yres": 5120,
+        "v.shutterUS": 50,
+        "v.strobe": 16,
+        "v.compression": 2,
+        "v.compressionQuality": 95,
+        "v.serialNumber": 4101,
+        "v.firmware1": 4,
+        "v.firmware2": 2,
+        "v.firmware3": 0,
+        "v.firmware4": 1,
+        "v.timeStamp": 1000000 + index * 40000,
+        "v.cameraName": "INCA4",
+        "v.imageName": "IMG{:04d}.jpg".format(index + 1),
+    }
+
+
+def makePictureJson(count: int, seed=0, label="1") -> str:
+    """
+    A synthetic GPicture json frame with count image points
+    """
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(-18.0, 18.0, (count, 2)).round(6)
+    residuals = rng.normal(scale=0.0005, size=(count, 2)).round(8)
+
+    points = []
+    for index in range(count):
+        points.append(
+            {
+                "label": "TARGET{}".format(index + 1),
+                "x": xy[index, 0].item(),
+                "y": xy[index, 1].item(),
+                "vx": residuals[index, 0].item(),
+                "vy": residuals[index, 1].item(),
+            }
+        )
+
+    H = {"rows": 4, "cols": 4, "data": np.eye(4).ravel().tolist()}
+    return json.dumps({"GPicture": {"label": label, "H": H, "points": points}})
+
+
+def makeScaleBarsJson(count: int) -> str:
+    """
+    A synthetic scalebars json frame with count scale bars of one distance each
+    """
+    scaleBars = []
+    for index in range(count):
+        distance = {
+            "tuple_element0": "SCALE{}".format(2 * index + 1),
+            "tuple_element1": "SCALE{}".format(2 * index + 2),
+            "tuple_element2": True,
+            "tuple_element3": False,
+            "tuple_element4": 1000.0,
+            "tuple_element5": 0.001,
+        }
+        scaleBars.append({"tuple_element0": "Bar{}".format(index + 1), "tuple_element1": True, "tuple_element2": "mm", "tuple_element3": [distance]})
+
+    return json.dumps({"scalebars": scaleBars})
+
+
+class VFakeError(Exception):
+    """
+    Raised by a VFakeServer handler to send a vstarsError reply
+    """
+
+
+class VFakeServer:
+    """
+    Local stand-in for V-STARS, for benchmarking and testing without a live V-STARS
+
+    Speaks the V-STARS protocol: NUL terminated commands come in on the command port, each
+    gets a ``{v.command=Name;v.key=value;...}`` reply (or a ``vstarsError{...}`` one), and
+    objects are pushed as ``<json>...<\\json>`` frames on the data port (command port + 1).
+
+    Get3D and GetSelection push a synthetic GCloud of cloudSize points, GetPicture a
+    GPicture of pictureSize points and GetScaleBars a set of scale bars. The frames are
+    built once per size and reused. GetNumberOfPictures reports pictureCount pictures,
+    ProjectPath reports projectPath and Pictures.Information answers with synthetic values.
+    Any other command gets an empty reply unless a handler was registered for it.
+
+    Several clients can connect at once, e.g. a VSTARSPool. A frame goes only to the data
+    connection of the client whose command produced it. A client opens its data connection
+    right after its command connection, so the two are paired in the order they connect.
+
+    .. code:: python
+
+        from vstars import VSTARSClient, VFakeServer
+
+        with VFakeServer(latency=0.001, cloudSize=50000) as server:
+            V = VSTARSClient()
+            V.init(server.address, server.port)
+            cloud = V.Get3D(filename="Final Results")
+
+            server.setHandler("Project.Bundle.Run", lambda args: {"v.bundleTotalRMSX": 0.01})
+            server.setError("DeleteSelection", "Nothing is selected")
+
+    It can also be run on its own::
+
+        python -m vstars_cylinder_detect.vfake_server --port 1210 --latency 0.001
+
+    :param address: The address to listen on
+    :param port: The command port, the data port is port + 1. 0 picks a free pair of ports
+    :param latency: Seconds slept before each reply, to model V-STARS' dispatch time
+    :param replySize: Bytes of padding added to every reply, as v.padding
+    :param cloudSize: Points in the GCloud sent for Get3D and GetSelection
+    :param pictureSize: Points in the GPicture sent for GetPicture
+    :param pictureCount: The number of pictures reported by GetNumberOfPictures
+    :param vstarsVersion: The dotted version reported by GetVstarsVersion
+    :param projectPath: The project folder reported by ProjectPath, e.g. for VResultCache
+    """
+
+    def __init__(
+        self,
+        address="localhost",
+        port=0,
+        latency=0.0,
+        replySize=0,
+        cloudSize=1000,
+        pictureSize=500,
+        vstarsVersion="4.9.9-0",
+        pictureCount=300,
+        projectPath="C:\\VSTARS\\Projects\\Fake",
+    ):
+        self.address = address
+        self.port = port
+        self.latency = latency
+        self.replySize = replySize
+        self.cloudSize = cloudSize
+        self.pictureSize = pictureSize
+        self.pictureCount = pictureCount
+        self.vstarsVersion = vstarsVersion
+        self.projectPath = projectPath
+
+        self.handlers = {}
+        self.commandCount = 0
+        self.dataConnections = []
+        self.threads = []
+        self.listeners = []
+        self.running = False
+        self.lock = threading.Lock()
+
+        # command connection: its data connection, paired in the order they connect
+        self.pairs = {}
+        self.unpairedCommands = collections.deque()
+        self.unpairedData = collections.deque()
+        self.paired = threading.Condition(self.lock)
+        # data connection: the lock keeping the frames sent on it whole
+        self.sendLocks = {}
+        # the command connection served by the current thread
+        self.local = threading.local()
+        self._frames = {}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Starts listening on both ports, returns self
+        """
+        commandListener, dataListener = self.__bindPorts()
+        self.listeners = [commandListener, dataListener]
+        self.running = True
+
+        self.threads = [
+            threading.Thread(target=self.__acceptCommands, args=(commandListener,), daemon=True),
+            threading.Thread(target=self.__acceptData, args=(dataListener,), daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+        return self
+
+    def stop(self):
+        """
+        Closes the listeners and every connection
+        """
+        self.running = False
+        for sock in self.listeners + self.dataConnections:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        with self.lock:
+            self.listeners = []
+            self.dataConnections = []
+            self.pairs.clear()
+            self.unpairedCommands.clear()
+            self.unpairedData.clear()
+            self.sendLocks.clear()
+            self.paired.notify_all()
+
+    def setHandler(self, commandName: str, handler):
+        """
+        Sets the reply to a command
+
+        :param commandName: The name sent on the wire, e.g. "Project.Bundle.Run" for VSTARS.ProjectBundleRun
+        :param handler: Called as handler(args) with the command arguments as a dict of strings.
+            Returns a dict of reply values, or a (values, jsonFrame) tuple to also push a frame on
+            the data port. Raise VFakeError to reply with a vstarsError.
+        """
+        self.handlers[commandName] = handler
+
+    def setError(self, commandName: str, errorString: str):
+        """
+        Makes a command always reply with a vstarsError
+        """
+
+        def fail(args):
+            raise VFakeError(errorString)
+
+        self.setHandler(commandName, fail)
+
+    def push(self, jsonStr: str):
+        """
+        Sends a json frame on the data port of the client whose command is being answered
+
+        Called outside a command, e.g. from a test, the frame goes to every connected client.
+        """
+        frame = b"<json>" + jsonStr.encode("utf-8") + b"<\\json>"
+        command = getattr(self.local, "connection", None)
+
+        with self.lock:
+            if command is None:
+                connections = list(self.dataConnections)
+            else:
+                # the data connection may still be waiting to be accepted
+                self.paired.wait_for(lambda: command in self.pairs or not self.running, timeout=5.0)
+                connections = [self.pairs[command]] if command in self.pairs else []
+            targets = [(connection, self.sendLocks.get(connection)) for connection in connections]
+
+        # the server lock is not held while sending, a slow reader only holds back its own client
+        for connection, sendLock in targets:
+            if sendLock is None:
+                continue
+            try:
+                with sendLock:
+                    connection.sendall(frame)
+            except OSError:
+                with self.lock:
+                    if connection in self.dataConnections:
+                        self.dataConnections.remove(connection)
+                    self.sendLocks.pop(connection, None)
+
+    def reply(self, commandString: str) -> bytes:
+        """
+        The reply bytes to one command string, pushing any data frame it produces
+        """
+        name, args = parseCommand(commandString)
+        values = {}
+        frame = None
+
+        try:
+            handler = self.handlers.get(name)
+            if handler is not None:
+                result = handler(args)
+                if isinstance(result, tuple):
+                    values, frame = result
+                else:
+                    values = result or {}
+            else:
+                values, frame = self.__defaultReply(name, args)
+        except VFakeError as ex:
+            return "vstarsError{{v.command={};v.errorString={}}}\0".format(name, ex).encode("utf-8")
+
+        body = ["v.command={}".format(name)]
+        body += ["{}={}".format(key, self.__formatValue(value)) for key, value in values.items()]
+        if self.replySize > 0:
+            body.append("v.padding={}".format("x" * self.replySize))
+
+        # V-STARS sends the object before the reply, a client waiting on the reply finds it ready
+        if frame is not None:
+            self.push(frame)
+
+        return ("{" + ";".join(body) + "}\0").encode("utf-8")
+
+    # Private Function
+    def __defaultReply(self, name, args):
+        if name == "GetVstarsVersion":
+            return {"v.vstarsVersion": self.vstarsVersion}, None
+        if name in ("Get3D", "GetSelection"):
+            return {}, self.frame("GCloud", self.cloudSize)
+        if name == "GetPicture":
+            return {}, self.frame("GPicture", self.pictureSize)
+        if name == "GetScaleBars":
+            return {}, self.frame("scalebars", 4)
+        if name == "ProjectPath":
+            return {"v.projectPath": self.projectPath}, None
+        if name == "GetNumberOfPictures":
+            return {"v.pictureCount": self.pictureCount}, None
+        if name == "Pictures.Information":
+            return makePictureInformation(int(args.get("index") or args.get("picture") or 0)), None
+        return {}, None
+
+    def frame(self, objectName: str, count: int) -> str:
+        """
+        The synthetic json frame for objectName with count items, built once and cached
+        """
+        key = (objectName, count)
+        if key not in self._frames:
+            if objectName == "GCloud":
+                self._frames[key] = makeCloudJson(count)
+            elif objectName == "GPicture":
+                self._frames[key] = makePictureJson(count)
+            else:
+                self._frames[key] = makeScaleBarsJson(count)
+        return self._frames[key]
+
+    # Private Function
+    def __formatValue(self, value):
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
+
+    # Private Function
+    def __bindPorts(self):
+        for _ in range(100):
+            commandListener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            commandListener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            commandListener.bind((self.address, self.port))
+            port = commandListener.getsockname()[1]
+
+            dataListener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            dataListener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                dataListener.bind((self.address, port + 1))
+            except OSError:
+                commandListener.close()
+                dataListener.close()
+                if self.port != 0:
+                    raise
+                continue
+
+            commandListener.listen()
+            dataListener.listen()
+            self.port = port
+            return commandListener, dataListener
+
+        raise OSError("No free pair of ports was found")
+
+    # Private Function
+    def __acceptCommands(self, listener):
+        while self.running:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                if self.unpairedData:
+                    self.pairs[connection] = self.unpairedData.popleft()
+                    self.paired.notify_all()
+                else:
+                    self.unpairedCommands.append(connection)
+            thread = threading.Thread(target=self.__serveCommands, args=(connection,), daemon=True)
+            thread.start()
+
+    # Private Function
+    def __acceptData(self, listener):
+        while self.running:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                self.dataConnections.append(connection)
+                self.sendLocks[connection] = threading.Lock()
+                if self.unpairedCommands:
+                    self.pairs[self.unpairedCommands.popleft()] = connection
+                    self.paired.notify_all()
+                else:
+                    self.unpairedData.append(connection)
+
+    # Private Function
+    def __serveCommands(self, connection):
+        self.local.connection = connection
+        try:
+            self.__readCommands(connection)
+        finally:
+            with self.lock:
+                self.pairs.pop(connection, None)
+                if connection in self.unpairedCommands:
+                    self.unpairedCommands.remove(connection)
+
+    # Private Function
+    def __readCommands(self, connection):
+        pending = b""
+        with connection:
+            while self.running:
+                try:
+                    part = connection.recv(65536)
+                except OSError:
+                    return
+                if not part:
+                    return
+
+                pending += part
+                while b"\0" in pending:
+                    command, _, pending = pending.partition(b"\0")
+                    if self.latency > 0:
+                        time.sleep(self.latency)
+                    with self.lock:
+                        self.commandCount += 1
+                    try:
+                        connection.sendall(self.reply(command.decode("utf-8")))
+                    except OSError:
+                        return
+
+
+def parseCommand(commandString: str):
+    """
+    Splits 'Name(key=value, key2=value2)' into ('Name', {'key': 'value', 'key2': 'value2'})
+
+    Quoted values may contain commas.
+    """
+    index = commandString.find("(")
+    if index < 0:
+        return commandString.strip(), {}
+
+    name = commandString[:index].strip()
+    body = commandString[index + 1 : commandString.rfind(")")]
+
+    args = {}
+    parts = []
+    current = ""
+    quoted = False
+    for char in body:
+        if char == '"':
+            quoted = not quoted
+        if char == "," and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    parts.append(current)
+
+    for part in parts:
+        key, sep, value = part.partition("=")
+        if sep:
+            args[key.strip()] = value.strip().strip('"')
+
+    return name, args
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Local stand-in V-STARS server")
+    parser.add_argument("--address", default="localhost")
+    parser.add_argument("--port", type=int, default=1210)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds slept before each reply")
+    parser.add_argument("--reply-size", type=int, default=0, help="bytes of padding in every reply")
+    parser.add_argument("--cloud-size", type=int, default=1000, help="points in the Get3D cloud")
+    parser.add_argument("--picture-size", type=int, default=500, help="points in the GetPicture picture")
+    parser.add_argument("--picture-count", type=int, default=300, help="pictures in the project")
+    options = parser.parse_args()
+
+    server = VFakeServer(
+        options.address,
+        options.port,
+        latency=options.latency,
+        replySize=options.reply_size,
+        cloudSize=options.cloud_size,
+        pictureSize=options.picture_size,
+        pictureCount=options.picture_count,
+    ).start()
+    print("Fake V-STARS listening on {}:{} and {}".format(server.address, server.port, server.port + 1))
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    _main()
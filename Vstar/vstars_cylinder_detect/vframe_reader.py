@@ -0,0 +1,205 @@
+# VSTARS Ignore
+import codecs
+import re
+
+
+class VReplyReader:
+    """
+    Reads the NUL terminated command replies sent back by V-STARS.
+
+    Bytes are received with recv_into into a single reusable buffer, which only
+    grows when a reply is larger than any seen before. Only newly received bytes
+    are scanned for the terminator, and bytes past it are kept for the next reply,
+    so replies split or merged by TCP in any way are framed correctly.
+    """
+
+    def __init__(self, sock, bufferSize=65536):
+        self.socket = sock
+        self.buffer = bytearray(bufferSize)
+        self.view = memoryview(self.buffer)
+
+        # the current reply starts at start, received bytes end at end
+        # and there is no terminator between start and scanned
+        self.start = 0
+        self.end = 0
+        self.scanned = 0
+
+    def readReply(self) -> bytes:
+        """
+        Returns the next reply including its NUL terminator
+        """
+        while True:
+            index = self.buffer.find(b"\0", self.scanned, self.end)
+            if index >= 0:
+                data = bytes(self.view[self.start : index + 1])
+                self.start = index + 1
+                self.scanned = self.start
+                if self.start == self.end:
+                    self.start = 0
+                    self.end = 0
+                    self.scanned = 0
+                return data
+
+            self.scanned = self.end
+
+            if self.end == len(self.buffer):
+                self.makeRoom()
+
+            count = self.socket.recv_into(self.view[self.end :])
+            if count == 0:
+                raise ConnectionError("The connection to V-STARS was closed")
+            self.end += count
+
+    def makeRoom(self):
+        """
+        Internal function to move the partial reply to the front of the buffer, or to grow the buffer if it is full
+        """
+        length = self.end - self.start
+
+        if self.start > 0:
+            self.view[:length] = self.view[self.start : self.end]
+        else:
+            self.view.release()
+            self.buffer.extend(bytes(len(self.buffer)))
+            self.view = memoryview(self.buffer)
+
+        self.scanned -= self.start
+        self.start = 0
+        self.end = length
+
+
+class VJsonFrameParser:
+    """
+    Splits the data socket stream from V-STARS into ``<json> ... <\\json>`` frames.
+
+    Bytes are fed in as they arrive. Only the newly arrived bytes (plus the few
+    that could start a footer) are scanned, and the body of the frame being read
+    is decoded as it arrives with an incremental UTF-8 decoder, so a character
+    split across two reads is decoded correctly and the raw bytes are not kept
+    once decoded. Old style ``<data> ... <\\data>`` frames are counted and dropped.
+
+    When requests is set, a frame whose oldest waiting request is a stream request
+    (see VDataRequests.claimStream) is fed to its GCloudStreamDecoder piece by piece
+    instead of being returned by feed. With keepStreamed its text is also kept, and
+    added to streamed once the frame is complete, e.g. for a session recording.
+    """
+
+    HEAD = re.compile(r'\s*\{\s*"([^"]*)"')
+
+    HEADER = b"<json>"
+    FOOTER = b"<\\json>"
+    DATA_HEADER = b"<data>"
+    DATA_FOOTER = b"<\\data>"
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.pieces = []
+        self.dataFrameCount = 0
+
+        # the VDataRequests handing out the decoders, and the decoder fed the current frame
+        self.requests = None
+        self.streaming = None
+        self.headChecked = False
+
+        # the text of the streamed frames, kept when keepStreamed was set as they started
+        self.keepStreamed = False
+        self.keeping = False
+        self.streamed = []
+
+        # footer of the frame being read, None between frames
+        self.footer = None
+
+    def feed(self, chunk) -> list:
+        """
+        Adds received bytes to the stream
+
+        :returns: the json strings of the frames completed by these bytes
+        """
+        self.buffer += chunk
+        frames = []
+
+        while True:
+            if self.footer is None and not self.findHeader():
+                break
+
+            index = self.buffer.find(self.footer)
+
+            if index < 0:
+                # everything that cannot be the start of the footer is finished with
+                done = max(len(self.buffer) - len(self.footer) + 1, 0)
+                if self.footer == self.FOOTER:
+                    with memoryview(self.buffer) as view:
+                        self.addText(self.decoder.decode(view[:done]))
+                del self.buffer[:done]
+                break
+
+            if self.footer == self.FOOTER:
+                with memoryview(self.buffer) as view:
+                    self.addText(self.decoder.decode(view[:index], final=True))
+                if self.streaming is not None:
+                    self.streaming.finish()
+                    self.streaming = None
+                    if self.keeping:
+                        self.streamed.append("".join(self.pieces))
+                else:
+                    frames.append("".join(self.pieces))
+                self.pieces = []
+                self.headChecked = False
+                self.decoder.reset()
+            else:
+                self.dataFrameCount += 1
+
+            del self.buffer[: index + len(self.footer)]
+            self.footer = None
+
+        return frames
+
+    def addText(self, text):
+        """
+        Internal function to add decoded text to the frame being read, or to the stream it goes to
+        """
+        if self.streaming is not None:
+            self.streaming.feed(text)
+            if self.keeping:
+                self.pieces.append(text)
+            return
+
+        self.pieces.append(text)
+
+        if self.requests is None or self.headChecked:
+            return
+
+        head = "".join(self.pieces)
+        match = self.HEAD.match(head)
+        if match is None:
+            # wait for the top level key unless it should have arrived by now
+            self.headChecked = len(head) > 256
+            return
+
+        self.headChecked = True
+        # a stream closed by its consumer still takes its frame, and drops it
+        self.streaming = self.requests.claimStream(match.group(1))
+        if self.streaming is not None:
+            self.keeping = self.keepStreamed
+            self.pieces = [head] if self.keeping else []
+            self.streaming.feed(head)
+
+    def findHeader(self):
+        """
+        Internal function to skip to the start of the next frame
+        """
+        index = -1
+        for header, footer in ((self.HEADER, self.FOOTER), (self.DATA_HEADER, self.DATA_FOOTER)):
+            found = self.buffer.find(header)
+            if found >= 0 and (index < 0 or found < index):
+                index = found
+                self.footer = footer
+
+        if index < 0:
+            del self.buffer[: max(len(self.buffer) - len(self.HEADER) + 1, 0)]
+            return False
+
+        del self.buffer[: index + len(self.HEADER)]
+        return True
+
@@ -0,0 +1,223 @@
+# VSTARS Ignore
+import collections
+import csv
+import os
+import random
+import threading
+
+try:
+    from opentelemetry import trace as otelTrace
+except ImportError:
+    otelTrace = None
+
+
+class CommandTrace:
+    """
+    Timing of one V-STARS command
+
+    **command** the command name as sent to V-STARS, e.g. Project.Bundle.Run
+    **timestamp** time.time() when the command was sent
+    **bytesSent** / **bytesReceived** the size of the command and of its reply
+    **sendSeconds** time spent writing the command to the socket
+    **waitSeconds** time spent waiting for the reply, V-STARS' processing time plus the round trip
+    **parseSeconds** time spent parsing the reply
+    **isError** True when V-STARS replied with a vstarsError
+    **errorString** the v.errorString of the reply when isError
+    **pipelined** True when the command was sent by executeCommands
+    """
+
+    __slots__ = (
+        "command",
+        "timestamp",
+        "bytesSent",
+        "bytesReceived",
+        "sendSeconds",
+        "waitSeconds",
+        "parseSeconds",
+        "isError",
+        "errorString",
+        "pipelined",
+    )
+
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        command="",
+        timestamp=0.0,
+        bytesSent=0,
+        bytesReceived=0,
+        sendSeconds=0.0,
+        waitSeconds=0.0,
+        parseSeconds=0.0,
+        isError=False,
+        errorString="",
+        pipelined=False,
+    ):
+        self.command = command
+        self.timestamp = timestamp
+        self.bytesSent = bytesSent
+        self.bytesReceived = bytesReceived
+        self.sendSeconds = sendSeconds
+        self.waitSeconds = waitSeconds
+        self.parseSeconds = parseSeconds
+        self.isError = isError
+        self.errorString = errorString
+        self.pipelined = pipelined
+
+    @property
+    def totalSeconds(self):
+        return self.sendSeconds + self.waitSeconds + self.parseSeconds
+
+    def toDict(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self):
+        return "CommandTrace({}, {:.3f} ms{})".format(self.command, self.totalSeconds * 1e3, ", error" if self.isError else "")
+
+
+def recordTrace(sinks, trace: CommandTrace):
+    """
+    Hands a trace to every sink. A failing sink is reported and never fails the command.
+    """
+    for sink in sinks:
+        try:
+            sink(trace)
+        except Exception as ex:
+            print(str(ex))
+
+
+class VRingBufferSink:
+    """
+    Keeps the traces of the last size commands in memory
+
+    .. code:: python
+
+        timings = VRingBufferSink()
+        V.addInstrumentationSink(timings)
+
+        ... run the measurement cycle ...
+
+        for command, stats in timings.summary().items():
+            print(command, stats["count"], stats["totalSeconds"])
+    """
+
+    def __init__(self, size=10000):
+        self.traces = collections.deque(maxlen=size)
+
+    def __call__(self, trace: CommandTrace):
+        self.traces.append(trace)
+
+    def __len__(self):
+        return len(self.traces)
+
+    def clear(self):
+        self.traces.clear()
+
+    def summary(self) -> dict:
+        """
+        Time per command name, the commands taking the most time in total first
+
+        :returns: {command: {"count", "errors", "totalSeconds", "meanSeconds", "maxSeconds", "bytesReceived"}}
+        """
+        stats = {}
+        for trace in list(self.traces):
+            entry = stats.get(trace.command)
+            if entry is None:
+                entry = stats[trace.command] = {"count": 0, "errors": 0, "totalSeconds": 0.0, "maxSeconds": 0.0, "bytesReceived": 0}
+            seconds = trace.totalSeconds
+            entry["count"] += 1
+            entry["errors"] += int(trace.isError)
+            entry["totalSeconds"] += seconds
+            entry["maxSeconds"] = max(entry["maxSeconds"], seconds)
+            entry["bytesReceived"] += trace.bytesReceived
+
+        for entry in stats.values():
+            entry["meanSeconds"] = entry["totalSeconds"] / entry["count"]
+
+        return dict(sorted(stats.items(), key=lambda item: item[1]["totalSeconds"], reverse=True))
+
+
+class VCsvSink:
+    """
+    Appends a row per command to a CSV file
+
+    :param filename: The CSV file, the header is written when the file is new or empty
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+
+        newFile = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        self.file = open(filename, "a", newline="")
+        self.writer = csv.writer(self.file)
+        if newFile:
+            self.writer.writerow(CommandTrace.FIELDS)
+            self.file.flush()
+
+    def __call__(self, trace: CommandTrace):
+        with self.lock:
+            self.writer.writerow([getattr(trace, name) for name in CommandTrace.FIELDS])
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class VSpanSink:
+    """
+    Reports every command as an OpenTelemetry style span
+
+    When the opentelemetry package is installed (or a tracer is given) the spans are
+    created with its tracer and go wherever the application's tracing is exported.
+    Otherwise each span is a dict in the OTLP layout, kept in spans and passed to
+    exporter if one is given.
+
+    :param exporter: Called with each span dict when opentelemetry is not used
+    :param tracer: The opentelemetry tracer to use, the global "vstars" tracer if None
+    :param size: The number of span dicts kept in spans
+    """
+
+    def __init__(self, exporter=None, tracer=None, size=10000):
+        self.exporter = exporter
+        self.tracer = tracer
+        if self.tracer is None and otelTrace is not None:
+            self.tracer = otelTrace.get_tracer("vstars")
+        self.spans = collections.deque(maxlen=size)
+
+    def __call__(self, trace: CommandTrace):
+        start = int(trace.timestamp * 1e9)
+        end = start + int(trace.totalSeconds * 1e9)
+        attributes = {
+            "vstars.command": trace.command,
+            "vstars.bytes_sent": trace.bytesSent,
+            "vstars.bytes_received": trace.bytesReceived,
+            "vstars.send_ms": trace.sendSeconds * 1e3,
+            "vstars.wait_ms": trace.waitSeconds * 1e3,
+            "vstars.parse_ms": trace.parseSeconds * 1e3,
+            "vstars.pipelined": trace.pipelined,
+        }
+        if trace.isError:
+            attributes["vstars.error"] = trace.errorString
+
+        if self.tracer is not None:
+            span = self.tracer.start_span(trace.command, start_time=start, attributes=attributes)
+            if trace.isError and otelTrace is not None:
+                span.set_status(otelTrace.Status(otelTrace.StatusCode.ERROR, trace.errorString))
+            span.end(end_time=end)
+            return
+
+        span = {
+            "name": trace.command,
+            "traceId": "{:032x}".format(random.getrandbits(128)),
+            "spanId": "{:016x}".format(random.getrandbits(64)),
+            "startTimeUnixNano": start,
+            "endTimeUnixNano": end,
+            "attributes": attributes,
+            "status": {"code": "STATUS_CODE_ERROR" if trace.isError else "STATUS_CODE_OK"},
+        }
+        self.spans.append(span)
+        if self.exporter is not None:
+            self.exporter(span)
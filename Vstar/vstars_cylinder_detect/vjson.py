@@ -0,0 +1,87 @@
+# VSTARS Ignore
+import contextlib
+import gc
+import json
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+JSON_BACKENDS = {"json": json.loads}
+if simdjson is not None:
+    JSON_BACKENDS["simdjson"] = simdjson.loads
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = orjson.loads
+
+# the fastest backend installed is used, the standard library if there is none
+_backend = "orjson" if orjson is not None else "simdjson" if simdjson is not None else "json"
+_loads = JSON_BACKENDS[_backend]
+
+_gcLock = threading.Lock()
+_gcPauses = 0
+_gcWasEnabled = False
+
+
+def loadsJson(text):
+    """
+    Parses a json str or bytes with the selected backend
+    """
+    return _loads(text)
+
+
+@contextlib.contextmanager
+def pausedGarbageCollection():
+    """
+    Turns the cyclic garbage collector off while a large frame is decoded
+
+    Decoding a large cloud creates millions of dicts and lists, each allocation counts towards
+    a collection and every collection walks all of them again. None of them form cycles, so
+    the collections are wasted work. Pauses can nest and overlap across threads, the collector
+    is turned back on by the last one to finish if it was on before.
+    """
+    global _gcPauses, _gcWasEnabled
+    with _gcLock:
+        if _gcPauses == 0:
+            _gcWasEnabled = gc.isenabled()
+            gc.disable()
+        _gcPauses += 1
+    try:
+        yield
+    finally:
+        with _gcLock:
+            _gcPauses -= 1
+            if _gcPauses == 0 and _gcWasEnabled:
+                gc.enable()
+
+
+def jsonBackend() -> str:
+    """
+    The name of the json backend in use: orjson, simdjson or json
+    """
+    return _backend
+
+
+def setJsonBackend(name: str):
+    """
+    Selects the json backend used to decode the objects sent by V-STARS
+
+    orjson (or simdjson) is used automatically when installed, this is mostly useful for
+    comparing the backends.
+
+    :param name: orjson, simdjson or json
+
+    :raises: Exception if the backend is not installed
+    """
+    global _backend, _loads
+    if name not in JSON_BACKENDS:
+        raise Exception("The json backend {} is not installed, the backends are {}".format(name, ", ".join(JSON_BACKENDS)))
+    _backend = name
+    _loads = JSON_BACKENDS[name]
@@ -0,0 +1,246 @@
+# VSTARS Ignore
+import collections
+import hashlib
+import os
+import pickle
+import threading
+import uuid
+
+# commands that leave the project data unchanged; any other command invalidates the cache
+READ_ONLY_COMMANDS = frozenset(
+    (
+        "Beep",
+        "CheckPictureInformation",
+        "MModeGetContinuousTriggerMode",
+        "PictureIsResected",
+        "Pictures.Information",
+        "Project.Bundle.Summary",
+        "Project.isHoleMeasurement",
+        "Project.isHoleProcAlreadyRun",
+        "ProjectPath",
+        "ProSpotConnected",
+        "ProSpotStatus",
+        "SystemPath",
+        "AddErrorToScriptDoc",
+    )
+)
+
+# the selection commands only change the selection buffer, which is never cached
+SELECTION_PREFIXES = ("Select", "UnSelect", "Unselect")
+
+
+def isReadOnlyCommand(commandName: str) -> bool:
+    return commandName in READ_ONLY_COMMANDS or commandName.startswith("Get") or commandName.startswith(SELECTION_PREFIXES)
+
+
+class VResultCache:
+    """
+    Cache of the Get3D, GetPicture and GetScaleBars results
+
+    Entries are keyed by the project path, the cloud name or picture index and a change
+    token, so a repeated request for an unchanged project is answered without transferring
+    or parsing the json again. Recent results are held in memory (LRU); with a directory
+    they are also kept on disk, named by the hash of their key, up to maxDiskBytes.
+
+    Every command that may change the project (Rename3D, 3D.Delete, Project.Bundle.Run,
+    RelabelPoint, ... any command not known to be read only) starts a new generation and
+    so invalidates the cache. The change token also holds the modification time of the
+    project files when the project folder can be read from this computer.
+
+    The disk entries are only used by the cache that wrote them, since V-STARS cannot tell a
+    script whether the project was edited in its window without being saved. With
+    reuseSaved=True the entries written before the first project changing command are keyed
+    by the saved files alone, so later scripts on the same saved project reuse them; only
+    set it when nobody edits the project in V-STARS between scripts.
+
+    The disk tier stores the results with pickle, and loading a pickle can run arbitrary
+    code: only point directory at a folder that nobody else can write to.
+
+    .. code:: python
+
+        V.enableResultCache(directory="C:/vstars_cache")
+
+        cloud = V.Get3D(filename="Final Results")   # transferred
+        cloud = V.Get3D(filename="Final Results")   # from the cache
+
+        V.ProjectBundleRun()
+        cloud = V.Get3D(filename="Final Results")   # transferred again
+
+    The cached objects are shared between callers, copy them before changing them.
+
+    :param maxItems: The number of results kept in memory
+    :param directory: The folder of the disk tier, no disk tier if None
+    :param maxDiskBytes: The disk tier size, the least recently used files are removed above it
+    :param reuseSaved: When True the disk entries of an unchanged saved project are shared with later scripts
+    """
+
+    def __init__(self, maxItems=16, directory=None, maxDiskBytes=1 << 30, reuseSaved=False):
+        self.maxItems = maxItems
+        self.directory = directory
+        self.maxDiskBytes = maxDiskBytes
+        self.reuseSaved = reuseSaved
+        self.memory = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        # separates the generations of this cache from those of other processes on disk
+        self.session = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.memory)
+
+    def invalidate(self):
+        """
+        Forgets every result, the disk files of older generations are no longer used
+        """
+        with self.lock:
+            self.generation += 1
+            self.memory.clear()
+
+    def noteCommand(self, commandName: str):
+        """
+        Called for every command sent, invalidates the cache when the command may change the project
+        """
+        if not isReadOnlyCommand(commandName):
+            self.invalidate()
+
+    def key(self, client, kind: str, identifier) -> str:
+        """
+        The key of a result of the current project
+
+        :param client: The VSTARSClient, asked for the project path
+        :param kind: Get3D, GetPicture or GetScaleBars
+        :param identifier: The cloud name or picture index
+        """
+        return self.keys(client, kind, [identifier])[0]
+
+    def keys(self, client, kind: str, identifiers) -> list:
+        """
+        The keys of several results of the same kind, the project is asked for once
+        """
+        projectPath = client.ProjectPath()
+        modified = projectModifiedTime(projectPath)
+        if self.reuseSaved and modified is not None and self.generation == 0:
+            # nothing changed since this script started, the saved project files identify the data
+            token = "saved:{!r}".format(modified)
+        else:
+            token = "{}:{}:{!r}".format(self.session, self.generation, modified)
+
+        keys = []
+        for identifier in identifiers:
+            text = "\0".join((kind, str(identifier), str(projectPath), token))
+            keys.append(hashlib.sha256(text.encode("utf-8")).hexdigest())
+        return keys
+
+    def get(self, key: str):
+        """
+        The cached result for key, None when there is none
+        """
+        with self.lock:
+            generation = self.generation
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return self.memory[key]
+
+        value = self.__readDisk(key)
+        with self.lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if generation == self.generation:
+                self.__remember(key, value)
+        return value
+
+    def put(self, key: str, value):
+        with self.lock:
+            self.__remember(key, value)
+        self.__writeDisk(key, value)
+
+    # Private Function
+    def __remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxItems:
+            self.memory.popitem(last=False)
+
+    # Private Function
+    def __path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    # Private Function
+    def __readDisk(self, key):
+        if self.directory is None:
+            return None
+        path = self.__path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            # the file times order the least recently used files for eviction
+            os.utime(path)
+            return value
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    # Private Function
+    def __writeDisk(self, key, value):
+        if self.directory is None:
+            return
+        path = self.__path(key)
+        temporary = path + ".tmp"
+        try:
+            with open(temporary, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        except OSError as ex:
+            print(str(ex))
+            return
+
+        self.__evict()
+
+    # Private Function
+    def __evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pickle"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        entries.sort()
+        for modified, size, name in entries:
+            if total <= self.maxDiskBytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+
+
+def projectModifiedTime(projectPath):
+    """
+    The latest modification time of the files of a project folder, None if it cannot be read
+    """
+    if not projectPath:
+        return None
+    # ProjectPath ends with a backslash
+    projectPath = projectPath.rstrip("\\/") or projectPath
+    try:
+        latest = os.stat(projectPath).st_mtime
+        with os.scandir(projectPath) as entries:
+            for entry in entries:
+                latest = max(latest, entry.stat().st_mtime)
+        return latest
+    except OSError:
+        return None
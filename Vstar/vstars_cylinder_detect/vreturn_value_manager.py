@@ -1,4 +1,7 @@
 # VSTARS Ignore
+from collections.abc import Mapping
+from types import MappingProxyType
+
 
 class VReturnValue:
     """
@@ -9,38 +12,65 @@ class VReturnValue:
         self.value = 0
 
 
-class VReturnValueManager:
+class CommandResult(Mapping):
     """
-    class to parse the string archive retruned from V-STARS and stores the various "v." values
+    The "v." values returned by a single V-STARS command.
+
+    Only the keys present in that command's reply are held, so values left over
+    from earlier commands can never show up here. A CommandResult is read-only
+    and can be passed anywhere a VReturnValueManager is used to read values,
+    for example ``BundleStats.update``.
+
+    .. code:: python
+
+        result = V.lastResult
+        if result.isError:
+            print(result.errorString)
+        found = result.getValue("v.selectionNumberFound")
     """
 
-    def __init__(self):
-        self.list = []
-        self.VSTARS_ERROR_LEVEL_END = 4
-        self.VSTARS_ERROR_LEVEL_CONTINUE = 1
-        self.VSTARS_ERROR_LEVEL_WARN = 3
-        self.VSTARS_ERROR_LEVEL_PAUSE = 2
+    __slots__ = ("_values",)
+
+    def __init__(self, values=None):
+        object.__setattr__(self, "_values", MappingProxyType(dict(values or {})))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CommandResult is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("CommandResult is read-only")
 
-    def parse(self, data):
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return "CommandResult({})".format(dict(self._values))
+
+    @classmethod
+    def fromReply(cls, data):
+        """
+        Parses the raw reply bytes of one command
+        """
         dataStr = data.decode("utf-8")
+        values = {}
 
         # Special case of error
         if dataStr.startswith("vstarsError"):
-            rv = VReturnValue()
-            rv.key = "v.execution_status"
-            rv.value = -2
-            self.storeReturnValue(rv)
+            values["v.execution_status"] = -2
         else:
-            rv = VReturnValue()
-            rv.key = "v.execution_status"
-            rv.value = 0
-            self.storeReturnValue(rv)
+            values["v.execution_status"] = 0
 
         start = dataStr.find("{") + 1
         end = dataStr.rfind("}")
 
         if (start == -1) or (end == -1):
-            return
+            return cls(values)
 
         dataStr = dataStr[start:end]
         strings = dataStr.split(";")
@@ -59,49 +89,116 @@ class VReturnValueManager:
                 ):
                     continue
 
-                rv = VReturnValue()
-                rv.key = key
-
-                if rv.key.find("v.") != 0:
+                if key.find("v.") != 0:
                     #print("Note to GSI: {} is missing the v.".format(key))
-                    rv.key = "v.{}".format(key)
+                    key = "v.{}".format(key)
 
                 if value == "false":
-                    rv.value = False
+                    value = False
                 elif value == "true":
-                    rv.value = True
+                    value = True
                 else:
                     try:
-                        rv.value = int(value)
+                        value = int(value)
                     except Exception:
                         try:
-                            rv.value = float(value)
+                            value = float(value)
                         except Exception:
-                            rv.value = value
+                            pass
+
+                values[key] = value
+
+        return cls(values)
+
+    def getValue(self, key):
+        """
+        gets the value named by key, None if the command did not return it
+        """
+        return self._values.get(key)
+
+    @property
+    def command(self):
+        return self._values.get("v.command")
+
+    @property
+    def isError(self):
+        return self._values.get("v.execution_status") == -2
+
+    @property
+    def errorString(self):
+        return self._values.get("v.errorString")
+
+
+class VReturnValueManager:
+    """
+    class to parse the string archive retruned from V-STARS and stores the various "v." values
+
+    :param maxKeys: The number of values to keep. None keeps every value, otherwise the values
+        that have gone longest without being returned are dropped first. The values of the
+        most recent reply are always kept.
+    """
+
+    def __init__(self, maxKeys=None):
+        # keyed by "v." name, dicts keep the insertion order of the old list
+        self.values = {}
+        self.maxKeys = maxKeys
+        self.VSTARS_ERROR_LEVEL_END = 4
+        self.VSTARS_ERROR_LEVEL_CONTINUE = 1
+        self.VSTARS_ERROR_LEVEL_WARN = 3
+        self.VSTARS_ERROR_LEVEL_PAUSE = 2
+
+    def parse(self, data) -> CommandResult:
+        result = CommandResult.fromReply(data)
+        self.storeResult(result)
+        return result
+
+    def storeResult(self, result: CommandResult):
+        """
+        Merges the values of a single command into the archive
+        """
+        for key, value in result.items():
+            rv = VReturnValue()
+            rv.key = key
+            rv.value = value
+            self.storeReturnValue(rv)
 
-                self.storeReturnValue(rv)
+        if self.maxKeys is not None:
+            limit = max(self.maxKeys, len(result))
+            while len(self.values) > limit:
+                del self.values[next(iter(self.values))]
 
     def storeReturnValue(self, returnValue):
         """
         Internal function to store a return key/value or replaces the value if the key is already there
         """
-        test = self.getValue(returnValue.key)
-        if test is None:
-            self.list.append(returnValue)
+        item = self.values.get(returnValue.key)
+        if item is None:
+            self.values[returnValue.key] = returnValue
         else:
-            self.replaceValue(returnValue)
+            item.value = returnValue.value
+            if self.maxKeys is not None:
+                # keep the most recently returned values at the end so they are dropped last
+                self.values[returnValue.key] = self.values.pop(returnValue.key)
 
     def replaceValue(self, returnValue):
-        for item in self.list:
-            if (item.key.find(returnValue.key) == 0) and (len(item.key) == len(returnValue.key)):
-                item.value = returnValue.value
-                return
+        item = self.values.get(returnValue.key)
+        if item is not None:
+            item.value = returnValue.value
 
     # gets the value named by key
     def getValue(self, key):
-        for item in self.list:
-            if (item.key.find(key) == 0) and (len(item.key) == len(key)):
-                return item.value
+        item = self.values.get(key)
+        if item is not None:
+            return item.value
 
         return None
-    
+
+    def clear(self):
+        self.values.clear()
+
+    @property
+    def list(self):
+        """
+        The stored return values, oldest first
+        """
+        return list(self.values.values())
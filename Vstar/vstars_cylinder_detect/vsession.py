@@ -0,0 +1,193 @@
+# VSTARS Ignore
+import collections
+import struct
+import threading
+import time
+
+from .vfake_server import VFakeServer, parseCommand
+
+SESSION_MAGIC = b"VSTARSLOG1\n"
+
+# record kinds
+SESSION_COMMAND = ord("C")
+SESSION_REPLY = ord("R")
+SESSION_DATA = ord("D")
+
+# kind, time.time(), payload length
+_RECORD_HEADER = struct.Struct("<BdI")
+
+
+class VSessionRecorder:
+    """
+    Append-only log of the traffic between a client and V-STARS
+
+    Every command string, every raw reply and every json frame of the data socket is
+    written with its time as a small binary record, so a session of a production script
+    can be replayed offline with VSessionReplayer.
+
+    .. code:: python
+
+        V = VSTARS()
+        V.startRecording("cell1.vlog")
+        V.init()
+
+        ... the production script ...
+
+        V.stopRecording()
+
+    :param filename: The log file, new records are appended
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.file = open(filename, "ab")
+        if self.file.tell() == 0:
+            self.file.write(SESSION_MAGIC)
+            self.file.flush()
+
+    def write(self, kind: int, payload: bytes):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(_RECORD_HEADER.pack(kind, time.time(), len(payload)))
+            self.file.write(payload)
+            self.file.flush()
+
+    def command(self, payload: bytes):
+        self.write(SESSION_COMMAND, payload)
+
+    def reply(self, payload: bytes):
+        self.write(SESSION_REPLY, payload)
+
+    def data(self, jsonStr: str):
+        self.write(SESSION_DATA, jsonStr.encode("utf-8"))
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def readSession(filename):
+    """
+    Iterates over the records of a session log
+
+    :returns: an iterator of (kind, timestamp, payload bytes), kind is SESSION_COMMAND, SESSION_REPLY or SESSION_DATA
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(SESSION_MAGIC)) != SESSION_MAGIC:
+            raise Exception("{} is not a V-STARS session log".format(filename))
+
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            kind, timestamp, length = _RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                # the recording was cut short, e.g. the script was killed mid write
+                return
+            yield kind, timestamp, payload
+
+
+class VSessionExchange:
+    """
+    One recorded command with its reply and the data socket frames it produced
+    """
+
+    def __init__(self, command, timestamp):
+        self.command = command
+        self.timestamp = timestamp
+        self.reply = None
+        self.replyTimestamp = timestamp
+        self.frames = []
+
+
+class VSessionReplayer(VFakeServer):
+    """
+    Serves a recorded session back to a client, in place of V-STARS
+
+    Each command received is matched to the next recorded one; its recorded data socket
+    frames are pushed and its recorded reply is sent back. The production script then runs
+    offline at full speed (or at the recorded pace with realTime=True), so the Python side
+    can be profiled on its own or a field issue reproduced without the measurement cell.
+
+    A command that differs from the recording gets a vstarsError reply naming both commands.
+    GetVstarsVersion is answered from the recording whenever it is asked out of turn, and
+    AddErrorToScriptDoc with an empty reply.
+
+    .. code:: python
+
+        with VSessionReplayer("cell1.vlog", port=1210) as replay:
+            main()  # the unmodified production script, V.init() connects to the replayer
+
+    :param filename: A log written by VSessionRecorder
+    :param realTime: Wait as long as V-STARS took to answer each command
+    :param address: see VFakeServer
+    :param port: see VFakeServer
+    """
+
+    def __init__(self, filename, realTime=False, address="localhost", port=0):
+        VFakeServer.__init__(self, address, port)
+        self.filename = filename
+        self.realTime = realTime
+        self.exchanges = collections.deque()
+        self.replayed = 0
+        self.versionReply = None
+
+        waiting = collections.deque()
+        latest = None
+        for kind, timestamp, payload in readSession(filename):
+            if kind == SESSION_COMMAND:
+                latest = VSessionExchange(payload.decode("utf-8"), timestamp)
+                self.exchanges.append(latest)
+                waiting.append(latest)
+            elif kind == SESSION_REPLY and waiting:
+                # replies come back in the order the commands were sent, even when pipelined
+                exchange = waiting.popleft()
+                exchange.reply = payload if payload.endswith(b"\0") else payload + b"\0"
+                exchange.replyTimestamp = timestamp
+            elif kind == SESSION_DATA and latest is not None:
+                latest.frames.append(payload.decode("utf-8"))
+
+        for exchange in self.exchanges:
+            if parseCommand(exchange.command)[0] == "GetVstarsVersion" and exchange.reply is not None:
+                self.versionReply = exchange.reply
+                break
+
+    def __len__(self):
+        return len(self.exchanges)
+
+    def reply(self, commandString: str) -> bytes:
+        name = parseCommand(commandString)[0]
+
+        with self.lock:
+            exchange = self.exchanges[0] if self.exchanges else None
+            matches = exchange is not None and parseCommand(exchange.command)[0] == name
+            if matches:
+                self.exchanges.popleft()
+
+        if not matches:
+            if name == "GetVstarsVersion" and self.versionReply is not None:
+                return self.versionReply
+            if name == "AddErrorToScriptDoc":
+                # sent by the client when it handles the mismatch error below
+                return VFakeServer.reply(self, commandString)
+            expected = parseCommand(exchange.command)[0] if exchange is not None else "the end of the session"
+            return self.__mismatch(name, expected)
+
+        if self.realTime:
+            time.sleep(max(exchange.replyTimestamp - exchange.timestamp, 0.0))
+
+        for frame in exchange.frames:
+            self.push(frame)
+
+        self.replayed += 1
+        if exchange.reply is None:
+            return self.__mismatch(name, "a reply, none was recorded")
+        return exchange.reply
+
+    # Private Function
+    def __mismatch(self, name, expected):
+        return "vstarsError{{v.command={};v.errorString=Replay: received {}, expected {}}}\0".format(name, name, expected).encode("utf-8")
+
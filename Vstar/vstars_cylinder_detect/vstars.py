@@ -1,4 +1,5 @@
 # VSTARS Ignore
+import concurrent.futures
 import json
 from enum import Enum
 from pathlib import Path
@@ -12,17 +13,28 @@ import threading
 from threading import Event
 import time
 
+import numpy as np
+
 from .alignment_stats import AlignmentStats
 from .autorelabel_results import AutoRelabelResults
 from .bundle_stats import BundleStats
 from .gcloud import GCloud
+from .gcloud_stream import GCloudStreamDecoder
 from .gpicture import GPicture
 from .gmatrix import GMatrix
 from .gphotogrammetry_project_compare_stats import GPhotogrammetryProjectCompareStats
 from .gtransformation_matrix import GTransformationMatrix
+from .picture_set import PictureSet, decodePicture
+from .pictures_information import picturesInformationTable
 from .scalebar import ScaleBars
 from .singleton import Singleton
-from .vreturn_value_manager import VReturnValueManager
+from .vdata_requests import VDataRequests
+from .vframe_reader import VJsonFrameParser, VReplyReader
+from .vinstrumentation import CommandTrace, recordTrace
+from .vjson import loadsJson, pausedGarbageCollection
+from .vsession import VSessionRecorder
+from .vresult_cache import VResultCache
+from .vreturn_value_manager import CommandResult, VReturnValueManager
 from .utilities import *
 
 
@@ -42,10 +54,20 @@ class VSocketHandler:
     Handles the connection to V-STARS
     """
 
-    def __init__(self, address, port):
+    def __init__(self, address, port, client=None):
         self.address = address
         self.port = port
         self.port2 = port + 1
+        # the VSTARSClient this connection belongs to, the default VSTARS if None
+        self.client = client
+        self.closed = False
+        # one command at a time on the command socket, its reply is the next one read
+        self.lock = threading.RLock()
+
+    def getClient(self):
+        if self.client is None:
+            return VSTARS()
+        return self.client
 
     def connect(self):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -54,6 +76,18 @@ class VSocketHandler:
         self.socket.connect((self.address, self.port))
         self.socket2.connect((self.address, self.port2))
 
+        self.replyReader = VReplyReader(self.socket)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        for sock in (self.socket, self.socket2):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
     def parseCommandName(self, commandString: str):
         name = ""
         index = commandString.find("(")
@@ -63,50 +97,195 @@ class VSocketHandler:
         return name
 
     def sendCommand(self, commandString):
+        """
+        Sends a command and reads its reply, other threads wait for their turn
+        """
+        with self.lock:
+            return self.__sendCommand(commandString)
 
-        V = VSTARS()
+    # Private Function
+    def __sendCommand(self, commandString):
+        V = self.getClient()
         commandNameSent = self.parseCommandName(commandString)
         byteString = commandString.encode("utf-8")
+        sinks = getattr(V, "instrumentationSinks", None)
+        if sinks:
+            timestamp = time.time()
+            start = time.perf_counter()
+
+        recorder = getattr(V, "recorder", None)
+        if recorder is not None:
+            recorder.command(byteString)
+
+        cache = getattr(V, "resultCache", None)
+        if cache is not None:
+            cache.noteCommand(commandNameSent)
 
         try:
-            self.socket.send(byteString)
-            self.socket.send(b"\0")
+            self.socket.sendall(byteString + b"\0")
         except Exception:
             V.init(V.address, V.port)
-            self.socket.send(byteString)
-            self.socket.send(b"\0")
-
-        data = b''
-
-        while(True):
-            part = self.socket.recv(2048)
-            data += part
-
-            if (len(part) < 2048 or part.endswith(b'\0')):
-                break
-
-        V.returnValueManager.parse(data)
-        vstarsError = V.getValue("v.execution_status") == -2
+            self.socket.sendall(byteString + b"\0")
+
+        if sinks:
+            sent = time.perf_counter()
+            data = self.readReply()
+            received = time.perf_counter()
+            result = V.returnValueManager.parse(data)
+            parsed = time.perf_counter()
+            recordTrace(
+                sinks,
+                CommandTrace(
+                    commandNameSent,
+                    timestamp,
+                    len(byteString) + 1,
+                    len(data),
+                    sent - start,
+                    received - sent,
+                    parsed - received,
+                    result.isError,
+                    result.errorString or "",
+                ),
+            )
+        else:
+            result = V.returnValueManager.parse(self.readReply())
+        vstarsError = result.isError
 
         if V.CheckVstarsVersion(40090040000000):
-            commandNameReceived = V.getValue("v.command")
+            commandNameReceived = result.command
             if commandNameReceived is not None:
                 if commandNameReceived != commandNameSent:
                     print("**** response conflict. Sent {} Received {}".format(commandNameSent, commandNameReceived))
 
-        V._VSTARS__setLastCommandError(vstarsError)
+        V._VSTARSClient__setLastCommandError(vstarsError)
+
+        V.lastResult = result
 
         if vstarsError is True:
-            self.handleError()
+            self.handleError(result)
+
+        return result
 
-    def handleError(self):
+    def sendCommands(self, commandStrings, depth=16, raiseErrors=True):
+        """
+        Pipelined version of sendCommand.
+
+        Up to depth commands are written back to back before their replies are read, so the
+        round trip to V-STARS is paid once per batch instead of once per command. V-STARS
+        answers commands in the order they are received, so the n-th reply belongs to the
+        n-th command; the v.command echo is used to check this.
+
+        :param commandStrings: The commands to send
+        :param depth: The maximum number of commands in flight
+        :param raiseErrors: When False the failed commands are returned like the others, see CommandResult.isError
+
+        :returns: a CommandResult per command, in the order of commandStrings
+        """
+        with self.lock:
+            return self.__sendCommands(commandStrings, depth, raiseErrors)
+
+    # Private Function
+    def __sendCommands(self, commandStrings, depth, raiseErrors):
+        V = self.getClient()
+        commandNamesSent = [self.parseCommandName(commandString) for commandString in commandStrings]
+        results = []
+        sent = 0
+        sinks = getattr(V, "instrumentationSinks", None)
+
+        cache = getattr(V, "resultCache", None)
+        if cache is not None:
+            for commandNameSent in commandNamesSent:
+                cache.noteCommand(commandNameSent)
+
+        while len(results) < len(commandStrings):
+            batch = []
+            while sent < len(commandStrings) and sent - len(results) < depth:
+                batch.append(commandStrings[sent].encode("utf-8") + b"\0")
+                sent = sent + 1
+
+            if sinks:
+                timestamp = time.time()
+                start = time.perf_counter()
+
+            if batch:
+                recorder = getattr(V, "recorder", None)
+                if recorder is not None:
+                    for byteString in batch:
+                        recorder.command(byteString[:-1])
+                self.socket.sendall(b"".join(batch))
+
+            if sinks:
+                # the send of a batch is charged to the command whose reply is read next
+                sentTime = time.perf_counter()
+                data = self.readReply()
+                received = time.perf_counter()
+                result = V.returnValueManager.parse(data)
+                parsed = time.perf_counter()
+                recordTrace(
+                    sinks,
+                    CommandTrace(
+                        commandNamesSent[len(results)],
+                        timestamp,
+                        len(commandStrings[len(results)].encode("utf-8")) + 1,
+                        len(data),
+                        sentTime - start,
+                        received - sentTime,
+                        parsed - received,
+                        result.isError,
+                        result.errorString or "",
+                        pipelined=True,
+                    ),
+                )
+            else:
+                result = V.returnValueManager.parse(self.readReply())
+
+            if V.CheckVstarsVersion(40090040000000):
+                commandNameReceived = result.command
+                commandNameSent = commandNamesSent[len(results)]
+                if commandNameReceived is not None:
+                    if commandNameReceived != commandNameSent:
+                        print("**** response conflict. Sent {} Received {}".format(commandNameSent, commandNameReceived))
+
+            results.append(result)
+
+        if results:
+            V.lastResult = results[-1]
+
+        # every reply has been read by now so the channel stays in step even if a command failed
+        for result in results:
+            if result.isError:
+                V._VSTARSClient__setLastCommandError(True)
+                if not raiseErrors:
+                    return results
+                self.handleError(result)
+
+        V._VSTARSClient__setLastCommandError(False)
+        return results
+
+    def readReply(self):
+        """
+        Reads a single NUL terminated reply, bytes past the terminator are kept for the next reply
+        """
+        data = self.replyReader.readReply()
+
+        recorder = getattr(self.getClient(), "recorder", None)
+        if recorder is not None:
+            recorder.reply(data)
+
+        return data
+
+    def handleError(self, result: CommandResult = None):
         """
         Handles a command error sent back by V-STARS
+
+        :param result: The reply of the failed command, the last reply if None
         """
-        V = VSTARS()
-        # errorLevel = V.getValue("v.errorLevel")
-        # lastCommand = V.getValue("v.lastCommand")
-        V.errorString = V.getValue("v.errorString")
+        V = self.getClient()
+        if result is None:
+            result = V.lastResult
+        # errorLevel = result.getValue("v.errorLevel")
+        # lastCommand = result.getValue("v.lastCommand")
+        V.errorString = result.getValue("v.errorString")
         # busy = V.getValue("v.busyProcessing")
 
         if V.CheckVstarsVersion(40090040000000):
@@ -151,11 +330,110 @@ class VSocketHandler:
         #         sys.exit()
 
 
+# The objects V-STARS sends on the data socket:
+# (name of the top level json object, class, attribute of the command handler receiving it)
+JSON_FRAME_TYPES = (
+    ("GCloud", GCloud, "cloud"),
+    ("GPicture", GPicture, "picture"),
+    ("GPhotogrammetryProjectCompareStats", GPhotogrammetryProjectCompareStats, "photogrammetryProjectCompareStats"),
+    ("GMatrix", GMatrix, "matrix"),
+    ("scalebars", ScaleBars, "scaleBars"),
+)
+
+
+def isJsonObject(objectName: str, jsonStr: str):
+    """
+    Tests if objectName is the top level object of the json string
+    """
+    index1 = jsonStr.find("{")
+    index2 = jsonStr.find("{", index1 + 1)
+
+    index3 = jsonStr.find(objectName)
+    if index3 > index1 and index3 < index2:
+        return True
+
+    return False
+
+
+def jsonObjectName(jsonStr: str):
+    """
+    The name of the top level object of a json frame, found without parsing it, None if there is none
+    """
+    match = VJsonFrameParser.HEAD.match(jsonStr)
+    return match.group(1) if match is not None else None
+
+
+JSON_FRAME_CLASSES = {objectName: objectClass for objectName, objectClass, attribute in JSON_FRAME_TYPES}
+
+
+def decodeJsonFrame(jsonStr: str):
+    """
+    Decodes a json frame from the data socket
+
+    The frame is parsed once, with the fastest json backend installed (see setJsonBackend),
+    and the object is picked by its top level key. The garbage collector is paused while a
+    large frame is decoded.
+
+    :returns: (objectName, object) or (None, None) if the frame is not one of JSON_FRAME_TYPES
+    """
+    if len(jsonStr) >= 1 << 20:
+        with pausedGarbageCollection():
+            return _decodeJsonFrame(jsonStr)
+    return _decodeJsonFrame(jsonStr)
+
+
+def _decodeJsonFrame(jsonStr: str):
+    try:
+        data = loadsJson(jsonStr)
+    except ValueError:
+        return None, None
+
+    if not isinstance(data, dict) or not data:
+        return None, None
+
+    objectName = next(iter(data))
+    objectClass = JSON_FRAME_CLASSES.get(objectName)
+    if objectClass is None:
+        return None, None
+
+    value = objectClass()
+
+    if objectClass is ScaleBars:
+        value.fromJSON(data)
+    elif objectClass is GPhotogrammetryProjectCompareStats:
+        try:
+            value.fromDict(data[objectName])
+        except Exception:
+            pass
+    else:
+        value.fromDict(data[objectName])
+
+    return objectName, value
+
+
+def routeJsonObject(commandHandler, objectName: str, value):
+    """
+    Hands a decoded data socket object to the request waiting for it
+
+    The object is also stored on the command handler as the last one of its kind received.
+    """
+    for name, objectClass, attribute in JSON_FRAME_TYPES:
+        if name == objectName:
+            setattr(commandHandler, attribute, value)
+            requests = getattr(commandHandler, "dataRequests", None)
+            if requests is not None:
+                requests.resolve(objectName, value)
+            event = getattr(commandHandler, attribute + "Event", None)
+            if event is not None:
+                event.set()
+            return
+
+
 # Thread used to connect to Vstars
 class VConnectionTimer(threading.Thread):
-    def __init__(self):
+    def __init__(self, client=None):
         threading.Thread.__init__(self)
-        V = VSTARS()
+        V = VSTARS() if client is None else client
         self.commandHandler = V
         self.socketHandler = V.socketHandler
         self.connected = False
@@ -175,10 +453,10 @@ class VConnectionTimer(threading.Thread):
                 time.sleep(0.25)
 
 class VDataSocketTimer(threading.Thread):
-    def __init__(self):
+    def __init__(self, client=None):
         threading.Thread.__init__(self)
         self.daemon = True
-        V = VSTARS()
+        V = VSTARS() if client is None else client
         self.commandHandler = V
         self.socketHandler = V.socketHandler
 
@@ -187,117 +465,80 @@ class VDataSocketTimer(threading.Thread):
         Thread that automatically gets called to handle input data from V-STARS
         """
 
-        data = ""
+        socket2 = None
+        parser = None
 
-        count = 1
-        while True:
+        while not self.socketHandler.closed:
             # self.socketHandler.socket2.settimeout(.1)
             try:
-                tmp = self.socketHandler.socket2.recv(4096)
+                # start a fresh stream whenever V-STARS has been reconnected
+                if socket2 is not self.socketHandler.socket2:
+                    socket2 = self.socketHandler.socket2
+                    parser = VJsonFrameParser()
+                    # the frames of Get3DStream go to their stream while they arrive
+                    parser.requests = getattr(self.commandHandler, "dataRequests", None)
 
-                data = data + tmp.decode("utf-8")
+                tmp = socket2.recv(65536)
 
-                # Old style data came in with <data> <\data>
-                # just dump it because we don;t handle it in Python
-                if data.find("<\\data>") >= 0:
-                    data = ""
-                    print(str(count))
-                    count = count + 1
-                elif data.find("<\\json>") >= 0:
-                    jsonStrings = []
-                    data = self.parseIntoJsonStrings(jsonStrings, data)
-
-                    for jsonStr in jsonStrings:
-                        # print(jsonStr)
-                        if self.isJson("GCloud", jsonStr):
-                            self.commandHandler.cloud = GCloud()
-                            self.commandHandler.cloud.fromJSON(jsonStr)
-                            if self.commandHandler.cloudEvent is not None:
-                                self.commandHandler.cloudEvent.set()
-
-                        elif self.isJson("GPicture", jsonStr):
-                            self.commandHandler.picture = GPicture()
-                            self.commandHandler.picture.fromJSON(jsonStr)
-                            if self.commandHandler.pictureEvent is not None:
-                                self.commandHandler.pictureEvent.set()
-
-                        elif self.isJson("GPhotogrammetryProjectCompareStats", jsonStr):
-                            self.commandHandler.photogrammetryProjectCompareStats = GPhotogrammetryProjectCompareStats()
-
-                            try:
-                                self.commandHandler.photogrammetryProjectCompareStats.fromJSON(jsonStr)
-                            except Exception:
-                                pass
-
-                            if self.commandHandler.photogrammetryProjectCompareStatsEvent is not None:
-                                self.commandHandler.photogrammetryProjectCompareStatsEvent.set()
-
-                        elif self.isJson("GMatrix", jsonStr):
-                            self.commandHandler.matrix = GMatrix()
-                            self.commandHandler.matrix.fromJSON(jsonStr)
-                            if self.commandHandler.matrixEvent is not None:
-                                self.commandHandler.matrixEvent.set()
-
-                        elif self.isJson("scalebars", jsonStr):
-                            self.commandHandler.scaleBars = ScaleBars()
-                            self.commandHandler.scaleBars.fromJSON(json.loads(jsonStr))
-                            if self.commandHandler.scaleBarsEvent is not None:
-                                self.commandHandler.scaleBarsEvent.set()
-
-                        else:
-                            print(jsonStr)
-
-                    # data = data.replace("<json>", "")
-                    # jsonStr = data.replace("<\\json>", "")
-                    # self.commandHandler.jsonStr = jsonStr
-                    # jsonStr = ''
-                    # data = ''
-            except Exception as e:
-                print(str(e))
+                if not tmp:
+                    time.sleep(0.25)
+                    continue
 
-    def parseIntoJsonStrings(self, jsonStrings: list, data: str):
-        header = "<json>"
-        footer = "<\\json>"
+                recorder = getattr(self.commandHandler, "recorder", None)
+                parser.keepStreamed = recorder is not None
 
-        while data.find("<\\json>") >= 0:
-
-            firstB = data.find(header)
-            firstE = data.find(footer)
+                # Old style data came in with <data> <\data>
+                # the parser just counts it because we don't handle it in Python
+                dataFrameCount = parser.dataFrameCount
+                jsonStrings = parser.feed(tmp)
+                if parser.dataFrameCount != dataFrameCount:
+                    print(str(parser.dataFrameCount))
 
-            subLen = firstE - firstB - len(footer) + 1
-            start = firstB + len(header)
+                # streamed frames do not pass handleJson, record them here
+                streamed, parser.streamed = parser.streamed, []
+                if recorder is not None:
+                    for jsonStr in streamed:
+                        recorder.data(jsonStr)
 
-            subString = ""
+                for jsonStr in jsonStrings:
+                    self.handleJson(jsonStr)
 
-            try:
-                subString = data[start : start + subLen]
-                jsonStrings.append(subString)
+            except Exception as e:
+                # the socket is closed under the recv by VSocketHandler.close
+                if self.socketHandler.closed:
+                    break
+                print(str(e))
 
-                start = firstE + len(footer)
-                data = data[start:]
+    def handleJson(self, jsonStr: str):
+        """
+        Decodes a single json frame and hands it to the waiting command
+        """
+        # print(jsonStr)
+        recorder = getattr(self.commandHandler, "recorder", None)
+        if recorder is not None:
+            recorder.data(jsonStr)
 
-            except Exception:
-                #  Let it fail
-                subString = ""
-                data = ""
+        # a raw request decodes the frame itself, off this thread
+        requests = getattr(self.commandHandler, "dataRequests", None)
+        if requests is not None and requests.resolveRaw(jsonObjectName(jsonStr), jsonStr):
+            return
 
-        return data
+        objectName, value = decodeJsonFrame(jsonStr)
 
-    def isJson(self, objectName="", json=""):
-        index1 = json.find("{")
-        index2 = json.find("{", index1 + 1)
+        if objectName is None:
+            print(jsonStr)
+            return
 
-        index3 = json.find(objectName)
-        if index3 > index1 and index3 < index2:
-            return True
+        routeJsonObject(self.commandHandler, objectName, value)
 
-        return False
+    def isJson(self, objectName="", json=""):
+        return isJsonObject(objectName, json)
 
 
 # This is the main class
 
 
-class VSTARS(metaclass=Singleton):
+class VSTARSClient:
     """
     The main interface class to control V-STARS From Python
 
@@ -315,6 +556,18 @@ class VSTARS(metaclass=Singleton):
         if __name__ == "__main__":
             main()
 
+    VSTARS is the default client shared by the whole script. Each VSTARSClient has its
+    own connection, so one script can control several V-STARS workstations (see VSTARSPool).
+
+    .. code:: python
+
+        from vstars import VSTARSClient
+
+        station1 = VSTARSClient()
+        station1.init("192.168.0.11")
+        station2 = VSTARSClient()
+        station2.init("192.168.0.12")
+
     """
 
     # Deprecated
@@ -326,8 +579,9 @@ class VSTARS(metaclass=Singleton):
         self._lastCommandError = b
 
     # The all doing command that will send via tcpip the ascii VSTARS command
+    # Returns the CommandResult holding the values of this command only
     # Private function
-    def __vexec(self, command):
+    def __vexec(self, command) -> CommandResult:
         self.jsonStr = ""
 
         try:
@@ -341,14 +595,113 @@ class VSTARS(metaclass=Singleton):
         if self.verbose:
             print(time.strftime("%Y-%m-%dT%H:%M:%S: ", time.localtime()), command)
 
-        self.socketHandler.sendCommand(command)
+        return self.socketHandler.sendCommand(command)
+
+    # Sends a command whose object comes back on the data socket
+    # Returns (future of the object, CommandResult), see VDataRequests
+    # Private function
+    def __vexecData(self, command, objectName):
+        try:
+            self.initCalled
+        except Exception:
+            self.init()
+
+        # registered and sent as one step so the requests are in the order of the commands
+        with self.requestLock:
+            request = self.dataRequests.register(objectName)
+            try:
+                result = self.__vexec(command)
+            except Exception:
+                self.dataRequests.discard(request)
+                raise
+
+        return request, result
+
+    # Sends commands whose objects come back on the data socket, pipelined
+    # Returns a future per command, see VDataRequests
+    # Private function
+    def __vexecDataMany(self, commands, objectName, depth=16, raw=False):
+        try:
+            self.initCalled
+        except Exception:
+            self.init()
+
+        if self.verbose:
+            for command in commands:
+                print(time.strftime("%Y-%m-%dT%H:%M:%S: ", time.localtime()), command)
+
+        # registered and sent as one step so the requests are in the order of the commands
+        with self.requestLock:
+            requests = [self.dataRequests.register(objectName, raw) for command in commands]
+            try:
+                results = self.__sendCommandsUnchecked(commands, depth)
+            except Exception:
+                for request in requests:
+                    self.dataRequests.discard(request)
+                raise
+
+            # no later command has been sent yet to claim the objects of the failed ones
+            failed = self.dataRequests.discardFailed(requests, results)
+
+        if failed:
+            for request in requests:
+                request.cancel()
+            self.__handleCommandError(failed[0])
+
+        return requests
+
+    # Sends commands pipelined, the failed ones are returned like the others
+    # Private function
+    def __sendCommandsUnchecked(self, commands, depth):
+        return self.socketHandler.sendCommands(list(commands), depth=depth, raiseErrors=False)
+
+    # Raises the error of a failed command
+    # Private function
+    def __handleCommandError(self, result):
+        self.socketHandler.handleError(result)
+
+    def executeCommands(self, commands, depth=16):
+        """
+        Sends several V-STARS commands at once without waiting for each reply in turn.
+
+        This hides the TCP and V-STARS dispatch latency when many small queries are made,
+        see PicturesInformationMany for an example.
+
+        :param commands: A list of command strings
+        :param depth: The maximum number of commands sent ahead of their replies
+
+        :returns: a CommandResult per command, in the order the commands were given
+
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details. All replies are read before the first error is raised.
+
+        """
+        try:
+            self.initCalled
+        except Exception:
+            self.init()
+
+        if self.verbose:
+            for command in commands:
+                print(time.strftime("%Y-%m-%dT%H:%M:%S: ", time.localtime()), command)
+
+        return self.socketHandler.sendCommands(list(commands), depth=depth)
 
     # Private Function
     def __connect(self, address, port):
-        self.socketHandler = VSocketHandler(address, port)
-        self.connectionTimer = VConnectionTimer()
+        self.socketHandler = VSocketHandler(address, port, self)
+        self.requestLock = self.socketHandler.lock
+        self.dataRequests = VDataRequests()
+        self.connectionTimer = VConnectionTimer(self)
         self.connectionTimer.start()
-        self.dataTimer = VDataSocketTimer()
+        self.dataTimer = VDataSocketTimer(self)
+
+    def close(self):
+        """
+        Closes the connection to V-STARS
+        """
+        if hasattr(self, "socketHandler"):
+            self.socketHandler.close()
+            self.dataRequests.failAll(Exception("The connection to V-STARS was closed"))
 
     def init(self, address="localhost", port=1210):
         """
@@ -362,6 +715,7 @@ class VSTARS(metaclass=Singleton):
 
         self.verbose = False
         self.returnValueManager = VReturnValueManager()
+        self.lastResult = CommandResult()
         self.address = address
         self.port = port
         self.jsonStr = ""
@@ -406,7 +760,7 @@ class VSTARS(metaclass=Singleton):
         self.scaleBarsEvent = None
 
         self.photogrammetryProjectCompareStats = None
-        self.photogrammetryProjectCompareEvent = None
+        self.photogrammetryProjectCompareStatsEvent = None
         
     def __parseVstarsVersion(self, dottedVersion):
         """
@@ -519,8 +873,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandsStr = "GetVstarsVersion(numeric={})".format(numeric)
-        self.__vexec(commandsStr)
-        rv = self.getValue("v.vstarsVersion")
+        reply = self.__vexec(commandsStr)
+        rv = reply.getValue("v.vstarsVersion")
         return rv
 
     def AddPoint(self, filename="", label="point", x=0, y=0, z=0):
@@ -539,8 +893,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandsStr = "AddPoint(filename={}, label={}, x={}, y={}, z={})".format(filename, label, x, y, z)
-        self.__vexec(commandsStr)
-        rv = self.getValue("v.vstarsVersion")
+        reply = self.__vexec(commandsStr)
+        rv = reply.getValue("v.vstarsVersion")
         return rv
 
     def AddBox(self, filename="", min_x=0., max_x = 0., min_y=0., max_y = 0.,min_z=0., max_z = 0.):
@@ -562,8 +916,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandsStr = "AddBox(filename={}, min_x={}, max_x={}, min_y={}, max_y={}, min_z={}, max_z={})".format(filename, min_x, max_x, min_y, max_y, min_z, max_z)
-        self.__vexec(commandsStr)
-        rv = self.getValue("v.vstarsVersion")
+        reply = self.__vexec(commandsStr)
+        rv = reply.getValue("v.vstarsVersion")
         return rv
 
     def CheckVstarsVersion(self, version):
@@ -599,6 +953,9 @@ class VSTARS(metaclass=Singleton):
         """
         Function to get various **v.xxx** return values from V-STARS' commands
 
+        Values are kept from every command sent so far (see setReturnValueLimit),
+        use lastResult to read only the values of the last command.
+
         :requires: *V-STARS 4.9.4.0 or greater*
 
         :param key:
@@ -608,6 +965,92 @@ class VSTARS(metaclass=Singleton):
         """
         return self.returnValueManager.getValue(key)
 
+    def setReturnValueLimit(self, maxKeys=None):
+        """
+        Bounds the number of values kept for getValue. Every command also returns its own
+        CommandResult (see lastResult) so the archive is only needed by older scripts.
+
+        :param maxKeys: None keeps every value (default), 0 keeps only the values of the last command.
+
+        """
+        self.returnValueManager.maxKeys = maxKeys
+        if maxKeys is not None:
+            self.returnValueManager.storeResult(self.lastResult)
+
+    def addInstrumentationSink(self, sink):
+        """
+        Records the timing of every command sent from now on.
+
+        The sink is called with a CommandTrace (command name, bytes sent and received,
+        send / wait / parse durations and the error status) after each reply is parsed.
+        VRingBufferSink, VCsvSink and VSpanSink are provided, any callable can be used.
+
+        .. code:: python
+
+            timings = VRingBufferSink()
+            V.addInstrumentationSink(timings)
+
+            V.ProjectAutomeasure(begin=True, close=True)
+            V.ProjectBundleRun()
+
+            for command, stats in timings.summary().items():
+                print("{} {:.1f} s".format(command, stats["totalSeconds"]))
+
+        :param sink: A callable taking a CommandTrace
+        """
+        # a new list so a command being traced on another thread is not disturbed
+        self.instrumentationSinks = getattr(self, "instrumentationSinks", []) + [sink]
+
+    def removeInstrumentationSink(self, sink):
+        self.instrumentationSinks = [s for s in getattr(self, "instrumentationSinks", []) if s is not sink]
+
+    def enableResultCache(self, cache: VResultCache = None, **kwargs):
+        """
+        Caches the results of Get3D, GetPicture and GetScaleBars until the project changes.
+
+        See VResultCache for how the results are keyed and invalidated.
+
+        .. code:: python
+
+            V.enableResultCache(maxItems=8, directory="C:/vstars_cache", maxDiskBytes=4 << 30)
+
+        :param cache: The VResultCache to use, a new one built from kwargs if None
+
+        :returns: the VResultCache
+        """
+        self.resultCache = cache if cache is not None else VResultCache(**kwargs)
+        return self.resultCache
+
+    def disableResultCache(self):
+        self.resultCache = None
+
+    def startRecording(self, filename):
+        """
+        Records every command, reply and data socket frame of this client to a session log.
+
+        Call it before init to also record the connection. The log can be served back to an
+        unmodified script with VSessionReplayer, offline and at full speed.
+
+        .. code:: python
+
+            V = VSTARS()
+            V.startRecording("cell1.vlog")
+            V.init()
+
+        :param filename: The log file, new records are appended
+
+        :returns: the VSessionRecorder
+        """
+        self.stopRecording()
+        self.recorder = VSessionRecorder(filename)
+        return self.recorder
+
+    def stopRecording(self):
+        recorder = getattr(self, "recorder", None)
+        self.recorder = None
+        if recorder is not None:
+            recorder.close()
+
     def scriptContinueData(self):
         """
         Returns the value of 'v.scriptContinueData' Used in conjunction with a USB6525
@@ -690,9 +1133,9 @@ class VSTARS(metaclass=Singleton):
         commandString = ("Project.Bundle.Run(Start={}, Accept={}, Initial Bundle={})").format(
             start, accept, initialBundle
         )
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
         results = BundleStats()
-        results.update(self.returnValueManager)
+        results.update(reply)
         return results
 
     def ProjectBundleSummary(self, filename=None):
@@ -711,9 +1154,9 @@ class VSTARS(metaclass=Singleton):
         if filename is not None:
             commandString += "filename={},".format(filename)
         commandString += ")"
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
         stats = BundleStats()
-        stats.update(self.returnValueManager)
+        stats.update(reply)
         return stats
 
     def ShowPythonConsole(self, show=True):
@@ -850,9 +1293,9 @@ class VSTARS(metaclass=Singleton):
         
         commandString = f"RelabelPicturePoint(picture={picture}, old_label={old_label}, new_label={new_label})"
         
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
         
-        return self.returnValueManager.getValue("v.PointRelabeled")
+        return reply.getValue("v.PointRelabeled")
 
     def FFTFind(
         self,
@@ -1040,9 +1483,9 @@ class VSTARS(metaclass=Singleton):
         commandString = commandString.rstrip(",")
         commandString += ")"
 
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
         results = BundleStats()
-        results.update(self.returnValueManager)
+        results.update(reply)
         return results
         # Hide bundle warnings
         # When present, warnings about running an initial bundle during the final bundle sequence will be hidden
@@ -1067,8 +1510,8 @@ class VSTARS(metaclass=Singleton):
         commandString = "ReverseAllTemplates("
         commandString += ("reverseX={}, reverseY={}, reverseZ={})").format(reverseX, reverseY, reverseZ)
 
-        self.__vexec(commandString)
-        return self.getValue("v.reverseCount")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.reverseCount")
 
     def PatternRelabel(
         self,
@@ -1356,6 +1799,71 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
 
         """
+        commandString = self.__picturesInformationCommand(index=index, picture=picture, radians=radians)
+        self.__vexec(commandString)
+
+    def PicturesInformationMany(self, indices, radians: bool = None, depth=16):
+        """
+        Pipelined PicturesInformation for many pictures at once.
+
+        :requires: *V-STARS 4.9.4.0 or greater*
+
+        :param indices: The picture indices whose information will be returned.
+        :param radians: If true, the angles will be expressed in radians, otherwise they will be specified in degrees.
+        :param depth: The maximum number of requests sent ahead of their replies.
+
+        :returns: a CommandResult per picture holding the values listed in PicturesInformation
+
+        .. code:: python
+
+            for info in V.PicturesInformationMany(range(V.GetNumberOfPictures())):
+                print(info.getValue("v.imageName"), info.getValue("v.pictureTotalResidualRMS"))
+
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details
+
+        """
+        commands = [self.__picturesInformationCommand(index=index, radians=radians) for index in indices]
+        return self.executeCommands(commands, depth=depth)
+
+    def PicturesInformationAll(self, indices=None, radians: bool = None, depth=64) -> np.ndarray:
+        """
+        The PicturesInformation values of every picture as one table
+
+        The requests are pipelined (see PicturesInformationMany) and the values are gathered
+        into one structured array, one row per picture and one typed column per value, so a
+        whole project is summarised without a round trip and a getValue per value.
+
+        :requires: *V-STARS 4.9.4.0 or greater*
+
+        :param indices: The picture indices, every picture of the project if None
+        :param radians: If true, the angles will be expressed in radians, otherwise they will be specified in degrees.
+        :param depth: The maximum number of requests sent ahead of their replies.
+
+        :returns: a structured array with the columns **index**, **resected** and every
+            PicturesInformation value without its "v.", e.g. **pictureTotalResidualRMS**.
+            Missing numbers are NaN for floats, -1 for ints and "" for strings.
+
+        .. code:: python
+
+            table = V.PicturesInformationAll()
+            worst = table[np.argsort(table["pictureTotalResidualRMS"])[::-1][:10]]
+            for row in worst:
+                print(row["imageName"], row["pictureTotalResidualRMS"], row["shutterUS"])
+
+            print(np.count_nonzero(~table["resected"]), "pictures are not resected")
+
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details
+
+        """
+        if indices is None:
+            indices = range(self.GetNumberOfPictures())
+        indices = list(indices)
+
+        results = self.PicturesInformationMany(indices, radians=radians, depth=depth)
+        return picturesInformationTable(results, indices)
+
+    # Private function
+    def __picturesInformationCommand(self, index: int = None, picture: int = None, radians: bool = None):
         commandString = "Pictures.Information("
 
         # one or the other
@@ -1368,7 +1876,7 @@ class VSTARS(metaclass=Singleton):
             commandString += "radians={},".format(radians)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
+        return commandString
 
     def PictureIsResected(self, index: int = None, picture: int = None):
         """
@@ -1395,8 +1903,8 @@ class VSTARS(metaclass=Singleton):
             commandString += "picture={}".format(picture)
 
         commandString += ")"
-        self.__vexec(commandString)
-        rv = self.getValue("v.pictureIsResected")
+        reply = self.__vexec(commandString)
+        rv = reply.getValue("v.pictureIsResected")
         return rv
 
     def GetDrivebackMedianPixelOfROI(self, image: int, filename = "", output_csv_file = "", roi_width: int = None, roi_height: int = None):
@@ -1584,9 +2092,9 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "Picture.SuperStart()"
-        self.__vexec(commandString)
-        pointCount = self.getValue("v.pointCount")
-        ellipseCount = self.getValue("v.ellipseCount")
+        reply = self.__vexec(commandString)
+        pointCount = reply.getValue("v.pointCount")
+        ellipseCount = reply.getValue("v.ellipseCount")
         return pointCount, ellipseCount
 
     def FileOpenTemplateProject(self,
@@ -1721,8 +2229,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandsStr = "GetNumberOfCameras()"
-        self.__vexec(commandsStr)
-        rv = self.getValue("v.numberOfCameras")
+        reply = self.__vexec(commandsStr)
+        rv = reply.getValue("v.numberOfCameras")
         if rv is None:
             rv = -1
         return rv
@@ -1828,9 +2336,9 @@ class VSTARS(metaclass=Singleton):
 
 
     def GetCameraParameters(self, on=True):
-        self.__vexec("GetCameraParameters()")
-        nCameras = self.returnValueManager.getValue("v.numCameras")
-        params = self.returnValueManager.getValue("v.Parameters")
+        reply = self.__vexec("GetCameraParameters()")
+        nCameras = reply.getValue("v.numCameras")
+        params = reply.getValue("v.Parameters")
 
         return int(nCameras), params.split()
 
@@ -1850,8 +2358,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "GetNumberOfPictures()"
-        self.__vexec(commandString)
-        rv = self.getValue("v.pictureCount")
+        reply = self.__vexec(commandString)
+        rv = reply.getValue("v.pictureCount")
         return rv
 
     def StopLookingForPictures(self):
@@ -1890,8 +2398,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "UnselectPointsAll()"
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def SelectPointsGreaterThan(
         self, filename=None, x=None, y=None, z=None, theta=None, radius=None, measured=True, design=False
@@ -1956,8 +2464,8 @@ class VSTARS(metaclass=Singleton):
             commandString += "measured=true,"
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def SelectPointsLessThan(
         self, filename=None, x=None, y=None, z=None, theta=None, radius=None, measured=True, design=False
@@ -2022,8 +2530,8 @@ class VSTARS(metaclass=Singleton):
             commandString += "measured=true,"
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def SelectPointsSigmaGreaterThan(
         self, filename=None, sx=None, sy=None, sz=None, total=None, measured=True, design=False
@@ -2060,8 +2568,8 @@ class VSTARS(metaclass=Singleton):
             commandString += "measured=true,"
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def SelectPointsByLabel(
         self,
@@ -2123,8 +2631,8 @@ class VSTARS(metaclass=Singleton):
 
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def Prompt(self, label, title: str = None):
         """
@@ -2175,9 +2683,9 @@ class VSTARS(metaclass=Singleton):
 
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
 
-        return self.getValue("v.selection")
+        return reply.getValue("v.selection")
 
     def Message(self, message: str = None, title: str = None, yesno: bool = None, modeless: bool = None):
         """
@@ -2478,8 +2986,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = ("UnSelectPointsByLabel(labels={})").format(labels)
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def XYZShiftTo(
         self,
@@ -2694,10 +3202,6 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
 
         """
-        # the matrix is only returned on 4.9.6-dev249 or greater
-        if self.CheckVstarsVersion(40090060000249):
-            self.matrixEvent = Event()
-
         commandString = "3D.Alignment.Axis("
         if filename is not None:
             commandString += "filename={},".format(filename)
@@ -2715,18 +3219,13 @@ class VSTARS(metaclass=Singleton):
             commandString += "new={},".format(newCoordinateSystem)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
 
         # the matrix is only returned on 4.9.6-dev249 or greater
         if self.CheckVstarsVersion(40090060000249):
-            self.matrixEvent.wait(timeout=timeout)
-
-            matrix = self.matrix
-            self.matrixEvent = None
+            request, reply = self.__vexecData(commandString, "GMatrix")
+            return self.dataRequests.wait(request, timeout, "the Alignment")
 
-            if matrix is None:
-                raise Exception("A timeout occurred waiting for the Alignment")
-            return matrix
+        self.__vexec(commandString)
 
     def XYZAlignmentQuick(
         self,
@@ -2805,10 +3304,6 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
 
         """
-        # the matrix is only returned on 4.9.4-1 or greater
-        if self.CheckVstarsVersion(40090040010000):
-            self.matrixEvent = Event()
-
         commandString = "3D.Alignment.Quick("
         if filename is not None:
             commandString += "filename={},".format(filename)
@@ -2834,20 +3329,19 @@ class VSTARS(metaclass=Singleton):
             commandString += "altTrans={},".format(altTrans)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-
-        if (stats is not None):
-            stats.update(self.returnValueManager)
 
         # the matrix is only returned on 4.9.4-1 or greater
+        request = None
         if self.CheckVstarsVersion(40090040010000):
-            self.matrixEvent.wait(timeout=timeout)
+            request, reply = self.__vexecData(commandString, "GMatrix")
+        else:
+            reply = self.__vexec(commandString)
 
-            matrix = self.matrix
-            self.matrixEvent = None
+        if (stats is not None):
+            stats.update(reply)
 
-            if matrix is None:
-                raise Exception("A timeout occurred waiting for the Alignment")
+        if request is not None:
+            matrix = self.dataRequests.wait(request, timeout, "the Alignment")
 
             H = GTransformationMatrix()
             H.fromGMatrix(matrix)
@@ -2897,9 +3391,9 @@ class VSTARS(metaclass=Singleton):
             commandString += "rejection={},".format(rejection)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
 
-        rms = self.getValue("v.alignmentRMSTotal")
+        rms = reply.getValue("v.alignmentRMSTotal")
         return rms
 
         # the matrix is only returned on 4.9.4-1 or greater
@@ -2993,10 +3487,6 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
 
         """
-        # the matrix is only returned on 4.9.4-1 or greater
-        if self.CheckVstarsVersion(40090040010000):
-            self.matrixEvent = Event()
-
         commandString = "3D.Alignment.Standard("
         if filename is not None:
             commandString += "filename={},".format(filename)
@@ -3022,20 +3512,19 @@ class VSTARS(metaclass=Singleton):
             commandString += "altTrans={},".format(altTrans)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-
-        if (stats is not None):
-            stats.update(self.returnValueManager)
 
         # the matrix is only returned on 4.9.4-1 or greater
+        request = None
         if self.CheckVstarsVersion(40090040010000):
-            self.matrixEvent.wait(timeout=timeout)
+            request, reply = self.__vexecData(commandString, "GMatrix")
+        else:
+            reply = self.__vexec(commandString)
 
-            matrix = self.matrix
-            self.matrixEvent = None
+        if (stats is not None):
+            stats.update(reply)
 
-            if matrix is None:
-                raise Exception("A timeout occurred waiting for the Alignment")
+        if request is not None:
+            matrix = self.dataRequests.wait(request, timeout, "the Alignment")
 
             H = GTransformationMatrix()
             H.fromGMatrix(matrix)
@@ -3078,10 +3567,10 @@ class VSTARS(metaclass=Singleton):
             commandString += "hide dialog={},".format(hideDialog)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
         
         stats = AlignmentStats()
-        stats.update(self.returnValueManager)
+        stats.update(reply)
         return stats
 
     def XYZAlignmentResidualsStandard(self, filename=None, save=None, rejection=-1, ok=False, newFilename=None):
@@ -3119,9 +3608,9 @@ class VSTARS(metaclass=Singleton):
             commandString += "new filename={},".format(newFilename)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
         stats = AlignmentStats()
-        stats.update(self.returnValueManager)
+        stats.update(reply)
         return stats
 
     def XYZFindCommonPointsAndRelabel(self, filename: str = None):
@@ -3152,8 +3641,8 @@ class VSTARS(metaclass=Singleton):
         if filename is not None:
             commandString += "filename={}".format(filename)
         commandString += ")"
-        self.__vexec(commandString)
-        return self.getValue("v.NumberOfRelabeledPoints")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.NumberOfRelabeledPoints")
 
     def XYZFilterMeasuredPointsUsingSurface(self, labels_wildcard: str = None, filename: str = None,  alignToSurface=False, multiplier=None, add=None):
         """
@@ -3190,8 +3679,8 @@ class VSTARS(metaclass=Singleton):
             commandString += "add={},".format(add)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        return self.getValue("v.NumberOfDeletedPoints")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.NumberOfDeletedPoints")
 
     def XYZInterpolate(
         self,
@@ -3339,8 +3828,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "SystemPath()"
-        self.__vexec(commandString)
-        path = str(self.getValue("v.systemPath"))
+        reply = self.__vexec(commandString)
+        path = str(reply.getValue("v.systemPath"))
         path += "\\"
         return path
 
@@ -3356,8 +3845,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "ProjectPath()"
-        self.__vexec(commandString)
-        path = self.getValue("v.projectPath")
+        reply = self.__vexec(commandString)
+        path = reply.getValue("v.projectPath")
         path += "\\"
         return path
 
@@ -3373,8 +3862,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "ProjectPath()"
-        self.__vexec(commandString)
-        path = self.getValue("v.projectPath")
+        reply = self.__vexec(commandString)
+        path = reply.getValue("v.projectPath")
         name = Path(path).stem
         return name
 
@@ -3390,8 +3879,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "GetProjectCloudNames()"
-        self.__vexec(commandString)
-        clouds = self.getValue("v.projectCloudNames")
+        reply = self.__vexec(commandString)
+        clouds = reply.getValue("v.projectCloudNames")
 
         if clouds is not None:
             cloud_names = clouds.split("|")
@@ -3411,8 +3900,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "UnSelectCirclesByLabel(labels={})".format(labels)
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def UnSelectPlanesByLabel(self, labels=""):
         """
@@ -3425,8 +3914,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "UnSelectPlanesByLabel(labels={})".format(labels)
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def UnSelectPointsGreaterThan(self, x=None, y=None, z=None, radius=None):
         """
@@ -3478,8 +3967,8 @@ class VSTARS(metaclass=Singleton):
             commandString += "radius={}".format(radius)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def UnSelectPointsLessThan(self, x=None, y=None, z=None, radius=None):
         """
@@ -3532,8 +4021,8 @@ class VSTARS(metaclass=Singleton):
             commandString += "radius={},".format(radius)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def GetClosestPoint(self, fromPoint: str = None):
         """
@@ -3556,9 +4045,9 @@ class VSTARS(metaclass=Singleton):
         #commandString = commandString.rstrip(",")
         commandString += ")"
 
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
 
-        closestPoint = self.getValue("v.closestPoint")
+        closestPoint = reply.getValue("v.closestPoint")
 
         return closestPoint
 
@@ -3591,9 +4080,9 @@ class VSTARS(metaclass=Singleton):
         #commandString = commandString.rstrip(",")
         commandString += ")"
 
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
 
-        return self.getValue("v.furthestPoint")
+        return reply.getValue("v.furthestPoint")
 
     def RelabelAutomatch(self, prefix, filename: str = None):
         """
@@ -3758,9 +4247,9 @@ class VSTARS(metaclass=Singleton):
         # commandString = commandString.rstrip(",")
         commandString += ")"
 
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
 
-        return self.getValue("v.pointi"), self.getValue("v.pointj"), self.getValue("v.pointk")
+        return reply.getValue("v.pointi"), reply.getValue("v.pointj"), reply.getValue("v.pointk")
 
     def RelabelByAngle(
         self,
@@ -3825,9 +4314,9 @@ class VSTARS(metaclass=Singleton):
         commandString = commandString.rstrip(",")
         commandString += ")"
 
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
 
-        return self.getValue("v.relabelCount")
+        return reply.getValue("v.relabelCount")
 
     def RelabelPairsByAngle(
         self,
@@ -3892,11 +4381,11 @@ class VSTARS(metaclass=Singleton):
 
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
 
-        r1 = self.getValue("v.matchingPairsCount")
-        r2 = self.getValue("v.matchingPairsOrphanCount")
-        r3 = self.getValue("v.matchingPairsOutOfTolerance")
+        r1 = reply.getValue("v.matchingPairsCount")
+        r2 = reply.getValue("v.matchingPairsOrphanCount")
+        r3 = reply.getValue("v.matchingPairsOutOfTolerance")
 
         return r1, r2, r3
 
@@ -4218,8 +4707,8 @@ class VSTARS(metaclass=Singleton):
         if filename is not None:
             commandString += "filename={},".format(filename)
         commandString += "measured={}, design={})".format(measured, design)
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def SelectPlanesAll(self, filename=None, measured=True, design=False):
         """
@@ -4256,8 +4745,8 @@ class VSTARS(metaclass=Singleton):
         if filename is not None:
             commandString += "filename={},".format(filename)
         commandString += "measured={}, design={})".format(measured, design)
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def SortSelectedPoints(self, theta=False):
         """
@@ -4370,8 +4859,8 @@ class VSTARS(metaclass=Singleton):
 
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
         """
-        self.__vexec("MModeGetContinuousTriggerMode()")
-        return self.getValue("v.ContinuousTriggerMode")
+        reply = self.__vexec("MModeGetContinuousTriggerMode()")
+        return reply.getValue("v.ContinuousTriggerMode")
 
     def MModeOn(
         self,
@@ -5036,8 +5525,8 @@ class VSTARS(metaclass=Singleton):
         if design:
             measured = False
         commandString += f"measured={measured}, design={design}, construction={construction})"
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def PasteSelection(self, filename=None, measured=None, design=None, overwrite=None, append=None):
         """
@@ -5169,8 +5658,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "GetProjectFileNames()"
-        self.__vexec(commandString)
-        return self.getValue("v.projectDriver"), self.getValue("v.projectTriangulation")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.projectDriver"), reply.getValue("v.projectTriangulation")
 
     def XYZDetailFile(self, filename=None):
         """
@@ -5352,10 +5841,10 @@ class VSTARS(metaclass=Singleton):
             commandString += f"only AutoMatched={onlyAutoMatched},"
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
         
         results = AutoRelabelResults()
-        results.update(self.returnValueManager)
+        results.update(reply)
         return results
 
     def XYZPointsMoveToDesign(self, filename=None, overwrite=False):
@@ -5461,8 +5950,8 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
         """
         commandString = "GetCameraName(index={})".format(index)
-        self.__vexec(commandString)
-        rv = self.getValue("v.cameraName")
+        reply = self.__vexec(commandString)
+        rv = reply.getValue("v.cameraName")
         return rv
 
     def ClosePicture(self, camera="", index=0):
@@ -5536,8 +6025,8 @@ class VSTARS(metaclass=Singleton):
             commandString += f"camera={camera},"
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        temp = self.getValue("v.cameraTemperature")
+        reply = self.__vexec(commandString)
+        temp = reply.getValue("v.cameraTemperature")
         return temp
 
     def GetCameraFileName(self, index=0):
@@ -5549,8 +6038,8 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
         """
         commandString = "GetCameraFileName(index={})".format(index)
-        self.__vexec(commandString)
-        return self.getValue("v.cameraFileName")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.cameraFileName")
 
     def Beep(self, success=False, failure=False, sound=""):
         """
@@ -5591,11 +6080,11 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
         """
         commandString = "ProSpotStatus()"
-        self.__vexec(commandString)
-        self.proSpotFocusing = self.getValue("v.proSpotFocusing")
-        self.proSpotFocus = self.getValue("v.proSpotFocus")
-        self.proSpotPower = self.getValue("v.proSpotPower")
-        self.proSpotEnabled = self.getValue("v.proSpotEnabled")
+        reply = self.__vexec(commandString)
+        self.proSpotFocusing = reply.getValue("v.proSpotFocusing")
+        self.proSpotFocus = reply.getValue("v.proSpotFocus")
+        self.proSpotPower = reply.getValue("v.proSpotPower")
+        self.proSpotEnabled = reply.getValue("v.proSpotEnabled")
 
     def ProSpotCell(self, on=False):
         """
@@ -5757,8 +6246,8 @@ class VSTARS(metaclass=Singleton):
         commandString = "SelectPlanesByLabel(filename={}, measured={}, design={}, labels={})".format(
             filename, measured, design, labels
         )
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def SelectCirclesByLabel(self, filename="", measured=False, design=False, labels=""):
         """
@@ -5795,8 +6284,8 @@ class VSTARS(metaclass=Singleton):
         commandString = "SelectCirclesByLabel(filename={}, measured={}, design={}, labels={})".format(
             filename, measured, design, labels
         )
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def SelectClosePoints(self, filename="", distance=0, onlyAutomatched=False):
         """
@@ -5829,8 +6318,8 @@ class VSTARS(metaclass=Singleton):
         commandString = "SelectClosePoints(filename={}, distance={}, only Automatched={})".format(
             filename, distance, onlyAutomatched
         )
-        self.__vexec(commandString)
-        return self.getValue("v.selectionTotalNumberSelected"), self.getValue("v.selectionNumberFound")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.selectionTotalNumberSelected"), reply.getValue("v.selectionNumberFound")
 
     def PicturesResect(self, pictures="", rejection=0, automaticRejection=False):
         """
@@ -5947,9 +6436,9 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = ("MMode.Stable Camera Orientation Bundle(Accept={})").format(accept)
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
         results = BundleStats()
-        results.update(self.returnValueManager)
+        results.update(reply)
         return results
 
     def MModeSetup(
@@ -6266,10 +6755,10 @@ class VSTARS(metaclass=Singleton):
             commandString += "maxz={},".format(maxz)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
+        reply = self.__vexec(commandString)
 
-        matchSuccessCount = self.getValue("v.matchSuccessCount")
-        matchPatternCount = self.getValue("v.matchPatternCount")
+        matchSuccessCount = reply.getValue("v.matchSuccessCount")
+        matchPatternCount = reply.getValue("v.matchPatternCount")
 
         return matchSuccessCount, matchPatternCount
 
@@ -6443,8 +6932,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "Project.isHoleMeasurement()"
-        self.__vexec(commandString)
-        return self.getValue("v.isHoleMeasurement")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.isHoleMeasurement")
 
     def setHoleProcAlreadyRun(self, value=True):
         """
@@ -6468,8 +6957,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "Project.isHoleProcAlreadyRun()"
-        self.__vexec(commandString)
-        return self.getValue("v.isHoleProcAlreadyRun")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.isHoleProcAlreadyRun")
 
     def AddErrorToInfoDoc(self, message=""):
         """
@@ -6568,8 +7057,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = ("CreateHoleMeasurementTemplateFiles(filename={}, side={})").format(filename, side)
-        self.__vexec(commandString)
-        return self.getValue("v.holeMeasurementFeatureCount")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.holeMeasurementFeatureCount")
 
     def ShowHoleMeasurementInitDlg(self, selectSide=True):
         """
@@ -6583,8 +7072,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = ("ShowHoleMeasurementInitDlg(selectSide={})").format(selectSide)
-        self.__vexec(commandString)
-        return self.getValue("v.AirplaneHoleSide")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.AirplaneHoleSide")
 
     def LoadHoleMeasurementAirplaneSide(self):
         """
@@ -6596,8 +7085,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "Project.LoadHoleMeasurementSide()"
-        self.__vexec(commandString)
-        return self.getValue("v.AirplaneHoleSide")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.AirplaneHoleSide")
 
     def ShowHoleMeasurementModelessDlg(self):
         """
@@ -6627,19 +7116,9 @@ class VSTARS(metaclass=Singleton):
         self.jsonStr = ""
         commandString = f"CompareCPP(filename1={filename1}, filename2={filename2}, doTRans={doTrans})"
 
-        self.photogrammetryProjectCompareStatsEvent = Event()
-
-        self.__vexec(commandString)
-
-        self.photogrammetryProjectCompareStatsEvent.wait(timeout=timeout)
-        self.photogrammetryProjectCompareStatsEvent = None
-
-        stats = self.photogrammetryProjectCompareStats
-
-        if stats is None:
-            raise Exception("A timeout occurred waiting for ComparePhotogrammetryProjects")
+        request, reply = self.__vexecData(commandString, "GPhotogrammetryProjectCompareStats")
 
-        return stats
+        return self.dataRequests.wait(request, timeout, "ComparePhotogrammetryProjects")
 
     def RemoveAllScanPoints(self):
         """
@@ -6716,21 +7195,68 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
 
         """
-        self.cloud = None
+        cache = getattr(self, "resultCache", None)
+        if cache is not None:
+            key = cache.key(self, "Get3D", filename)
+            cloud = cache.get(key)
+            if cloud is not None:
+                return cloud
+
         commandString = ("Get3D(filename={})").format(filename)
 
-        self.cloudEvent = Event()
+        request, reply = self.__vexecData(commandString, "GCloud")
 
-        self.__vexec(commandString)
+        cloud = self.dataRequests.wait(request, timeout, "Get3D")
 
-        self.cloudEvent.wait(timeout=timeout)
-        self.cloudEvent = None
+        if cache is not None:
+            cache.put(key, cloud)
+        return cloud
+
+    def Get3DStream(self, filename="", batchSize=10000, timeout=None) -> GCloudStreamDecoder:
+        """
+        Gets a 3D cloud from V-STARS in batches of points, decoded while the cloud is still arriving
 
-        cloud = self.cloud
+        The points are decoded while the frame arrives, the json text and its parsed form are
+        never held whole. This does not bound the memory: V-STARS sends the frame before the
+        reply, so usually every batch is decoded and queued before Get3DStream returns. Only
+        once the iteration has started does a slow loop hold the rest of the transfer back.
 
-        if cloud is None:
-            raise Exception("A timeout occurred waiting for Get3D")
-        return cloud
+        Do not send data commands (GetPicture, Get3D, ...) inside the loop while the cloud is
+        still arriving, their objects queue behind the stream; they raise an exception instead
+        of hanging. Collect what they need and send them after the loop.
+
+        :requires: *V-STARS 4.9.4.0 or greater*
+
+        :param filename: The name of the 3D file
+        :param batchSize: The number of points per batch
+        :param timeout: Seconds to wait for each batch, None waits for ever
+
+        :returns: an iterable of GCloud batches
+
+        .. code:: python
+
+            total = 0
+            with V.Get3DStream(filename="Scan", batchSize=50000) as stream:
+                for batch in stream:
+                    total += np.count_nonzero(batch.xyz[:, 2] > 100.0)
+
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details
+
+        """
+        stream = GCloudStreamDecoder(batchSize, timeout)
+
+        # the stream takes its turn among the other GCloud requests, see VDataRequests
+        with self.requestLock:
+            request = self.dataRequests.register(stream.objectName, stream=stream)
+            try:
+                self.__vexec(("Get3D(filename={})").format(filename))
+            except Exception as ex:
+                # the frame is not coming, do not let the stream take the next one
+                self.dataRequests.discard(request)
+                stream.fail(ex)
+                raise
+
+        return stream
 
     def GetPicture(self, index: int, timeout=None) -> GPicture:
         """
@@ -6744,21 +7270,103 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
 
         """
-        self.picture = None
+        cache = getattr(self, "resultCache", None)
+        if cache is not None:
+            key = cache.key(self, "GetPicture", index)
+            picture = cache.get(key)
+            if picture is not None:
+                return picture
+
         commandString = f"GetPicture(index={index})"
 
-        self.pictureEvent = Event()
+        request, reply = self.__vexecData(commandString, "GPicture")
 
-        self.__vexec(commandString)
+        picture = self.dataRequests.wait(request, timeout, "GetPicture")
 
-        self.pictureEvent.wait(timeout=timeout)
-        self.pictureEvent = None
+        if cache is not None:
+            cache.put(key, picture)
+        return picture
 
-        picture = self.picture
+    def GetPictures(self, indices, timeout=None, depth=16, executor=None) -> PictureSet:
+        """
+        Gets many pictures from V-STARS at once
 
-        if picture is None:
-            raise Exception("A timeout occurred waiting for GetPicture")
-        return picture
+        The GetPicture requests are sent back to back and each picture is routed to its own
+        request. The frames are decoded on executor, off the data socket thread, while the
+        next ones are still arriving.
+
+        :requires: *V-STARS 4.9.9.0 or greater*
+
+        :param indices: The picture indices
+        :param timeout: Seconds to wait for each picture, None waits for ever
+        :param depth: The maximum number of requests sent ahead of their replies
+        :param executor: The concurrent.futures executor decoding the frames, a ProcessPoolExecutor
+            decodes on several cores. A pool of two threads is used for the call if None.
+
+        :returns: a PictureSet holding the pictures in the order of indices
+
+        .. code:: python
+
+            with concurrent.futures.ProcessPoolExecutor() as pool:
+                pictures = V.GetPictures(range(100), executor=pool)
+
+            stats = pictures.residualStats()
+
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details
+
+        """
+        indices = list(indices)
+        pictures = [None] * len(indices)
+
+        cache = getattr(self, "resultCache", None)
+        if cache is not None:
+            keys = cache.keys(self, "GetPicture", indices)
+            pictures = [cache.get(key) for key in keys]
+
+        missing = [slot for slot, picture in enumerate(pictures) if picture is None]
+        commands = [f"GetPicture(index={indices[slot]})" for slot in missing]
+        requests = self.__vexecDataMany(commands, "GPicture", depth, raw=True)
+
+        ownExecutor = executor is None
+        if ownExecutor:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+        try:
+            decoding = []
+            for slot, request in zip(missing, requests):
+                value = self.dataRequests.wait(request, timeout, "GetPictures")
+                if isinstance(value, str):
+                    value = executor.submit(decodePicture, value)
+                decoding.append((slot, value))
+
+            for slot, value in decoding:
+                pictures[slot] = value.result() if isinstance(value, concurrent.futures.Future) else value
+                if cache is not None:
+                    cache.put(keys[slot], pictures[slot])
+        finally:
+            # after a timeout the pictures still to come are dropped as they arrive
+            for request in requests:
+                request.cancel()
+            if ownExecutor:
+                executor.shutdown()
+
+        return PictureSet.fromPictures(pictures, indices)
+
+    def GetAllPictures(self, timeout=None, depth=16, executor=None) -> PictureSet:
+        """
+        Gets every picture of the project, see GetPictures
+
+        :requires: *V-STARS 4.9.9.0 or greater*
+
+        .. code:: python
+
+            pictures = V.GetAllPictures()
+            print(len(pictures), "pictures", len(pictures.labels), "image points")
+
+        :raises: Exception see `Error Handling <error_handling.html>`_ for details
+
+        """
+        return self.GetPictures(range(self.GetNumberOfPictures()), timeout=timeout, depth=depth, executor=executor)
 
     def GetSelection(self, timeout=None) -> GCloud:
         """
@@ -6771,21 +7379,11 @@ class VSTARS(metaclass=Singleton):
         :raises: Exception see `Error Handling <error_handling.html>`_ for details
 
         """
-        self.cloud = None
         commandString = "GetSelection()"
 
-        self.cloudEvent = Event()
+        request, reply = self.__vexecData(commandString, "GCloud")
 
-        self.__vexec(commandString)
-
-        self.cloudEvent.wait(timeout=timeout)
-        self.cloudEvent = None
-
-        cloud = self.cloud
-
-        if cloud is None:
-            raise Exception("A timeout occurred waiting for Get3D")
-        return cloud
+        return self.dataRequests.wait(request, timeout, "GetSelection")
 
     def TransformCurves(self, fillCloudName="", curveDriver="", step=1.0, design=True):
         """
@@ -7037,9 +7635,9 @@ class VSTARS(metaclass=Singleton):
             smoothing,
         )
 
-        self.__vexec(commandString)
-        self.CurvesSucceeded = self.getValue("v.CurvesSucceeded")
-        self.CurvesFailed = self.getValue("v.CurvesFailed")
+        reply = self.__vexec(commandString)
+        self.CurvesSucceeded = reply.getValue("v.CurvesSucceeded")
+        self.CurvesFailed = reply.getValue("v.CurvesFailed")
         return self.CurvesSucceeded, self.CurvesFailed
 
     def ExportScannedCurvePoints(self, Cloud=""):
@@ -7054,8 +7652,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "ExportScannedCurvePoints(Cloud={})".format(Cloud)
-        self.__vexec(commandString)
-        return self.getValue("v.Success")
+        reply = self.__vexec(commandString)
+        return reply.getValue("v.Success")
 
     def CreateBarrelAxis3DLine(self):
         """
@@ -7091,10 +7689,10 @@ class VSTARS(metaclass=Singleton):
             commandString += "camera={},".format(camera)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        pan = self.getValue("v.panPosition")
-        tilt = self.getValue("v.tiltPosition")
-        roll = self.getValue("v.rollPosition")
+        reply = self.__vexec(commandString)
+        pan = reply.getValue("v.panPosition")
+        tilt = reply.getValue("v.tiltPosition")
+        roll = reply.getValue("v.rollPosition")
         return pan, tilt, roll
 
     def MoveCamera(
@@ -7156,8 +7754,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "GetPanTiltStatus()"
-        self.__vexec(commandString)
-        moving = self.getValue("v.panTiltMoving")
+        reply = self.__vexec(commandString)
+        moving = reply.getValue("v.panTiltMoving")
         return moving
 
     def PanTiltStatus(self):
@@ -7172,9 +7770,9 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "GetPanTiltStatus()"
-        self.__vexec(commandString)
-        moving = self.getValue("v.panTiltMoving")
-        timedOut = self.getValue("v.panTiltTimedOut")
+        reply = self.__vexec(commandString)
+        moving = reply.getValue("v.panTiltMoving")
+        timedOut = reply.getValue("v.panTiltTimedOut")
         return moving, timedOut
 
     def PanTiltCommand(self, camera=None, index=None, command=None):
@@ -7200,8 +7798,8 @@ class VSTARS(metaclass=Singleton):
             commandString += 'command="{} ",'.format(command)
         commandString = commandString.rstrip(",")
         commandString += ")"
-        self.__vexec(commandString)
-        result = self.getValue("v.panTiltCommandResult")
+        reply = self.__vexec(commandString)
+        result = reply.getValue("v.panTiltCommandResult")
         return result
 
     def DisableBundledPoints(self, bad=False, weak=False):
@@ -7607,10 +8205,10 @@ class VSTARS(metaclass=Singleton):
         commandString = commandString.rstrip(",")
         commandString += ")"
 
-        self.__vexec(commandString)
-        takingPictures = self.getValue("v.cameraTakingPicture")
-        connected = self.getValue("v.cameraConnected")
-        temperature = self.getValue("v.cameraTemperature")
+        reply = self.__vexec(commandString)
+        takingPictures = reply.getValue("v.cameraTakingPicture")
+        connected = reply.getValue("v.cameraConnected")
+        temperature = reply.getValue("v.cameraTemperature")
         return takingPictures, connected, temperature
 
     def CamerasTakingPictures(self):
@@ -7625,8 +8223,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandString = "GetCameraStatus()"
-        self.__vexec(commandString)
-        takingPictures = self.getValue("v.cameraTakingPicture")
+        reply = self.__vexec(commandString)
+        takingPictures = reply.getValue("v.cameraTakingPicture")
         return takingPictures
 
     def CheckPictureInformation(
@@ -7950,8 +8548,8 @@ class VSTARS(metaclass=Singleton):
 
         """
         commandStr = "SelectFolder()"
-        self.__vexec(commandStr)
-        rv = self.getValue("v.selectedPath")
+        reply = self.__vexec(commandStr)
+        rv = reply.getValue("v.selectedPath")
         return rv
 
     def SaveAsTemplateProject(self, name=""):
@@ -8662,22 +9260,26 @@ class VSTARS(metaclass=Singleton):
 
         """
         # the scaleInfo is only returned on 4.9.4-1 or greater
-        if self.CheckVstarsVersion(40090040010000):
-            self.scaleBarsEvent = Event()
-
-        self.__vexec("GetScaleBars()")
+        cache = getattr(self, "resultCache", None)
+        if cache is not None and self.CheckVstarsVersion(40090040010000):
+            key = cache.key(self, "GetScaleBars", "")
+            scaleBars = cache.get(key)
+            if scaleBars is not None:
+                return scaleBars
+        else:
+            cache = None
 
-        # the scaleInfo is only returned on 4.9.4-1 or greater
-        if self.CheckVstarsVersion(40090040010000):
-            self.scaleBarsEvent.wait(timeout=timeout)
+        if not self.CheckVstarsVersion(40090040010000):
+            self.__vexec("GetScaleBars()")
+            return None
 
-            scaleBars = self.scaleBars
-            self.scaleBarsEvent = None
+        request, reply = self.__vexecData("GetScaleBars()", "scalebars")
 
-            if scaleBars is None:
-                raise Exception("A timeout occurred waiting for the ScaleBars")
+        scaleBars = self.dataRequests.wait(request, timeout, "the ScaleBars")
 
-            return scaleBars
+        if cache is not None:
+            cache.put(key, scaleBars)
+        return scaleBars
 
     def initMTorres(self, mtorres_communication):
         """
@@ -8692,6 +9294,13 @@ class VSTARS(metaclass=Singleton):
         elif mtorres_communication == MTorresCommunication.USB6525:
             self.__vexec("initMTorres(type=usb6525)")
 
+class VSTARS(VSTARSClient, metaclass=Singleton):
+    """
+    The default VSTARSClient. Every call to VSTARS() returns the same instance,
+    see VSTARSClient for the commands.
+    """
+
+
 class VSTARSTester:
     def __init__(self, templateName, address="localhost", port=1210):
         self.V = VSTARS()
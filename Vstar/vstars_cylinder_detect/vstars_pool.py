@@ -0,0 +1,103 @@
+# VSTARS Ignore
+from concurrent.futures import ThreadPoolExecutor
+
+from .vstars import VError, VSTARSClient
+
+
+class VSTARSPool:
+    """
+    Connections to several V-STARS workstations
+
+    Holds one VSTARSClient per (address, port) and can run a command on all of them
+    in parallel. Results are returned in a dict keyed by (address, port).
+
+    .. code:: python
+
+        from vstars import VSTARSPool
+
+        pool = VSTARSPool([("192.168.0.11", 1210), ("192.168.0.12", 1210)])
+        pool.init()
+
+        pool.broadcast("ProjectAutomeasure", begin=True, close=True)
+        stats = pool.broadcast("ProjectBundleRun")
+        for station, bundle in stats.items():
+            print(station, bundle.bundleTotalRMSX)
+
+        # anything else can be run with map
+        counts = pool.map(lambda V: len(V.Get3D(filename="Final Results").points))
+
+    :param stations: The (address, port) of every V-STARS to connect to
+    :param maxWorkers: The number of stations driven at the same time, all of them if None
+    """
+
+    def __init__(self, stations, maxWorkers=None):
+        self.clients = {}
+        for address, port in stations:
+            self.clients[(address, port)] = VSTARSClient()
+
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers or max(len(self.clients), 1))
+
+    def __getitem__(self, station) -> VSTARSClient:
+        return self.clients[station]
+
+    def __iter__(self):
+        return iter(self.clients)
+
+    def __len__(self):
+        return len(self.clients)
+
+    def init(self):
+        """
+        Connects to every station in parallel
+        """
+        return self.map(lambda V, station: V.init(station[0], station[1]), passStation=True)
+
+    def close(self):
+        """
+        Closes every connection
+        """
+        for client in self.clients.values():
+            client.close()
+        self.executor.shutdown(wait=False)
+
+    def map(self, function, returnExceptions=False, passStation=False) -> dict:
+        """
+        Calls function(client) for every station in parallel
+
+        :param function: The function to call, it gets the VSTARSClient of the station
+        :param returnExceptions: When True an exception raised for a station is returned as its result, otherwise a VError is raised once every station has finished
+        :param passStation: When True the function is called as function(client, (address, port))
+
+        :returns: a dict of the results keyed by (address, port)
+        """
+        futures = {}
+        for station, client in self.clients.items():
+            if passStation:
+                futures[station] = self.executor.submit(function, client, station)
+            else:
+                futures[station] = self.executor.submit(function, client)
+
+        results = {}
+        errors = {}
+        for station, future in futures.items():
+            try:
+                results[station] = future.result()
+            except Exception as ex:
+                results[station] = ex
+                errors[station] = str(ex)
+
+        if errors and not returnExceptions:
+            raise VError(errors)
+
+        return results
+
+    def broadcast(self, command: str, *args, returnExceptions=False, **kwargs) -> dict:
+        """
+        Runs the same V-STARS command on every station in parallel
+
+        :param command: The name of a VSTARSClient method, e.g. "ProjectBundleRun"
+        :param returnExceptions: see map
+
+        :returns: a dict of the command results keyed by (address, port)
+        """
+        return self.map(lambda V: getattr(V, command)(*args, **kwargs), returnExceptions=returnExceptions)